@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response, status
+from typing import Any, Optional
 from bson import ObjectId
 from datetime import datetime
 
+from core.config import settings
 from core.database import get_database
+from core.pagination import NEXT_CURSOR_HEADER, rename_id, wants_ndjson
 from models.user import User, UserRole
+from repositories.user_repository import UserRepository
 
 router = APIRouter(
     prefix="/auth",
@@ -22,9 +25,10 @@ async def register(
     - **email**: Valid email address
     - **full_name**: User's full name
     """
+    users = UserRepository(db)
+    
     # Check if user already exists
-    existing_user = db.users.find_one({"email": user_data["email"]})
-    if existing_user:
+    if await users.exists_by_email(user_data["email"]):
         raise HTTPException(
             status_code=400,
             detail="Email already registered"
@@ -39,10 +43,10 @@ async def register(
         "last_login": datetime.utcnow()
     }
     
-    result = db.users.insert_one(user_doc)
+    result = await users.insert(user_doc)
     
     # Get created user
-    created_user = db.users.find_one({"_id": result.inserted_id})
+    created_user = await users.get_by_id(result.inserted_id)
     created_user["id"] = str(created_user["_id"])
     del created_user["_id"]
     
@@ -61,8 +65,10 @@ async def login(
     
     - **email**: Registered email address
     """
+    users = UserRepository(db)
+    
     # Find user by email
-    user = db.users.find_one({"email": credentials["email"]})
+    user = await users.get_by_email(credentials["email"])
     if not user:
         raise HTTPException(
             status_code=401,
@@ -70,10 +76,7 @@ async def login(
         )
     
     # Update last login
-    db.users.update_one(
-        {"_id": user["_id"]},
-        {"$set": {"last_login": datetime.utcnow()}}
-    )
+    await users.update_by_id(user["_id"], {"last_login": datetime.utcnow()})
     
     # Format user response
     user["id"] = str(user["_id"])
@@ -92,7 +95,7 @@ async def get_user_by_email(
     """
     Get user information by email.
     """
-    user = db.users.find_one({"email": email})
+    user = await UserRepository(db).get_by_email(email)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -107,19 +110,34 @@ async def get_user_by_email(
 
 @router.get("/users")
 async def list_users(
+    response: Response,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    response_format: str = Query("json", alias="format"),
+    accept: Optional[str] = Header(None),
     db=Depends(get_database)
 ):
     """
-    Get all users (for admin purposes).
+    Get users page by page (for admin purposes).
+    
+    The cursor for the next page is returned in the ``X-Next-Cursor`` header.
+    ``format=ndjson`` streams all users as NDJSON.
     """
-    users = list(db.users.find())
+    users = UserRepository(db)
+    if wants_ndjson(response_format, accept):
+        return users.stream(cursor, fields, transform=rename_id("id"))
+    
+    page = await users.list_page(limit, cursor, fields)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
     
     # Format users response
-    for user in users:
+    for user in page.items:
         user["id"] = str(user["_id"])
         del user["_id"]
     
-    return users
+    return page.items
 
 @router.put("/user/{email}")
 async def update_user(
@@ -130,22 +148,15 @@ async def update_user(
     """
     Update user information.
     """
-    user = db.users.find_one({"email": email})
-    if not user:
+    # Update user and get the updated document in one round trip
+    update_data["updated_at"] = datetime.utcnow()
+    updated_user = await UserRepository(db).update_by_email(email, update_data)
+    if not updated_user:
         raise HTTPException(
             status_code=404,
             detail="User not found"
         )
     
-    # Update user
-    update_data["updated_at"] = datetime.utcnow()
-    result = db.users.update_one(
-        {"email": email},
-        {"$set": update_data}
-    )
-    
-    # Get updated user
-    updated_user = db.users.find_one({"email": email})
     updated_user["id"] = str(updated_user["_id"])
     del updated_user["_id"]
     
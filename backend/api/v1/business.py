@@ -1,7 +1,8 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from typing import List, Dict, Optional
-from bson import ObjectId
 import os
 import magic
 import hashlib
@@ -10,8 +11,36 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from core.mongodb import get_db
 from core.config import settings
+from core.cache import CachedResponse
+from core.conditional import conditional_response, version_etag
 from core.database import get_database
-from services.business_service import BusinessService
+from core.pagination import NEXT_CURSOR_HEADER, rename_id, wants_ndjson
+from core.read_policy import get_causal_session, reporting_db
+from services.blob_service import DocumentBlobStore
+from services.business_service import (
+    BusinessService,
+    business_response_key,
+    invalidate_business_caches,
+    onboarding_response_key,
+    response_cache
+)
+from services.onboarding_service import (
+    BUSINESS_DETAILS_FIELDS,
+    OnboardingImportService,
+    OnboardingValidationError,
+    basic_info_record,
+    build_document_refs,
+    business_details_update,
+    completion_update,
+    document_file_ids,
+    iter_csv_rows,
+    iter_ndjson_rows,
+    validate_basic_info,
+    validate_business_details
+)
+from repositories.business_repository import BusinessRepository, ONBOARDING_PROJECTION, attached_file_ids
+from repositories.child_repository import from_child_document
+from repositories.loaders import RequestLoaders, get_loaders
 from schemas.business import (
     Business,
     Document,
@@ -60,50 +89,50 @@ async def calculate_file_hash(file_path: str) -> str:
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
-async def get_business_service(db: AsyncIOMotorDatabase = Depends(get_database)) -> BusinessService:
-    return BusinessService(db)
+def json_body(content) -> bytes:
+    """Response body as FastAPI would serialize ``content``, for the response cache"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+async def business_version_etag(businesses: BusinessRepository, business_id: str) -> str:
+    """ETag of the business' current version from a projected read; 404 if it does not exist"""
+    version = await businesses.get_version(business_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Business not found")
+    return version_etag(version)
+
+async def get_business_service(
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    session = Depends(get_causal_session)
+) -> BusinessService:
+    return BusinessService(db, session)
 
 # ONBOARDING ENDPOINTS MATCHING FRONTEND EXACTLY
 
 @router.post("/onboarding/start")
 async def start_onboarding(
     data: dict,
-    db = Depends(get_database)
+    db = Depends(get_database),
+    session = Depends(get_causal_session)
 ):
     """Start the onboarding process with basic info (Step 1)"""
     try:
         logger.info(f"Starting onboarding for business: {data.get('businessName')}")
         
         # Validate required fields for step 1
-        required_fields = ["businessName", "companyDescription", "legalEntityType", "industry", "incorporationDate"]
-        missing_fields = [field for field in required_fields if not data.get(field)]
-        
-        if missing_fields:
-            logger.warning(f"Missing required fields for onboarding: {missing_fields}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Missing required fields: {', '.join(missing_fields)}"
-            )
+        try:
+            validate_basic_info(data)
+        except OnboardingValidationError as e:
+            logger.warning(f"Invalid onboarding start request: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
         
         # Create onboarding record
-        onboarding = {
-            "businessName": data["businessName"],
-            "companyDescription": data["companyDescription"],
-            "legalEntityType": data["legalEntityType"],
-            "industry": data["industry"],
-            "incorporationDate": data["incorporationDate"],
-            "currentStep": 1,
-            "status": "in_progress",
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
+        onboarding = basic_info_record(data)
         
-        result = db.businesses.insert_one(onboarding)
+        result = await BusinessRepository(db, session).insert(onboarding)
         business_id = str(result.inserted_id)
         
-        # Get created record
-        created_onboarding = db.businesses.find_one({"_id": result.inserted_id})
-        created_onboarding["id"] = business_id
+        # insert_one stored exactly this record, so answer from it instead of re-reading
+        created_onboarding = dict(onboarding, id=business_id)
         del created_onboarding["_id"]
         
         logger.info(f"Successfully started onboarding for business ID: {business_id}")
@@ -127,67 +156,30 @@ async def start_onboarding(
 async def update_business_details(
     business_id: str,
     data: dict,
-    db = Depends(get_database)
+    db = Depends(get_database),
+    session = Depends(get_causal_session)
 ):
     """Update business details (Step 2)"""
     try:
-        # Check if business exists
-        business = db.businesses.find_one({"_id": ObjectId(business_id)})
-        if not business:
-            raise HTTPException(status_code=404, detail="Business not found")
-        
         # Validate required fields for step 2
-        required_fields = ["panNumber", "registeredAddress", "contactInfo"]
-        missing_fields = [field for field in required_fields if not data.get(field)]
-        
-        if missing_fields:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Missing required fields: {', '.join(missing_fields)}"
-            )
-        
-        # Validate nested required fields
-        if data.get("registeredAddress"):
-            addr_required = ["street", "city", "state", "pincode"]
-            addr_missing = [field for field in addr_required 
-                          if not data["registeredAddress"].get(field)]
-            if addr_missing:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Missing address fields: {', '.join(addr_missing)}"
-                )
-        
-        if data.get("contactInfo"):
-            contact_required = ["phone", "email"]
-            contact_missing = [field for field in contact_required 
-                             if not data["contactInfo"].get(field)]
-            if contact_missing:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Missing contact fields: {', '.join(contact_missing)}"
-                )
+        try:
+            validate_business_details(data)
+        except OnboardingValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         # Update business record
-        update_data = {
-            "panNumber": data["panNumber"],
-            "gstin": data.get("gstin"),
-            "registeredAddress": data["registeredAddress"],
-            "contactInfo": data["contactInfo"],
-            "bankDetails": data.get("bankDetails"),
-            "currentStep": 2,
-            "updated_at": datetime.utcnow()
-        }
+        update_data = business_details_update(data)
         
-        result = db.businesses.update_one(
-            {"_id": ObjectId(business_id)},
-            {"$set": update_data}
+        # Update and fetch the updated record in one round trip
+        updated_business = await BusinessRepository(db, session).update_and_get(
+            business_id,
+            {"$set": update_data},
+            projection=ONBOARDING_PROJECTION
         )
-        
-        if result.matched_count == 0:
+        if not updated_business:
             raise HTTPException(status_code=404, detail="Business not found")
         
-        # Get updated record
-        updated_business = db.businesses.find_one({"_id": ObjectId(business_id)})
+        await invalidate_business_caches(business_id)
         updated_business["id"] = str(updated_business["_id"])
         del updated_business["_id"]
         
@@ -209,68 +201,28 @@ async def update_business_details(
 async def upload_documents(
     business_id: str,
     data: dict,
-    db = Depends(get_database)
+    db = Depends(get_database),
+    session = Depends(get_causal_session),
+    loaders: RequestLoaders = Depends(get_loaders)
 ):
     """Upload documents - receive MongoDB file IDs (Step 3)"""
     try:
+        businesses = BusinessRepository(db, session)
+        
         # Check if business exists
-        business = db.businesses.find_one({"_id": ObjectId(business_id)})
-        if not business:
+        if not await businesses.exists(business_id):
             raise HTTPException(status_code=404, detail="Business not found")
         
-        # Validate required documents
-        if not data.get("incorporation") or not data.get("panCard"):
-            raise HTTPException(
-                status_code=400,
-                detail="Incorporation certificate and PAN card file IDs are required"
-            )
-        
-        documents = {}
-        
         # Process document file IDs from our MongoDB storage
-        document_fields = [
-            ("incorporation", True),
-            ("panCard", True),
-            ("gstCertificate", False),
-            ("bankStatements", False)
-        ]
-        
-        for doc_type, is_required in document_fields:
-            if data.get(doc_type):
-                file_id = data[doc_type]
-                
-                # Validate that the file exists in our database
-                file_metadata = db.file_metadata.find_one({"_id": ObjectId(file_id)})
-                if not file_metadata:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"File ID {file_id} for {doc_type} not found in database"
-                    )
-                
-                # Validate file type
-                if file_metadata.get("content_type") != "application/pdf":
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"File {file_id} for {doc_type} must be a PDF"
-                    )
-                
-                # Create document record
-                documents[doc_type] = {
-                    "name": file_metadata.get("filename", f"{doc_type}_document"),
-                    "type": doc_type,
-                    "file_id": file_id,
-                    "filename": file_metadata.get("filename"),
-                    "file_size": file_metadata.get("file_size"),
-                    "file_hash": file_metadata.get("file_hash"),
-                    "uploaded_at": datetime.utcnow(),
-                    "status": "uploaded",
-                    "source": "mongodb_gridfs"
-                }
-            elif is_required:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Required document {doc_type} is missing"
-                )
+        try:
+            file_ids = document_file_ids(data)
+            
+            # Validate that the files exist in our database (one query for all documents)
+            metadata_by_id = await loaders.file_metadata.load_many(file_ids.values())
+            
+            documents = build_document_refs(file_ids, metadata_by_id)
+        except OnboardingValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         # Update business record
         update_data = {
@@ -279,14 +231,19 @@ async def upload_documents(
             "updated_at": datetime.utcnow()
         }
         
-        result = db.businesses.update_one(
-            {"_id": ObjectId(business_id)},
-            {"$set": update_data}
-        )
+        # Reference the new files before the record points at them, release the
+        # ones it pointed at before (files shared with other records survive)
+        blobs = DocumentBlobStore(db, session)
+        new_file_ids = [doc["file_id"] for doc in documents.values()]
+        await blobs.attach(new_file_ids)
+        previous = await businesses.replace_documents(business_id, update_data)
         
-        if result.matched_count == 0:
+        if previous is None:
+            await blobs.release(new_file_ids, collect=False)
             raise HTTPException(status_code=404, detail="Business not found")
         
+        await blobs.release(attached_file_ids(previous))
+        await invalidate_business_caches(business_id)
         logger.info(f"Successfully saved document references for business {business_id}")
         
         return {
@@ -308,52 +265,44 @@ async def upload_documents(
 async def complete_onboarding(
     business_id: str,
     data: dict,
-    db = Depends(get_database)
+    db = Depends(get_database),
+    session = Depends(get_causal_session)
 ):
     """Complete onboarding (Step 4 - Verification)"""
     try:
-        # Check if business exists
-        business = db.businesses.find_one({"_id": ObjectId(business_id)})
-        if not business:
-            raise HTTPException(status_code=404, detail="Business not found")
+        businesses = BusinessRepository(db, session)
         
         # Validate required fields
-        if not data.get("termsAccepted"):
-            raise HTTPException(
-                status_code=400,
-                detail="Terms and conditions must be accepted"
-            )
-        
-        # Check if all previous steps are completed
-        required_steps = ["businessName", "panNumber", "registeredAddress", "contactInfo", "documents"]
-        missing_steps = [step for step in required_steps if not business.get(step)]
-        
-        if missing_steps:
+        try:
+            update_data = completion_update(data)
+        except OnboardingValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # Update business record to complete onboarding, only if all previous steps are completed
+        completed_business = await businesses.complete_onboarding(business_id, update_data)
+        
+        if not completed_business:
+            # Nothing matched: find out whether the business is missing or incomplete
+            business = await businesses.get_step_status(business_id)
+            if not business:
+                raise HTTPException(status_code=404, detail="Business not found")
+            
+            required_steps = ["businessName"] + BUSINESS_DETAILS_FIELDS
+            missing_steps = [step for step in required_steps if not business.get(step)]
+            if not business.get("has_documents"):
+                missing_steps.append("documents")
+            
+            if missing_steps:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Complete previous steps first. Missing: {', '.join(missing_steps)}"
+                )
             raise HTTPException(
-                status_code=400,
-                detail=f"Complete previous steps first. Missing: {', '.join(missing_steps)}"
+                status_code=409,
+                detail="Business changed while completing onboarding, please retry"
             )
         
-        # Update business record to complete onboarding
-        update_data = {
-            "termsAccepted": data["termsAccepted"],
-            "blockchainHashing": data.get("blockchainHashing", True),
-            "currentStep": 4,
-            "status": "completed",
-            "completed_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-        
-        result = db.businesses.update_one(
-            {"_id": ObjectId(business_id)},
-            {"$set": update_data}
-        )
-        
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Business not found")
-        
-        # Get completed business record
-        completed_business = db.businesses.find_one({"_id": ObjectId(business_id)})
+        await invalidate_business_caches(business_id)
         completed_business["id"] = str(completed_business["_id"])
         del completed_business["_id"]
         
@@ -371,14 +320,57 @@ async def complete_onboarding(
             detail=f"Failed to complete onboarding: {str(e)}"
         )
 
+@router.post("/onboarding/import")
+async def import_onboarding_businesses(
+    request: Request,
+    db = Depends(get_database)
+):
+    """Bulk-create onboarding records from an NDJSON or CSV body.
+    
+    Each row is validated with the same rules as the step endpoints; steps the row
+    has data for are applied in order (details, documents, terms). Rows are written
+    in unordered batches of BULK_IMPORT_BATCH_SIZE. CSV uses a header row and dotted
+    columns for nested fields, e.g. ``registeredAddress.city``.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in ("application/x-ndjson", "application/jsonl", "application/json"):
+        rows = iter_ndjson_rows(request.stream())
+    elif content_type in ("text/csv", "application/csv"):
+        rows = iter_csv_rows(request.stream())
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Send the import as application/x-ndjson or text/csv"
+        )
+    
+    try:
+        result = await OnboardingImportService(db).import_rows(rows)
+        logger.info(f"Bulk onboarding import finished: {result['summary']}")
+        return result
+    except Exception as e:
+        logger.error(f"Error importing businesses: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to import businesses: {str(e)}"
+        )
+
 @router.get("/onboarding/{business_id}")
 async def get_onboarding_status(
     business_id: str,
+    if_none_match: Optional[str] = Header(None),
     db = Depends(get_database)
 ):
-    """Get onboarding status and data"""
-    try:
-        business = db.businesses.find_one({"_id": ObjectId(business_id)})
+    """Get onboarding status and data.
+    
+    Tagged with an ETag; send it back in ``If-None-Match`` to get 304 while unchanged.
+    """
+    businesses = BusinessRepository(db)
+    
+    async def current_etag() -> str:
+        return await business_version_etag(businesses, business_id)
+    
+    async def render() -> CachedResponse:
+        business = await businesses.get_onboarding(business_id)
         if not business:
             raise HTTPException(status_code=404, detail="Business not found")
         
@@ -386,7 +378,7 @@ async def get_onboarding_status(
         business["id"] = str(business["_id"])
         del business["_id"]
         
-        return {
+        return CachedResponse(version_etag(business.get("version")), json_body({
             "business": business,
             "currentStep": business.get("currentStep", 1),
             "status": business.get("status", "in_progress"),
@@ -396,7 +388,12 @@ async def get_onboarding_status(
                 "step3_complete": bool(business.get("documents")),
                 "step4_complete": bool(business.get("termsAccepted")),
             }
-        }
+        }))
+    
+    try:
+        return await conditional_response(
+            response_cache, onboarding_response_key(business_id), if_none_match, current_etag, render
+        )
         
     except Exception as e:
         if isinstance(e, HTTPException):
@@ -409,26 +406,45 @@ async def get_onboarding_status(
 @router.get("/onboarding")
 async def list_onboarding_businesses(
     status: Optional[str] = None,
-    db = Depends(get_database)
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    response_format: str = Query("json", alias="format"),
+    accept: Optional[str] = Header(None),
+    db = Depends(reporting_db("onboarding_list")),
+    session = Depends(get_causal_session)
 ):
-    """List all onboarding businesses"""
+    """List onboarding businesses, newest first.
+    
+    Pages are capped at MAX_PAGE_SIZE; pass ``next_cursor`` back as ``cursor`` for the
+    next page. ``fields`` limits the returned fields, and ``format=ndjson`` (or
+    ``Accept: application/x-ndjson``) streams every match as NDJSON instead.
+    Reads may be served by a secondary; send ``X-Consistency-Token`` to see your own writes.
+    """
     try:
         query = {}
         if status:
             query["status"] = status
         
-        businesses = list(db.businesses.find(query))
+        businesses = BusinessRepository(db, session)
+        if wants_ndjson(response_format, accept):
+            return businesses.stream(query, cursor, fields, transform=rename_id("id"))
+        
+        page = await businesses.list_page(query, limit, cursor, fields)
         
         # Convert ObjectId to string for response
-        for business in businesses:
+        for business in page.items:
             business["id"] = str(business["_id"])
             del business["_id"]
         
         return {
-            "businesses": businesses,
-            "total": len(businesses)
+            "businesses": page.items,
+            "count": len(page.items),
+            "next_cursor": page.next_cursor
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -448,10 +464,23 @@ async def create_business(
 @router.get("/businesses/{business_id}", response_model=Business)
 async def get_business(
     business_id: str,
+    if_none_match: Optional[str] = Header(None),
     business_service: BusinessService = Depends(get_business_service)
 ):
-    """Get business details"""
-    return await business_service.get_business_by_id(business_id)
+    """Get business details.
+    
+    Tagged with an ETag; send it back in ``If-None-Match`` to get 304 while unchanged.
+    """
+    async def current_etag() -> str:
+        return await business_version_etag(business_service.businesses, business_id)
+    
+    async def render() -> CachedResponse:
+        business, version = await business_service.get_business_with_version(business_id)
+        return CachedResponse(version_etag(version), json_body(business))
+    
+    return await conditional_response(
+        response_cache, business_response_key(business_id), if_none_match, current_etag, render
+    )
 
 @router.put("/businesses/{business_id}", response_model=Business)
 async def update_business(
@@ -472,13 +501,38 @@ async def upload_document(
     """Upload a document"""
     return await business_service.upload_document(business_id, doc_type, file)
 
+@router.get("/businesses/{business_id}/documents")
+async def list_business_documents(
+    business_id: str,
+    doc_type: Optional[DocumentType] = None,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    business_service: BusinessService = Depends(get_business_service)
+):
+    """List a business' documents, newest first, paged by ``cursor``/``next_cursor``"""
+    page = await business_service.list_documents(business_id, doc_type, limit, cursor, fields)
+    documents = [from_child_document(doc) for doc in page.items]
+    return {"documents": documents, "count": len(documents), "next_cursor": page.next_cursor}
+
 @router.get("/businesses/{business_id}/documents/stats", response_model=Dict)
 async def get_document_stats(
     business_id: str,
+    db = Depends(reporting_db("document_stats")),
+    session = Depends(get_causal_session)
+):
+    """Get document statistics (may be served by a secondary)"""
+    return await BusinessService(db, session).get_document_stats(business_id)
+
+@router.delete("/businesses/{business_id}/documents/{document_id}")
+async def delete_document(
+    business_id: str,
+    document_id: str,
     business_service: BusinessService = Depends(get_business_service)
 ):
-    """Get document statistics"""
-    return await business_service.get_document_stats(business_id)
+    """Delete a document and its stored file"""
+    await business_service.delete_document(business_id, document_id)
+    return {"message": "Document deleted successfully", "document_id": document_id}
 
 @router.post("/businesses/{business_id}/tasks", response_model=Task)
 async def create_task(
@@ -489,14 +543,88 @@ async def create_task(
     """Create a new task"""
     return await business_service.create_task(business_id, task_data)
 
+@router.get("/businesses/{business_id}/tasks")
+async def list_tasks(
+    business_id: str,
+    status: Optional[TaskStatus] = None,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    business_service: BusinessService = Depends(get_business_service)
+):
+    """List a business' tasks, soonest due first, paged by ``cursor``/``next_cursor``"""
+    page = await business_service.list_tasks(business_id, status, limit, cursor, fields)
+    tasks = [from_child_document(task) for task in page.items]
+    return {"tasks": tasks, "count": len(tasks), "next_cursor": page.next_cursor}
+
+@router.put("/businesses/{business_id}/tasks/{task_id}/status", response_model=Task)
+async def update_task_status(
+    business_id: str,
+    task_id: str,
+    data: dict,
+    business_service: BusinessService = Depends(get_business_service)
+):
+    """Move a task to a new status (``{"status": "completed"}``)"""
+    try:
+        status = TaskStatus(data.get("status"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(s.value for s in TaskStatus)}")
+    return await business_service.update_task_status(business_id, task_id, status)
+
 @router.get("/businesses/{business_id}/tasks/upcoming", response_model=List[Task])
 async def get_upcoming_tasks(
     business_id: str,
+    response: Response,
     days: int = 30,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    business_service: BusinessService = Depends(get_business_service)
+):
+    """Get open tasks due in the next ``days`` (overdue included), soonest first.
+
+    Paged by ``cursor``; the next page's cursor is in the ``X-Next-Cursor`` header.
+    """
+    page = await business_service.get_upcoming_tasks(business_id, days, limit, cursor)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return [Task(**from_child_document(task)) for task in page.items]
+
+@router.get("/businesses/{business_id}/tasks/overdue", response_model=List[Task])
+async def get_overdue_tasks(
+    business_id: str,
+    response: Response,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
     business_service: BusinessService = Depends(get_business_service)
 ):
-    """Get upcoming tasks"""
-    return await business_service.get_upcoming_tasks(business_id, days)
+    """Get open tasks past their due date, oldest first; paged like ``tasks/upcoming``"""
+    page = await business_service.get_overdue_tasks(business_id, limit, cursor)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return [Task(**from_child_document(task)) for task in page.items]
+
+@router.get("/tasks/due")
+async def list_tasks_due(
+    days: int = Query(7, ge=0),
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db = Depends(reporting_db("tasks_due")),
+    session = Depends(get_causal_session)
+):
+    """Open tasks of every business due in the next ``days``, soonest first (for reminders).
+
+    Paged by ``cursor``/``next_cursor``; each task carries its ``business_id``.
+    Reads may be served by a secondary.
+    """
+    page = await BusinessService(db, session).get_tasks_due_all_businesses(days, limit, cursor, fields)
+    tasks = []
+    for task in page.items:
+        business_id = task.get("business_id")
+        task = from_child_document(task)
+        task["business_id"] = str(business_id)
+        tasks.append(task)
+    return {"tasks": tasks, "count": len(tasks), "next_cursor": page.next_cursor}
 
 @router.post("/businesses/{business_id}/compliance/events", response_model=ComplianceEvent)
 async def create_compliance_event(
@@ -507,6 +635,34 @@ async def create_compliance_event(
     """Create a compliance event"""
     return await business_service.create_compliance_event(business_id, event_data)
 
+@router.get("/businesses/{business_id}/compliance/events")
+async def list_compliance_events(
+    business_id: str,
+    status: Optional[TaskStatus] = None,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    business_service: BusinessService = Depends(get_business_service)
+):
+    """List a business' compliance events, soonest due first, paged by ``cursor``/``next_cursor``"""
+    page = await business_service.list_compliance_events(business_id, status, limit, cursor, fields)
+    events = [from_child_document(event) for event in page.items]
+    return {"events": events, "count": len(events), "next_cursor": page.next_cursor}
+
+@router.put("/businesses/{business_id}/compliance/events/{event_id}/status", response_model=ComplianceEvent)
+async def update_compliance_event_status(
+    business_id: str,
+    event_id: str,
+    data: dict,
+    business_service: BusinessService = Depends(get_business_service)
+):
+    """Move a compliance event to a new status (``{"status": "completed"}``)"""
+    try:
+        status = TaskStatus(data.get("status"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(s.value for s in TaskStatus)}")
+    return await business_service.update_compliance_event_status(business_id, event_id, status)
+
 @router.get("/businesses/{business_id}/compliance/score", response_model=float)
 async def get_compliance_score(
     business_id: str,
@@ -527,32 +683,8 @@ async def update_settings(
 @router.get("/businesses/{business_id}/dashboard", response_model=Dict)
 async def get_dashboard_data(
     business_id: str,
-    business_service: BusinessService = Depends(get_business_service)
+    db = Depends(reporting_db("dashboard")),
+    session = Depends(get_causal_session)
 ):
-    """Get dashboard data"""
-    business = await business_service.get_business_by_id(business_id)
-    
-    # Get various statistics
-    doc_stats = await business_service.get_document_stats(business_id)
-    compliance_score = await business_service.get_compliance_score(business_id)
-    upcoming_tasks = await business_service.get_upcoming_tasks(business_id)
-    
-    # Calculate task statistics
-    urgent_tasks = sum(1 for task in upcoming_tasks if task.priority == TaskPriority.URGENT)
-    normal_tasks = len(upcoming_tasks) - urgent_tasks
-    
-    return {
-        "business_name": business.name,
-        "compliance_score": compliance_score,
-        "document_stats": doc_stats,
-        "tasks": {
-            "total": len(upcoming_tasks),
-            "urgent": urgent_tasks,
-            "normal": normal_tasks
-        },
-        "recent_activity": {
-            "documents": [doc.dict() for doc in business.documents[-3:]],
-            "tasks": [task.dict() for task in business.tasks[-3:]],
-            "compliance_events": [event.dict() for event in business.compliance_events[-3:]]
-        }
-    } 
\ No newline at end of file
+    """Get dashboard data in one aggregation (may be served by a secondary, cached briefly)"""
+    return await BusinessService(db, session).get_dashboard(business_id) 
\ No newline at end of file
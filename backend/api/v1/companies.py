@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response, status
+from typing import List, Optional
 from bson import ObjectId
 from datetime import datetime
+from core.config import settings
 from core.database import get_database
+from core.pagination import NEXT_CURSOR_HEADER, rename_id, wants_ndjson
 from models.company import Company
+from repositories.company_repository import CompanyRepository
 from schemas.company import CompanyCreate, CompanyUpdate, Company as CompanySchema
 
 router = APIRouter(
@@ -22,8 +25,9 @@ async def create_company(
         "created_at": datetime.utcnow()
     }
     
-    result = db.companies.insert_one(company_data)
-    created_company = db.companies.find_one({"_id": result.inserted_id})
+    companies = CompanyRepository(db)
+    result = await companies.insert(company_data)
+    created_company = await companies.get(result.inserted_id)
     
     # Convert ObjectId to string for response
     created_company["id"] = str(created_company["_id"])
@@ -33,16 +37,27 @@ async def create_company(
 
 @router.get("/", response_model=List[CompanySchema])
 async def list_companies(
+    response: Response,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    response_format: str = Query("json", alias="format"),
+    accept: Optional[str] = Header(None),
     db=Depends(get_database)
 ):
-    companies = list(db.companies.find())
+    companies = CompanyRepository(db)
+    if wants_ndjson(response_format, accept):
+        return companies.stream(cursor, transform=rename_id("id"))
+    
+    page = await companies.list_page(limit, cursor)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
     
     # Convert ObjectId to string for response
-    for company in companies:
+    for company in page.items:
         company["id"] = str(company["_id"])
         del company["_id"]
     
-    return companies
+    return page.items
 
 @router.get("/{company_id}", response_model=CompanySchema)
 async def get_company(
@@ -50,7 +65,7 @@ async def get_company(
     db=Depends(get_database)
 ):
     try:
-        company = db.companies.find_one({"_id": ObjectId(company_id)})
+        company = await CompanyRepository(db).get(ObjectId(company_id))
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid company ID")
     
@@ -74,18 +89,15 @@ async def update_company(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid company ID")
     
+    companies = CompanyRepository(db)
+    
     update_data = company_update.dict(exclude_unset=True)
     if update_data:
         update_data["updated_at"] = datetime.utcnow()
-        result = db.companies.update_one(
-            {"_id": object_id},
-            {"$set": update_data}
-        )
-        
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Company not found")
-    
-    company = db.companies.find_one({"_id": object_id})
+        company = await companies.update(object_id, update_data)
+    else:
+        company = await companies.get(object_id)
+    
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
@@ -105,7 +117,7 @@ async def delete_company(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid company ID")
     
-    result = db.companies.delete_one({"_id": object_id})
+    result = await CompanyRepository(db).delete(object_id)
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -1,54 +1,127 @@
 import logging
 import os
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Query, Request, Response, status
 from fastapi.responses import StreamingResponse
-from gridfs import GridFS
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
 from pymongo.errors import DuplicateKeyError
-import magic
-import hashlib
-import io
 
 from core.database import get_database
 from core.config import settings
+from core.conditional import ByteRange, etag_matches, hash_etag, http_date, if_range_matches, not_modified, parse_range
+from core.pagination import rename_id, wants_ndjson
+from core.read_policy import get_causal_session, reporting_db
+from repositories.file_repository import FileMetadataRepository
+from repositories.upload_token_repository import UploadTokenRepository
+from schemas.upload import UploadHandshake, UploadSessionCreate
+from services.blob_service import DocumentBlobStore
+from services.resumable_upload_service import UPLOAD_OFFSET_HEADER, ResumableUploadService
+from services.upload_service import (
+    PendingUpload,
+    file_too_large,
+    gridfs_metadata,
+    max_file_size,
+    stream_gridfs_range,
+    stream_upload_to_gridfs
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
-def validate_pdf_file(file: UploadFile) -> bool:
-    """Validate if the uploaded file is a PDF"""
+PDF_CONTENT_TYPE = "application/pdf"
+
+async def save_pending_upload(
+    files: FileMetadataRepository,
+    pending: PendingUpload,
+    filename: str,
+    document_type: str
+) -> Dict:
+    """Keep a streamed upload unless its content is already stored; returns the upload response"""
+    stored = pending.stored
+    
+    # Store metadata in separate collection for easier querying
+    metadata_doc = {
+        "_id": stored.file_id,
+        "filename": filename,
+        "original_filename": filename,
+        "document_type": document_type,
+        "file_size": stored.size,
+        "file_hash": stored.sha256,
+        "content_type": PDF_CONTENT_TYPE,
+        "uploaded_at": datetime.utcnow(),
+        "status": "uploaded",
+        "ref_count": 0
+    }
+    
+    # Content-addressed: the unique file_hash index lets exactly one upload of
+    # this content claim it; everyone else gets the stored file
+    existing_file = await files.find_by_hash(stored.sha256)
+    if existing_file:
+        await pending.abort()
+        logger.info(f"File with hash {stored.sha256} already exists, returning existing ID")
+        return existing_file_response(existing_file)
+    
+    # The GridFS file is committed before the metadata claims the hash, so a
+    # file ID found by hash (by an upload, handshake or finalize) always has
+    # its bytes stored
     try:
-        # Read first few bytes to check file type
-        file_content = file.file.read(2048)
-        file.file.seek(0)  # Reset file pointer
-        
-        # Check MIME type
-        mime = magic.Magic(mime=True)
-        file_type = mime.from_buffer(file_content)
-        
-        return file_type == 'application/pdf'
-    except Exception as e:
-        logger.error(f"Error validating file: {e}")
-        return False
+        await pending.commit(gridfs_metadata(stored, document_type, filename))
+    except Exception:
+        # Whatever of the file the failed commit left behind
+        await pending.discard()
+        raise
+    try:
+        await files.insert(metadata_doc)
+    except DuplicateKeyError:
+        # Another upload of the same content claimed the hash meanwhile
+        await pending.discard()
+        existing_file = await files.find_by_hash(stored.sha256)
+        if not existing_file:
+            raise
+        logger.info(f"File with hash {stored.sha256} stored concurrently, returning existing ID")
+        return existing_file_response(existing_file)
+    except Exception:
+        await pending.discard()
+        raise
+    
+    logger.info(f"Successfully uploaded file {filename} with ID {stored.file_id}")
+    
+    return {
+        "file_id": str(stored.file_id),
+        "filename": filename,
+        "file_size": stored.size,
+        "file_hash": stored.sha256,
+        "message": "File uploaded successfully"
+    }
+
+def resumable_uploads(db, session) -> ResumableUploadService:
+    return ResumableUploadService(db, session, allowed_types=[PDF_CONTENT_TYPE])
 
-def calculate_file_hash(file_content: bytes) -> str:
-    """Calculate SHA-256 hash of file content"""
-    sha256_hash = hashlib.sha256()
-    sha256_hash.update(file_content)
-    return sha256_hash.hexdigest()
+def existing_file_response(existing_file: Dict) -> Dict:
+    return {
+        "file_id": str(existing_file["_id"]),
+        "filename": existing_file["filename"],
+        "message": "File already exists"
+    }
 
 @router.post("/document")
 async def upload_document(
     file: UploadFile = File(...),
     document_type: str = Form(...),
-    db = Depends(get_database)
+    db = Depends(get_database),
+    session = Depends(get_causal_session)
 ):
     """
     Upload a PDF document and save it to MongoDB using GridFS
+    
+    The file is copied into GridFS chunk by chunk while it is type-checked,
+    size-checked and hashed, so memory per upload stays at about one chunk.
+    Clients that can hash the file first should use ``POST /upload/handshake``,
+    which skips sending content the server already has.
     """
     try:
         # Validate file
@@ -58,123 +131,313 @@ async def upload_document(
                 detail="No file provided"
             )
         
-        # Check file size (10MB limit)
-        file_content = await file.read()
-        file_size = len(file_content)
+        fs = AsyncIOMotorGridFSBucket(db, bucket_name="documents")
+        pending = await stream_upload_to_gridfs(
+            file, fs, allowed_types=[PDF_CONTENT_TYPE], max_size=max_file_size(document_type), session=session
+        )
+        files = FileMetadataRepository(db, session)
+        return await save_pending_upload(files, pending, file.filename, document_type)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error uploading document: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to upload document: {str(e)}"
+        )
+
+@router.post("/handshake")
+async def upload_handshake(
+    handshake: UploadHandshake,
+    db = Depends(get_database),
+    session = Depends(get_causal_session)
+):
+    """
+    Hash-first upload, phase 1: declare a file's SHA-256 and size
+    
+    If that content is already stored its file ID comes back (``status:
+    stored``) and no bytes need to be sent. Otherwise (``status:
+    upload_required``) send the file to ``POST /upload/handshake/{upload_token}``
+    before ``expires_at``; it is kept only if it matches what was declared.
+    """
+    try:
+        if handshake.size > max_file_size(handshake.document_type):
+            raise file_too_large(max_file_size(handshake.document_type))
+        
+        existing_file = await FileMetadataRepository(db, session).find_by_hash(handshake.sha256)
+        if existing_file:
+            logger.info(f"Handshake for stored hash {handshake.sha256}, no upload needed")
+            return dict(existing_file_response(existing_file), status="stored")
+        
+        token = await UploadTokenRepository(db, session).issue(
+            handshake.model_dump(), settings.UPLOAD_TOKEN_TTL_SECONDS
+        )
+        return {
+            "status": "upload_required",
+            "upload_token": token["_id"],
+            "expires_at": token["expires_at"]
+        }
         
-        if file_size > settings.MAX_FILE_SIZE:
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting upload handshake: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to start upload: {str(e)}"
+        )
+
+@router.post("/handshake/{upload_token}")
+async def upload_handshake_content(
+    upload_token: str,
+    file: UploadFile = File(...),
+    db = Depends(get_database),
+    session = Depends(get_causal_session)
+):
+    """
+    Hash-first upload, phase 2: send the bytes for an ``upload_token``
+    
+    The token is single-use. The file is streamed into GridFS like ``POST
+    /upload/document`` and discarded (400) unless its SHA-256 and size are the
+    ones declared in the handshake.
+    """
+    try:
+        declared = await UploadTokenRepository(db, session).take(upload_token)
+        if not declared:
             raise HTTPException(
-                status_code=400,
-                detail=f"File size {file_size} bytes exceeds maximum allowed size of {settings.MAX_FILE_SIZE} bytes"
+                status_code=404,
+                detail="Upload token not found or expired"
             )
         
-        # Reset file pointer and validate PDF
-        file.file = io.BytesIO(file_content)
-        if not validate_pdf_file(file):
+        fs = AsyncIOMotorGridFSBucket(db, bucket_name="documents")
+        pending = await stream_upload_to_gridfs(
+            file, fs, allowed_types=[PDF_CONTENT_TYPE], max_size=declared["size"], session=session
+        )
+        if (pending.stored.sha256, pending.stored.size) != (declared["sha256"], declared["size"]):
+            await pending.abort()
             raise HTTPException(
                 status_code=400,
-                detail="Only PDF files are allowed"
+                detail="Uploaded file does not match the declared SHA-256 and size"
             )
         
-        # Calculate file hash
-        file_hash = calculate_file_hash(file_content)
+        files = FileMetadataRepository(db, session)
+        return await save_pending_upload(files, pending, declared["filename"], declared["document_type"])
         
-        # Check if file with same hash already exists
-        existing_file = db.file_metadata.find_one({"file_hash": file_hash})
-        if existing_file:
-            logger.info(f"File with hash {file_hash} already exists, returning existing ID")
-            return {
-                "file_id": str(existing_file["_id"]),
-                "filename": existing_file["filename"],
-                "message": "File already exists"
-            }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error uploading handshake content: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to upload document: {str(e)}"
+        )
+
+@router.post("/sessions", status_code=201)
+async def create_upload_session(
+    upload: UploadSessionCreate,
+    response: Response,
+    db = Depends(get_database),
+    session = Depends(get_causal_session)
+):
+    """
+    Start a resumable upload for large files (e.g. bank statements)
+    
+    Send the bytes with ``PATCH /upload/sessions/{upload_id}`` and an
+    ``Upload-Offset`` header, check progress with ``GET``, then ``POST
+    .../complete``. If ``sha256`` names content that is already stored, its
+    file ID is returned (200, ``status: stored``) and no session is opened.
+    """
+    try:
+        if upload.sha256:
+            existing_file = await FileMetadataRepository(db, session).find_by_hash(upload.sha256)
+            if existing_file:
+                response.status_code = 200
+                return dict(existing_file_response(existing_file), status="stored")
         
-        # Initialize GridFS
-        fs = GridFS(db, collection="documents")
-        
-        # Store file in GridFS
-        file_id = fs.put(
-            file_content,
-            filename=file.filename,
-            content_type="application/pdf",
-            metadata={
-                "document_type": document_type,
-                "original_filename": file.filename,
-                "file_size": file_size,
-                "file_hash": file_hash,
-                "uploaded_at": datetime.utcnow()
-            }
+        created = await resumable_uploads(db, session).create(
+            upload.filename, upload.document_type, upload.size, upload.sha256
         )
+        response.headers["Location"] = f"{settings.API_V1_STR}{router.prefix}/sessions/{created['upload_id']}"
+        response.headers[UPLOAD_OFFSET_HEADER] = "0"
+        return dict(created, status="upload_required")
         
-        # Store metadata in separate collection for easier querying
-        metadata_doc = {
-            "_id": file_id,
-            "filename": file.filename,
-            "original_filename": file.filename,
-            "document_type": document_type,
-            "file_size": file_size,
-            "file_hash": file_hash,
-            "content_type": "application/pdf",
-            "uploaded_at": datetime.utcnow(),
-            "status": "uploaded"
-        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating upload session: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to create upload session: {str(e)}"
+        )
+
+@router.get("/sessions/{upload_id}")
+async def get_upload_session(
+    upload_id: str,
+    response: Response,
+    db = Depends(get_database),
+    session = Depends(get_causal_session)
+):
+    """
+    Progress of a resumable upload: ``offset`` (also the ``Upload-Offset``
+    header) is where the next PATCH must start
+    """
+    try:
+        progress = await resumable_uploads(db, session).status(upload_id)
+        response.headers[UPLOAD_OFFSET_HEADER] = str(progress["offset"])
+        return progress
         
-        db.file_metadata.insert_one(metadata_doc)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting upload session: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get upload session: {str(e)}"
+        )
+
+@router.patch("/sessions/{upload_id}")
+async def append_upload_session(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., alias=UPLOAD_OFFSET_HEADER),
+    db = Depends(get_database),
+    session = Depends(get_causal_session)
+):
+    """
+    Send the next bytes of a resumable upload as the raw request body
+    
+    ``Upload-Offset`` must equal the session's offset (409 with the current
+    one otherwise). The body is streamed to GridFS chunk by chunk and may be
+    any length up to the declared size; if the request breaks off, query the
+    offset and continue from there.
+    """
+    try:
+        progress = await resumable_uploads(db, session).append(upload_id, upload_offset, request.stream())
+        response.headers[UPLOAD_OFFSET_HEADER] = str(progress["offset"])
+        return progress
         
-        logger.info(f"Successfully uploaded file {file.filename} with ID {file_id}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error appending to upload session: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to store upload data: {str(e)}"
+        )
+
+@router.post("/sessions/{upload_id}/complete")
+async def complete_upload_session(
+    upload_id: str,
+    db = Depends(get_database),
+    session = Depends(get_causal_session)
+):
+    """
+    Finish a resumable upload once every byte is received
+    
+    The file is hashed from the stored chunks, checked against the declared
+    SHA-256, and then stored like ``POST /upload/document`` (an identical file
+    already stored is returned instead).
+    """
+    try:
+        pending = await resumable_uploads(db, session).finalize(upload_id)
+        files = FileMetadataRepository(db, session)
+        return await save_pending_upload(files, pending, pending.upload["filename"], pending.upload["document_type"])
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error completing upload session: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to complete upload: {str(e)}"
+        )
+
+@router.delete("/sessions/{upload_id}")
+async def cancel_upload_session(
+    upload_id: str,
+    db = Depends(get_database),
+    session = Depends(get_causal_session)
+):
+    """
+    Abandon a resumable upload and discard the data received so far
+    """
+    try:
+        await resumable_uploads(db, session).cancel(upload_id)
         return {
-            "file_id": str(file_id),
-            "filename": file.filename,
-            "file_size": file_size,
-            "file_hash": file_hash,
-            "message": "File uploaded successfully"
+            "message": "Upload cancelled",
+            "upload_id": upload_id
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error uploading document: {str(e)}", exc_info=True)
+        logger.error(f"Error cancelling upload session: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to upload document: {str(e)}"
+            detail=f"Failed to cancel upload: {str(e)}"
         )
 
 @router.get("/document/{file_id}")
 async def get_document(
     file_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
     db = Depends(get_database)
 ):
     """
     Retrieve a document from MongoDB GridFS
+    
+    Supports a single ``Range`` (206 with ``Content-Range``; 416 past the end),
+    guarded by ``If-Range`` against the file hash ETag or ``Last-Modified``, so
+    viewers can fetch pages lazily and resume interrupted downloads. The body is
+    read chunk by chunk with the next GridFS chunk prefetched.
     """
     try:
         # Initialize GridFS
-        fs = GridFS(db, collection="documents")
+        fs = AsyncIOMotorGridFSBucket(db, bucket_name="documents")
         
         # Get file from GridFS
         try:
-            file_obj = fs.get(ObjectId(file_id))
+            file_obj = await fs.open_download_stream(ObjectId(file_id))
         except Exception:
             raise HTTPException(
                 status_code=404,
                 detail="Document not found"
             )
         
-        # Create streaming response
-        def generate_file_stream():
-            while True:
-                chunk = file_obj.read(1024)
-                if not chunk:
-                    break
-                yield chunk
+        metadata = file_obj.metadata or {}
+        etag = hash_etag(metadata["file_hash"]) if metadata.get("file_hash") else None
+        last_modified = http_date(file_obj.upload_date)
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Disposition": f"attachment; filename={file_obj.filename}",
+            "Last-Modified": last_modified
+        }
+        if etag:
+            headers["ETag"] = etag
+        
+        size = file_obj.length
+        byte_range = None
+        if if_range_matches(if_range, etag, last_modified):
+            byte_range = parse_range(range_header, size)
+        if byte_range is None:
+            byte_range, status_code = ByteRange(0, size), 200
+        else:
+            headers["Content-Range"] = byte_range.content_range(size)
+            status_code = 206
+        headers["Content-Length"] = str(byte_range.stop - byte_range.start)
         
         return StreamingResponse(
-            generate_file_stream(),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={file_obj.filename}"
-            }
+            stream_gridfs_range(file_obj, byte_range.start, byte_range.stop),
+            status_code=status_code,
+            media_type=metadata.get("content_type", PDF_CONTENT_TYPE),
+            headers=headers
         )
         
     except HTTPException:
@@ -189,14 +452,28 @@ async def get_document(
 @router.get("/document/{file_id}/info")
 async def get_document_info(
     file_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db = Depends(get_database)
 ):
     """
     Get document metadata without downloading the file
+    
+    The response describes the stored content only (reference counts are
+    left out), which cannot change for a given file, so its ETag is the
+    file's SHA-256; ``If-None-Match`` is answered with 304 from a read of just
+    the hash.
     """
     try:
+        files = FileMetadataRepository(db)
+        
+        if if_none_match:
+            file_hash = await files.get_hash(file_id)
+            if file_hash and etag_matches(if_none_match, hash_etag(file_hash)):
+                return not_modified(hash_etag(file_hash))
+        
         # Get metadata from our custom collection
-        metadata = db.file_metadata.find_one({"_id": ObjectId(file_id)})
+        metadata = await files.get_info(file_id)
         
         if not metadata:
             raise HTTPException(
@@ -208,6 +485,8 @@ async def get_document_info(
         metadata["file_id"] = str(metadata["_id"])
         del metadata["_id"]
         
+        if metadata.get("file_hash"):
+            response.headers["ETag"] = hash_etag(metadata["file_hash"])
         return metadata
         
     except HTTPException:
@@ -222,26 +501,18 @@ async def get_document_info(
 @router.delete("/document/{file_id}")
 async def delete_document(
     file_id: str,
-    db = Depends(get_database)
+    db = Depends(get_database),
+    session = Depends(get_causal_session)
 ):
     """
     Delete a document from MongoDB GridFS
+    
+    Only files no onboarding record references can be deleted (409 otherwise);
+    detaching the last reference deletes a file automatically.
     """
     try:
-        # Initialize GridFS
-        fs = GridFS(db, collection="documents")
-        
-        # Delete file from GridFS
-        try:
-            fs.delete(ObjectId(file_id))
-        except Exception:
-            raise HTTPException(
-                status_code=404,
-                detail="Document not found"
-            )
-        
-        # Delete metadata
-        db.file_metadata.delete_one({"_id": ObjectId(file_id)})
+        # Files are shared by content; refuse while any onboarding record uses this one
+        await DocumentBlobStore(db, session).delete(file_id)
         
         logger.info(f"Successfully deleted document {file_id}")
         
@@ -262,31 +533,48 @@ async def delete_document(
 @router.get("/documents")
 async def list_documents(
     document_type: Optional[str] = None,
-    db = Depends(get_database)
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    response_format: str = Query("json", alias="format"),
+    accept: Optional[str] = Header(None),
+    db = Depends(reporting_db("documents_list")),
+    session = Depends(get_causal_session)
 ):
     """
-    List all uploaded documents with optional filtering by document type
+    List uploaded documents, newest first, with optional filtering by document type.
+    
+    Paged by ``cursor``/``next_cursor``; ``fields`` selects fields and
+    ``format=ndjson`` streams all matches as NDJSON. Reads may be served by a
+    secondary; send ``X-Consistency-Token`` to see your own uploads.
     """
     try:
         query = {}
         if document_type:
             query["document_type"] = document_type
         
-        documents = list(db.file_metadata.find(query).sort("uploaded_at", -1))
+        files = FileMetadataRepository(db, session)
+        if wants_ndjson(response_format, accept):
+            return files.stream(query, cursor, fields, transform=rename_id("file_id"))
+        
+        page = await files.list_page(query, limit, cursor, fields)
         
         # Convert ObjectId to string for response
-        for doc in documents:
+        for doc in page.items:
             doc["file_id"] = str(doc["_id"])
             del doc["_id"]
         
         return {
-            "documents": documents,
-            "total": len(documents)
+            "documents": page.items,
+            "count": len(page.items),
+            "next_cursor": page.next_cursor
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing documents: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to list documents: {str(e)}"
-        ) 
\ No newline at end of file
+        )
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Compliance score latency for a large tenant: aggregate-on-read vs precomputed counters.
+
+"Before" mirrors the old endpoint: count tasks and events per status on every call,
+then write the score back. "After" is BusinessService.get_compliance_score, which
+reads the score kept current by $inc on task/event writes.
+
+Usage (from the backend directory):
+    python -m benchmarks.compliance_score_benchmark --tasks 10000 --events 1000 --iterations 200
+
+Uses MONGODB_URL from settings unless --url is given. Works in a scratch database
+that is dropped afterwards.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+from core.config import settings
+from core.migrations import migrate
+from services.business_service import BusinessService
+from services.compliance_service import ComplianceReconciler
+
+SCRATCH_DB = "_bench_compliance_score"
+
+STATUSES = ["pending", "in_progress", "completed", "overdue"]
+
+def seed(sync_db, business_id: ObjectId, tasks: int, events: int):
+    now = datetime.utcnow()
+    sync_db.businesses.insert_one({"_id": business_id, "name": "Bench Pvt Ltd"})
+    sync_db.business_tasks.insert_many([
+        {
+            "business_id": business_id,
+            "title": f"Task {i}",
+            "priority": "normal",
+            "status": random.choice(STATUSES),
+            "due_date": now + timedelta(days=random.randint(-30, 90))
+        }
+        for i in range(tasks)
+    ])
+    if events:
+        sync_db.compliance_events.insert_many([
+            {
+                "business_id": business_id,
+                "title": f"Event {i}",
+                "description": "bench",
+                "event_type": "filing",
+                "status": random.choice(STATUSES),
+                "due_date": now + timedelta(days=random.randint(-30, 90))
+            }
+            for i in range(events)
+        ])
+
+async def aggregate_on_read(db, business_id: ObjectId) -> float:
+    total = completed = 0
+    for collection in (db.business_tasks, db.compliance_events):
+        async for doc in collection.aggregate([
+            {"$match": {"business_id": business_id}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]):
+            total += doc["count"]
+            if doc["_id"] == "completed":
+                completed += doc["count"]
+    score = (completed / total) * 100 if total else 100.0
+    await db.businesses.update_one({"_id": business_id}, {"$set": {"compliance_score": score}})
+    return score
+
+async def measure(label: str, call, iterations: int) -> float:
+    await call()  # warm up
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<32} p50 {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms")
+    return p95
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=settings.MONGODB_URL)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    sync_client = MongoClient(args.url)
+    client = AsyncIOMotorClient(args.url)
+    db = client[SCRATCH_DB]
+    business_id = ObjectId()
+
+    try:
+        sync_client.drop_database(SCRATCH_DB)
+        migrate(sync_client[SCRATCH_DB])
+        seed(sync_client[SCRATCH_DB], business_id, args.tasks, args.events)
+        await ComplianceReconciler(db).reconcile([str(business_id)])
+
+        service = BusinessService(db)
+        before_score = await aggregate_on_read(db, business_id)
+        after_score = await service.get_compliance_score(str(business_id))
+        assert abs(before_score - after_score) < 1e-9, (before_score, after_score)
+
+        print(f"{args.tasks} tasks, {args.events} events, {args.iterations} calls each")
+        before = await measure("before: aggregate + write-back", lambda: aggregate_on_read(db, business_id), args.iterations)
+        after = await measure("after: precomputed score", lambda: service.get_compliance_score(str(business_id)), args.iterations)
+        print(f"p95 speedup: {before / after:.1f}x")
+    finally:
+        sync_client.drop_database(SCRATCH_DB)
+        sync_client.close()
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
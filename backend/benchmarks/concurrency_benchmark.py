@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Concurrent throughput benchmark: blocking pymongo vs Motor inside coroutines.
+
+"Before" mirrors the old handlers: `async def` code calling synchronous pymongo,
+so every query blocks the event loop. "After" runs the same queries through
+Motor so in-flight requests overlap.
+
+Usage (from the backend directory):
+    python -m benchmarks.concurrency_benchmark --requests 2000 --concurrency 200
+
+Uses MONGODB_URL / MONGODB_DB_NAME from settings unless --url/--db are given.
+Writes only to a scratch collection that is dropped afterwards.
+"""
+
+import argparse
+import asyncio
+import time
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+from core.config import settings
+
+COLLECTION = "_bench_concurrency"
+
+def seed(sync_db, count: int) -> list:
+    ids = [ObjectId() for _ in range(count)]
+    sync_db[COLLECTION].insert_many(
+        [{"_id": _id, "businessName": f"Bench {i}", "status": "in_progress"} for i, _id in enumerate(ids)]
+    )
+    return ids
+
+async def run(label: str, query, ids: list, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await query(ids[i % len(ids)])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {total} requests in {elapsed:.2f}s -> {total / elapsed:,.0f} req/s")
+    return total / elapsed
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=settings.MONGODB_URL)
+    parser.add_argument("--db", default=settings.MONGODB_DB_NAME)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--docs", type=int, default=500)
+    args = parser.parse_args()
+
+    sync_client = MongoClient(args.url, maxPoolSize=args.concurrency)
+    async_client = AsyncIOMotorClient(args.url, maxPoolSize=args.concurrency)
+    sync_db = sync_client[args.db]
+    async_db = async_client[args.db]
+
+    try:
+        ids = seed(sync_db, args.docs)
+
+        async def blocking_find(_id):
+            sync_db[COLLECTION].find_one({"_id": _id})
+
+        async def motor_find(_id):
+            await async_db[COLLECTION].find_one({"_id": _id})
+
+        # Warm both pools so connection setup is not measured
+        await run("warmup (pymongo)", blocking_find, ids, 50, 1)
+        await run("warmup (motor)", motor_find, ids, args.concurrency, args.concurrency)
+
+        before = await run("before: blocking pymongo", blocking_find, ids, args.requests, args.concurrency)
+        after = await run("after: motor", motor_find, ids, args.requests, args.concurrency)
+        print(f"speedup: {after / before:.1f}x at concurrency {args.concurrency}")
+    finally:
+        sync_db.drop_collection(COLLECTION)
+        sync_client.close()
+        async_client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Dashboard latency for a large tenant: sequential service calls vs one aggregation.
+
+"Before" mirrors the old handler: load the business, then document stats,
+compliance score and upcoming tasks one after another, then recent activity.
+"After" is BusinessService.get_dashboard with the cache disabled (one $lookup/$facet
+aggregation), and "cached" is the same with DASHBOARD_CACHE_TTL_SECONDS applied.
+Target: p95 under 30 ms for the uncached path.
+
+Usage (from the backend directory):
+    python -m benchmarks.dashboard_benchmark --tasks 10000 --documents 2000 --iterations 200
+
+Uses MONGODB_URL from settings unless --url is given. Works in a scratch database
+that is dropped afterwards.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+from core.config import settings
+from core.migrations import migrate
+from services import business_service as business_service_module
+from services.business_service import BusinessService
+from services.compliance_service import ComplianceReconciler
+from services.document_stats_service import DocumentStatsRebuilder
+
+SCRATCH_DB = "_bench_dashboard"
+
+STATUSES = ["pending", "in_progress", "completed", "overdue"]
+PRIORITIES = ["urgent", "high", "normal", "low"]
+DOC_TYPES = ["pan_card", "gst_certificate", "bank_statement", "itr", "contract"]
+
+def seed(sync_db, business_id: ObjectId, tasks: int, documents: int):
+    now = datetime.utcnow()
+    sync_db.businesses.insert_one({
+        "_id": business_id,
+        "name": "Bench Pvt Ltd",
+        "business_type": "Pvt Ltd",
+        "industry": "Manufacturing",
+        "incorporation_date": datetime(2020, 1, 1)
+    })
+    sync_db.business_tasks.insert_many([
+        {
+            "business_id": business_id,
+            "title": f"Task {i}",
+            "priority": random.choice(PRIORITIES),
+            "status": random.choice(STATUSES),
+            "due_date": now + timedelta(days=random.randint(-30, 90))
+        }
+        for i in range(tasks)
+    ])
+    sync_db.business_documents.insert_many([
+        {
+            "business_id": business_id,
+            "name": f"doc-{i}.pdf",
+            "doc_type": random.choice(DOC_TYPES),
+            "file_path": f"uploads/{i}.pdf",
+            "mime_type": "application/pdf",
+            "size": random.randint(10_000, 2_000_000),
+            "upload_date": now - timedelta(minutes=i),
+            "ocr_status": random.choice(["completed", "pending", "failed"])
+        }
+        for i in range(documents)
+    ])
+
+async def sequential_dashboard(service: BusinessService, db, business_id: str):
+    await service.get_business_by_id(business_id)
+    await service.get_document_stats(business_id)
+    await service.get_compliance_score(business_id)
+    await service.get_upcoming_tasks(business_id)
+    for collection in (db.business_documents, db.business_tasks, db.compliance_events):
+        await collection.find({"business_id": ObjectId(business_id)}).sort("_id", -1).limit(3).to_list(length=3)
+
+async def measure(label: str, call, iterations: int) -> float:
+    await call()  # warm up
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<32} p50 {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms")
+    return p95
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=settings.MONGODB_URL)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    sync_client = MongoClient(args.url)
+    client = AsyncIOMotorClient(args.url)
+    db = client[SCRATCH_DB]
+    business_id = ObjectId()
+
+    try:
+        sync_client.drop_database(SCRATCH_DB)
+        migrate(sync_client[SCRATCH_DB])
+        seed(sync_client[SCRATCH_DB], business_id, args.tasks, args.documents)
+        await ComplianceReconciler(db).reconcile([str(business_id)])
+        await DocumentStatsRebuilder(db).rebuild([str(business_id)])
+
+        service = BusinessService(db)
+        cache = business_service_module.dashboard_cache
+        print(f"{args.tasks} tasks, {args.documents} documents, {args.iterations} calls each")
+
+        before = await measure(
+            "before: sequential calls", lambda: sequential_dashboard(service, db, str(business_id)), args.iterations
+        )
+
+        ttl, cache.ttl = cache.ttl, 0
+        after = await measure("after: one aggregation", lambda: service.get_dashboard(str(business_id)), args.iterations)
+        cache.ttl = ttl
+        await measure("after: cached", lambda: service.get_dashboard(str(business_id)), args.iterations)
+
+        print(f"p95 speedup (uncached): {before / after:.1f}x; target p95 < 30 ms: {'met' if after < 30 else 'missed'}")
+    finally:
+        sync_client.drop_database(SCRATCH_DB)
+        sync_client.close()
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
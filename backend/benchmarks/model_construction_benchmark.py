@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Model construction cost: validated ``Model(**doc)`` vs trusted ``Model.from_db(doc)``.
+
+Builds realistic stored business profiles (address, contact and bank details,
+PAN/GSTIN) and times both paths on the same inputs, for one profile and for a
+page of them. Pure CPU; no database needed.
+
+Usage (from the backend directory):
+    python -m benchmarks.model_construction_benchmark --page-size 50 --repeat 7
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+from schemas.business import Business
+
+def business_document() -> dict:
+    now = datetime.utcnow()
+    return {
+        "_id": ObjectId(),
+        "id": str(ObjectId()),
+        "name": "Bench Manufacturing Pvt Ltd",
+        "business_type": "Pvt Ltd",
+        "industry": "Manufacturing",
+        "incorporation_date": now - timedelta(days=2000),
+        "pan_number": "ABCDE1234F",
+        "gstin": "29ABCDE1234F1Z5",
+        "address": {
+            "street": "12 Industrial Area",
+            "city": "Bengaluru",
+            "state": "Karnataka",
+            "postal_code": "560058",
+            "country": "India"
+        },
+        "contact_info": {"email": "accounts@bench.example.com", "phone": "+919876543210", "website": None},
+        "bank_details": {
+            "account_name": "Bench Manufacturing Pvt Ltd",
+            "account_number": "123456789012",
+            "ifsc_code": "HDFC0001234",
+            "bank_name": "HDFC Bank",
+            "branch": "Peenya"
+        },
+        "compliance_score": 82.5,
+        "settings": {"ocr_enabled": True, "blockchain_enabled": False, "notification_preferences": {}, "retention_policy": {}},
+        "created_at": now,
+        "updated_at": now,
+        "status": "active",
+        "onboarding_completed": True
+    }
+
+def measure(label: str, call, number: int, repeat: int) -> float:
+    timings = [
+        min(_timed(call) for _ in range(number)) * 1_000_000
+        for _ in range(repeat)
+    ]
+    median = statistics.median(timings)
+    print(f"{label:<44} {median:9.1f} us")
+    return median
+
+def _timed(call) -> float:
+    started = time.perf_counter()
+    call()
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=50, help="Profiles per page")
+    parser.add_argument("--number", type=int, default=50, help="Calls per sample (best of)")
+    parser.add_argument("--repeat", type=int, default=7, help="Samples (median reported)")
+    args = parser.parse_args()
+
+    business = business_document()
+    page = [business_document() for _ in range(args.page_size)]
+
+    # Both paths must produce the same serialized output
+    assert Business(**business).model_dump() == Business.from_db(business).model_dump()
+
+    print(f"median of {args.repeat} samples, best of {args.number} calls each")
+    rows = [
+        ("Business profile", lambda: Business(**business), lambda: Business.from_db(business)),
+        (f"Page of {args.page_size} profiles", lambda: [Business(**doc) for doc in page], lambda: [Business.from_db(doc) for doc in page]),
+    ]
+    for label, validated, trusted in rows:
+        before = measure(f"{label}: validated", validated, args.number, args.repeat)
+        after = measure(f"{label}: trusted", trusted, args.number, args.repeat)
+        print(f"{'':<44} {before / after:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Peak memory of concurrent document uploads: buffered vs streamed into GridFS.
+
+"Before" mirrors the old handler: read the whole body, wrap it in BytesIO, sniff,
+hash the buffer, then upload_from_stream. "After" is services.upload_service's
+stream_upload_to_gridfs, which copies one GridFS chunk at a time while sniffing
+and hashing. Both receive the same Starlette UploadFiles (spooled to disk, as
+the multipart parser leaves them) and peak Python allocations are traced.
+
+Usage (from the backend directory):
+    python -m benchmarks.upload_memory_benchmark --uploads 100 --size-mb 10
+
+Uses MONGODB_URL from settings unless --url is given. Works in a scratch database
+that is dropped afterwards. Needs uploads x size of free temp disk space.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from pymongo import MongoClient
+from starlette.datastructures import UploadFile
+import magic
+
+from core.config import settings
+from services.upload_service import gridfs_metadata, stream_upload_to_gridfs
+
+SCRATCH_DB = "_bench_upload_memory"
+
+# Starlette's multipart parser spools files above this to disk
+SPOOL_MAX_SIZE = 1024 * 1024
+
+def make_uploads(count: int, size: int) -> list:
+    uploads = []
+    for i in range(count):
+        spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        spooled.write(b"%PDF-1.4\n%bench\n")
+        # Distinct content per file so nothing dedups
+        block = os.urandom(64 * 1024)
+        written = spooled.tell()
+        while written < size:
+            piece = block[: size - written]
+            spooled.write(piece)
+            written += len(piece)
+        spooled.seek(0)
+        uploads.append(UploadFile(file=spooled, filename=f"statement_{i}.pdf", size=size))
+    return uploads
+
+async def buffered(fs, file: UploadFile):
+    content = await file.read()
+    if len(content) > settings.MAX_FILE_SIZE:
+        raise ValueError("too large")
+    buffer = io.BytesIO(content)
+    head = buffer.read(2048)
+    buffer.seek(0)
+    magic.Magic(mime=True).from_buffer(head)
+    file_hash = hashlib.sha256(content).hexdigest()
+    await fs.upload_from_stream(file.filename, content, metadata={"file_hash": file_hash})
+
+async def streamed(fs, file: UploadFile):
+    pending = await stream_upload_to_gridfs(file, fs, ["application/pdf"], settings.MAX_FILE_SIZE)
+    await pending.commit(gridfs_metadata(pending.stored, "bank_statement", file.filename))
+
+async def run(label: str, upload, fs, uploads: list, concurrency: int):
+    for file in uploads:
+        await file.seek(0)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(file):
+        async with semaphore:
+            await upload(fs, file)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(one(file) for file in uploads))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<10} {len(uploads)} uploads in {elapsed:6.2f}s   "
+        f"peak {peak / 2**20:8.1f} MiB   ({peak / 2**20 / min(len(uploads), concurrency):6.2f} MiB per in-flight upload)"
+    )
+    return peak
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=settings.MONGODB_URL)
+    parser.add_argument("--uploads", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--size-mb", type=float, default=10)
+    args = parser.parse_args()
+
+    size = min(int(args.size_mb * 2**20), settings.MAX_FILE_SIZE)
+    sync_client = MongoClient(args.url)
+    client = AsyncIOMotorClient(args.url, maxPoolSize=args.concurrency)
+    fs = AsyncIOMotorGridFSBucket(client[SCRATCH_DB], bucket_name="documents")
+    uploads = make_uploads(args.uploads, size)
+
+    try:
+        sync_client.drop_database(SCRATCH_DB)
+        print(f"{args.uploads} uploads of {size / 2**20:.1f} MiB, {args.concurrency} concurrent")
+        before = await run("buffered", buffered, fs, uploads, args.concurrency)
+        sync_client.drop_database(SCRATCH_DB)
+        after = await run("streamed", streamed, fs, uploads, args.concurrency)
+        print(f"peak memory reduction: {before / after:.1f}x")
+    finally:
+        for file in uploads:
+            await file.close()
+        sync_client.drop_database(SCRATCH_DB)
+        sync_client.close()
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
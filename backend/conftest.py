@@ -0,0 +1,51 @@
+"""
+Shared fixtures for the MongoDB-backed tests.
+
+They need a disposable MongoDB (TEST_MONGODB_URL, default
+mongodb://localhost:27017) and are skipped when none is reachable.
+"""
+
+import asyncio
+import os
+import re
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+from core.migrations import migrate
+
+TEST_MONGODB_URL = os.getenv("TEST_MONGODB_URL", "mongodb://localhost:27017")
+
+@pytest.fixture
+def mongo(request):
+    """``mongo(scenario)`` runs ``await scenario(db)`` against a fresh, migrated database.
+
+    The database is named after the test and dropped afterwards. Pass
+    ``event_listeners`` to watch the commands the scenario issues.
+    """
+    db_name = re.sub(r"\W", "_", f"legalease_test_{request.node.name}")[:60]
+
+    def run(scenario, event_listeners=()):
+        async def main():
+            client = AsyncIOMotorClient(
+                TEST_MONGODB_URL, serverSelectionTimeoutMS=1000, event_listeners=list(event_listeners)
+            )
+            try:
+                await client.admin.command("ping")
+            except Exception:
+                client.close()
+                pytest.skip(f"No MongoDB reachable at {TEST_MONGODB_URL}")
+            sync_client = MongoClient(TEST_MONGODB_URL)
+            try:
+                sync_client.drop_database(db_name)
+                migrate(sync_client[db_name])
+                await scenario(client[db_name])
+            finally:
+                sync_client.drop_database(db_name)
+                sync_client.close()
+                client.close()
+
+        asyncio.run(main())
+
+    return run
@@ -0,0 +1,192 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+class TTLCache:
+    """Small in-process cache whose entries expire ``ttl`` seconds after being stored.
+
+    ``get_or_load`` also coalesces concurrent misses for the same key, so a burst of
+    refreshes costs a single load.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if len(self._entries) >= self.maxsize and key not in self._entries:
+            self._evict()
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at < now]:
+            del self._entries[key]
+        if len(self._entries) >= self.maxsize:
+            # Still full: drop the entry closest to expiry
+            del self._entries[min(self._entries, key=lambda key: self._entries[key][0])]
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        if self.ttl <= 0:
+            return await load()
+
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await load()
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; don't warn about an unretrieved exception
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(key, None)
+        self.set(key, value)
+        future.set_result(value)
+        return value
+
+class CacheBackend(ABC):
+    """Storage behind ``ResponseCache``: bytes by string key.
+
+    ``MemoryCacheBackend`` keeps them in this process; a shared cache (e.g. Redis)
+    implements the same four coroutines so every worker sees one copy.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes):
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        ...
+
+    @abstractmethod
+    async def clear(self):
+        ...
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU bounded by ``maxsize`` entries, each expiring ``ttl`` seconds after it was stored"""
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def clear(self):
+        self._entries.clear()
+
+class CachedResponse(NamedTuple):
+    etag: str
+    body: bytes
+
+    def pack(self) -> bytes:
+        # ETags never contain a newline, so the first one ends it
+        return self.etag.encode() + b"\n" + self.body
+
+    @classmethod
+    def unpack(cls, raw: bytes) -> "CachedResponse":
+        etag, _, body = raw.partition(b"\n")
+        return cls(etag.decode(), body)
+
+class ResponseCache:
+    """Already-serialized responses with their ETags, and hit/miss counters.
+
+    Writers call ``invalidate`` with the keys they affect. A render that was in
+    flight when any invalidation happened is returned but not stored, so a read
+    racing a write cannot cache the pre-write body.
+    """
+
+    def __init__(self, backend: CacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+
+    async def lookup(self, key: str) -> Optional[CachedResponse]:
+        """Cached response for ``key``, counted as a hit or a miss"""
+        if not self.enabled:
+            return None
+        raw = await self.backend.get(key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedResponse.unpack(raw)
+
+    async def store(self, key: str, response: CachedResponse, generation: int):
+        """Store a response rendered when ``self.generation`` was ``generation``"""
+        if self.enabled and generation == self.generation:
+            await self.backend.set(key, response.pack())
+
+    async def invalidate(self, *keys: str):
+        self.generation += 1
+        await self.backend.delete(*keys)
+
+    async def clear(self):
+        self.generation += 1
+        await self.backend.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,140 @@
+"""
+Conditional GET: strong ETags, ``If-None-Match`` and 304 Not Modified, plus
+``Range``/``If-Range`` for partial downloads.
+
+Business and onboarding responses are tagged with the business' ``version``
+counter, which every write to the document increments; file metadata is tagged
+with its content hash. A matching ``If-None-Match`` is answered from a projected
+read of just that field (or from the response cache), without fetching or
+serializing the body.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Awaitable, Callable, NamedTuple, Optional
+from fastapi import HTTPException, Response
+
+from .cache import CachedResponse, ResponseCache
+
+def version_etag(version: Optional[int]) -> str:
+    """Strong ETag for a versioned document; documents never written since versioning count as 0"""
+    return f'"v{version or 0}"'
+
+def hash_etag(content_hash: str) -> str:
+    return f'"{content_hash}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` comparison (weak, as RFC 9110 requires for this header)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+def json_response(response: CachedResponse, if_none_match: Optional[str] = None) -> Response:
+    """200 with the cached body, or 304 if the client already has this version"""
+    if etag_matches(if_none_match, response.etag):
+        return not_modified(response.etag)
+    return Response(content=response.body, media_type="application/json", headers={"ETag": response.etag})
+
+async def conditional_response(
+    cache: ResponseCache,
+    key: str,
+    if_none_match: Optional[str],
+    current_etag: Callable[[], Awaitable[str]],
+    render: Callable[[], Awaitable[CachedResponse]]
+) -> Response:
+    """Serve ``key`` from the cache, a version check, or a full render, in that order.
+
+    ``current_etag`` should be a projected read of the version field; it is only
+    called on a cache miss when the client sent ``If-None-Match``.
+    """
+    cached = await cache.lookup(key)
+    if cached is not None:
+        return json_response(cached, if_none_match)
+
+    generation = cache.generation
+    if if_none_match:
+        etag = await current_etag()
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    response = await render()
+    await cache.store(key, response, generation)
+    return json_response(response, if_none_match)
+
+class ByteRange(NamedTuple):
+    """Half-open ``[start, stop)`` slice of a representation"""
+    start: int
+    stop: int
+
+    def content_range(self, size: int) -> str:
+        return f"bytes {self.start}-{self.stop - 1}/{size}"
+
+def range_not_satisfiable(size: int) -> HTTPException:
+    return HTTPException(
+        status_code=416,
+        detail="Requested range not satisfiable",
+        headers={"Content-Range": f"bytes */{size}"}
+    )
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[ByteRange]:
+    """The single byte range a ``Range`` header asks for, clamped to ``size``.
+
+    Returns None when the whole representation should be sent instead: no
+    header, a syntax we don't understand, or several ranges (which RFC 9110
+    lets a server ignore rather than answer with multipart/byteranges). Raises
+    416 for a well-formed range that lies entirely past the end.
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash or not (first or last):
+        return None
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0:
+            raise range_not_satisfiable(size)
+        return ByteRange(max(size - suffix, 0), size)
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise range_not_satisfiable(size)
+    stop = min(int(last) + 1, size) if last else size
+    return ByteRange(start, stop)
+
+def http_date(value: datetime) -> str:
+    """``Last-Modified`` value for a naive-UTC datetime as stored by MongoDB"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value, usegmt=True)
+
+def if_range_matches(if_range: Optional[str], etag: Optional[str], last_modified: Optional[str]) -> bool:
+    """Whether a ``Range`` may be honoured: no ``If-Range``, or it still names this representation.
+
+    An entity tag must match strongly; a date must equal ``Last-Modified``
+    exactly. Otherwise the client's partial copy is stale and gets the whole file.
+    """
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith(('"', "W/")):
+        return etag is not None and if_range == etag
+    if last_modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(if_range) == parsedate_to_datetime(last_modified)
+    except (TypeError, ValueError):
+        return False
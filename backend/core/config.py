@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 from functools import lru_cache
 import os
 
@@ -16,6 +16,37 @@ class Settings(BaseSettings):
     MONGODB_MIN_POOL_SIZE: int = 10
     MONGODB_MAX_POOL_SIZE: int = 50
     MONGODB_TIMEOUT_MS: int = 30000  # 30 seconds
+    SCHEMA_VERSION_STRICT: bool = False  # Refuse to start when migrations are pending
+    
+    # Read routing for reporting endpoints (see core.read_policy)
+    REPORTING_READ_PREFERENCE: str = "secondaryPreferred"  # "primary" turns secondary reads off
+    READ_STALENESS_SECONDS: Dict[str, int] = {  # maxStalenessSeconds per endpoint, >= 90 or -1
+        "dashboard": 90,
+        "document_stats": 90,
+        "documents_list": 120,
+        "onboarding_list": 120,
+        "tasks_due": 120
+    }
+    
+    # Health monitoring
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0
+    HEALTH_PING_TIMEOUT_SECONDS: float = 2.0
+    
+    # Pagination
+    DEFAULT_PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 200
+    
+    # Dashboard
+    DASHBOARD_CACHE_TTL_SECONDS: float = 5.0  # 0 disables the per-business cache
+    DASHBOARD_UPCOMING_DAYS: int = 30
+    
+    # Serialized GET /businesses/{id} and GET /onboarding/{id} responses
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Bulk onboarding import
+    BULK_IMPORT_BATCH_SIZE: int = 1000
     
     # CORS
     BACKEND_CORS_ORIGINS: str = "http://localhost:3000"
@@ -31,7 +62,16 @@ class Settings(BaseSettings):
     
     # File Upload
     UPLOAD_DIR: str = "uploads"
-    MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB, for document types not listed below
+    MAX_FILE_SIZE_BY_TYPE: Dict[str, int] = {  # per document_type overrides
+        "bank_statement": 100 * 1024 * 1024,
+        "contract": 50 * 1024 * 1024
+    }
+    UPLOAD_TOKEN_TTL_SECONDS: int = 3600  # hash-first upload: how long a token waits for the bytes
+    UPLOAD_SESSION_TTL_HOURS: int = 24  # resumable upload: idle time before a session is cleaned up
+    UPLOAD_SESSION_CLEANUP_INTERVAL_MINUTES: int = 30
+    UPLOAD_SESSION_LOCK_SECONDS: int = 60  # resumable upload: a stalled PATCH loses its write lock after this
+    UPLOAD_SESSION_CLEANUP_ENABLED: bool = True  # background removal of expired sessions (see services.resumable_upload_service)
     ALLOWED_FILE_TYPES: List[str] = [
         "application/pdf",
         "image/jpeg",
@@ -66,9 +106,12 @@ class Settings(BaseSettings):
     # Task settings
     TASK_REMINDER_DAYS: int = 7
     URGENT_TASK_THRESHOLD_DAYS: int = 3
+    TASK_SWEEP_INTERVAL_MINUTES: int = 60
+    TASK_SWEEP_ENABLED: bool = True  # background overdue/urgent/reminder sweep (see services.task_sweep_service)
     
     # Compliance settings
     COMPLIANCE_CHECK_INTERVAL: int = 24  # hours
+    COMPLIANCE_ENGINE_ENABLED: bool = True  # background re-check (see services.compliance_service)
     MIN_COMPLIANCE_SCORE: float = 70.0
     
     # Document settings
@@ -0,0 +1,75 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchLoadFn = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+class DataLoader(Generic[K, V]):
+    """Request-scoped batching loader.
+
+    Keys requested during the same event-loop tick are collected and resolved by a
+    single ``batch_load(keys)`` call, which returns a dict of the keys it found.
+    Results are memoized for the loader's lifetime, so create one per request.
+    Keys missing from the batch result resolve to None.
+    """
+
+    def __init__(self, batch_load: BatchLoadFn):
+        self._batch_load = batch_load
+        self._cache: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+        self._dispatch_scheduled = False
+        self.batches = 0
+
+    def load(self, key: K) -> "asyncio.Future[Optional[V]]":
+        future = self._cache.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+        self._queue.append(key)
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> Dict[K, V]:
+        """Resolve several keys in one batch; returns only the keys that were found"""
+        keys = list(dict.fromkeys(keys))
+        values = await asyncio.gather(*(self.load(key) for key in keys))
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def prime(self, key: K, value: V):
+        """Seed the cache with a value the caller already has"""
+        if key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._cache[key] = future
+
+    def clear(self, key: K):
+        self._cache.pop(key, None)
+
+    async def _dispatch(self):
+        keys, self._queue = self._queue, []
+        self._dispatch_scheduled = False
+        if not keys:
+            return
+
+        self.batches += 1
+        try:
+            results = await self._batch_load(keys)
+        except Exception as e:
+            for key in keys:
+                # Failed keys are not memoized so a retry can succeed
+                future = self._cache.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key in keys:
+            future = self._cache[key]
+            if not future.done():
+                future.set_result(results.get(key))
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from .config import settings
+from .mongodb import get_pool_stats
+
+logger = logging.getLogger(__name__)
+
+class HealthMonitor:
+    """Samples service health in the background so probes can read the last snapshot for free"""
+
+    def __init__(self, interval: float = settings.HEALTH_CHECK_INTERVAL_SECONDS):
+        self.interval = interval
+        self.db: Optional[AsyncIOMotorDatabase] = None
+        self.gauges: Dict[str, Callable[[], Any]] = {}
+        self.snapshot: Dict = {"status": "starting", "sampled_at": None}
+        self._task: Optional[asyncio.Task] = None
+
+    def register_gauge(self, name: str, read: Callable[[], Any]):
+        """Add a cheap, synchronous reading (e.g. active sessions) to every snapshot"""
+        self.gauges[name] = read
+
+    async def start(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        await self.sample()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            # Anything beyond the requested sleep is time the loop was too busy to wake us
+            loop_lag = max(0.0, loop.time() - started - self.interval)
+            try:
+                await self.sample(loop_lag)
+            except Exception as e:
+                logger.error(f"Health sampling failed: {str(e)}")
+
+    async def ping(self) -> Dict:
+        """Live MongoDB round trip"""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                self.db.command("ping"),
+                timeout=settings.HEALTH_PING_TIMEOUT_SECONDS
+            )
+            return {
+                "status": "connected",
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2)
+            }
+        except Exception as e:
+            return {"status": "unreachable", "error": str(e) or type(e).__name__}
+
+    async def sample(self, loop_lag: float = 0.0) -> Dict:
+        database = await self.ping()
+        gauges = {}
+        for name, read in self.gauges.items():
+            try:
+                gauges[name] = read()
+            except Exception as e:
+                gauges[name] = f"error: {str(e)}"
+
+        self.snapshot = {
+            "status": "healthy" if database["status"] == "connected" else "unhealthy",
+            "version": settings.VERSION,
+            "sampled_at": datetime.utcnow().isoformat(),
+            "database": database,
+            "pool": get_pool_stats(),
+            "event_loop_lag_ms": round(loop_lag * 1000, 2),
+            **gauges
+        }
+        return self.snapshot
+
+    def current(self) -> Dict:
+        """Last snapshot, marked stale if the sampler has fallen behind"""
+        snapshot = dict(self.snapshot)
+        sampled_at = snapshot.get("sampled_at")
+        if sampled_at:
+            age = (datetime.utcnow() - datetime.fromisoformat(sampled_at)).total_seconds()
+            snapshot["age_seconds"] = round(age, 2)
+            if age > 3 * self.interval and snapshot["status"] == "healthy":
+                snapshot["status"] = "stale"
+        return snapshot
+
+health_monitor = HealthMonitor()
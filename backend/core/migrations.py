@@ -0,0 +1,414 @@
+"""
+Versioned schema migrations.
+
+Index changes and data backfills live here as ordered, idempotent steps and
+are applied once per deploy:
+
+    python -m core.migrations            # apply pending migrations
+    python -m core.migrations --status   # show current and target version
+
+The applied versions are recorded in the ``_migrations`` collection. The API
+only checks the recorded version at startup and never issues DDL itself.
+"""
+import argparse
+import hashlib
+import logging
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional
+from bson import ObjectId, encode
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, MongoClient, UpdateOne
+from pymongo.database import Database
+from pymongo.errors import OperationFailure
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "_migrations"
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Database], None]
+
+def _drop_index_if_exists(collection, name: str):
+    try:
+        collection.drop_index(name)
+        logger.info(f"Dropped index {collection.name}.{name}")
+    except OperationFailure:
+        pass  # Index does not exist
+
+def _drop_legacy_business_indexes(db: Database):
+    # Indexes from the old snake_case onboarding fields
+    _drop_index_if_exists(db.businesses, "business_name_1")
+    _drop_index_if_exists(db.businesses, "pan_number_1")
+    # Indexes the old core.mongodb.create_indexes declared on fields no document has
+    _drop_index_if_exists(db.businesses, "basic_info.business_name_text")
+    _drop_index_if_exists(db.businesses, "business_details.pan_number_1")
+    _drop_index_if_exists(db.businesses, "business_details.gstin_1")
+    _drop_index_if_exists(db.businesses, "user_id_1")
+
+def _create_base_indexes(db: Database):
+    db.businesses.create_index([("businessName", ASCENDING)], name="businessName_1")  # Not unique to allow testing
+    db.businesses.create_index([("panNumber", ASCENDING)], name="panNumber_1", sparse=True)
+    db.businesses.create_index([("status", ASCENDING)], name="status_1")
+    db.businesses.create_index([("created_at", DESCENDING)], name="created_at_-1")
+    db.companies.create_index([("name", ASCENDING)], name="name_1")
+    db.users.create_index([("email", ASCENDING)], name="email_1", unique=True)
+
+def _create_list_indexes(db: Database):
+    # Keyset pagination: equality filter first, then the sort keys
+    db.businesses.create_index(
+        [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="status_1_created_at_-1__id_-1"
+    )
+    db.businesses.create_index(
+        [("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="created_at_-1__id_-1"
+    )
+    _drop_index_if_exists(db.businesses, "created_at_-1")  # Prefix of the compound index above
+    db.file_metadata.create_index(
+        [("document_type", ASCENDING), ("uploaded_at", DESCENDING), ("_id", DESCENDING)],
+        name="document_type_1_uploaded_at_-1__id_-1"
+    )
+    db.file_metadata.create_index(
+        [("uploaded_at", DESCENDING), ("_id", DESCENDING)],
+        name="uploaded_at_-1__id_-1"
+    )
+
+def _create_child_collection_indexes(db: Database):
+    # Every child query is scoped to one business, so business_id leads each index
+    db.business_documents.create_index(
+        [("business_id", ASCENDING), ("upload_date", DESCENDING), ("_id", DESCENDING)],
+        name="business_id_1_upload_date_-1__id_-1"
+    )
+    db.business_documents.create_index(
+        [("business_id", ASCENDING), ("doc_type", ASCENDING), ("upload_date", DESCENDING), ("_id", DESCENDING)],
+        name="business_id_1_doc_type_1_upload_date_-1__id_-1"
+    )
+    for collection in (db.business_tasks, db.compliance_events):
+        collection.create_index(
+            [("business_id", ASCENDING), ("due_date", ASCENDING), ("_id", ASCENDING)],
+            name="business_id_1_due_date_1__id_1"
+        )
+        collection.create_index(
+            [("business_id", ASCENDING), ("status", ASCENDING), ("due_date", ASCENDING), ("_id", ASCENDING)],
+            name="business_id_1_status_1_due_date_1__id_1"
+        )
+
+# Embedded array -> child collection moved by migration 5
+EMBEDDED_CHILDREN = {
+    "documents": "business_documents",
+    "tasks": "business_tasks",
+    "compliance_events": "compliance_events",
+}
+
+CHILD_MIGRATION_BATCH_SIZE = 500
+
+def _child_document(business_id, field: str, index: int, item: dict) -> dict:
+    # repositories.child_repository.to_child_document at version 5, except that an
+    # item without a valid id gets one derived from its business, place and content,
+    # so a rerun after an interrupted batch upserts the same child instead of a copy
+    # (content too, because items pushed later reuse the positions of moved ones)
+    doc = dict(item)
+    item_id = doc.pop("id", None)
+    if item_id and ObjectId.is_valid(item_id):
+        doc["_id"] = ObjectId(item_id)
+    else:
+        key = f"{business_id}:{field}:{index}:".encode() + encode(item)
+        doc["_id"] = ObjectId(hashlib.sha256(key).digest()[:12])
+    doc["business_id"] = business_id
+    return doc
+
+def _move_embedded_children(db: Database):
+    """Copy embedded history arrays into their child collections, then remove them.
+
+    Safe to run while the API is serving: businesses are walked once in ``_id`` order
+    in batches, children are upserted by ``_id`` (an item's own id, or one derived
+    from the business, array position and content; so a rerun is a no-op), and only the
+    copied items are ``$pull``-ed from the business. Anything an old instance pushes
+    meanwhile stays embedded and is picked up by a rerun. Onboarding records keep
+    their ``documents`` object; only arrays are moved.
+    """
+    for field, collection_name in EMBEDDED_CHILDREN.items():
+        children = db[collection_name]
+        last_id = None
+        moved = 0
+        while True:
+            query = {field: {"$type": "array", "$ne": []}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            businesses = list(
+                db.businesses.find(query, {field: 1}).sort("_id", ASCENDING).limit(CHILD_MIGRATION_BATCH_SIZE)
+            )
+            if not businesses:
+                break
+            for business in businesses:
+                items = [(index, item) for index, item in enumerate(business[field]) if isinstance(item, dict)]
+                docs = [_child_document(business["_id"], field, index, item) for index, item in items]
+                if docs:
+                    children.bulk_write(
+                        [UpdateOne({"_id": doc["_id"]}, {"$setOnInsert": doc}, upsert=True) for doc in docs],
+                        ordered=False
+                    )
+                    ids = [item["id"] for _, item in items if item.get("id")]
+                    if ids:
+                        db.businesses.update_one({"_id": business["_id"]}, {"$pull": {field: {"id": {"$in": ids}}}})
+                    # By exact value: pulling ``id: None`` would also take id-less items pushed since the read
+                    unidentified = [item for _, item in items if not item.get("id")]
+                    if unidentified:
+                        db.businesses.update_one({"_id": business["_id"]}, {"$pull": {field: {"$in": unidentified}}})
+                moved += len(docs)
+            last_id = businesses[-1]["_id"]
+            logger.info(f"Moved {moved} {field} into {collection_name}")
+        db.businesses.update_many({field: {"$size": 0}}, {"$unset": {field: ""}})
+
+def _backfill_compliance_counters(db: Database):
+    """Seed compliance_counts/compliance_score from the child collections, server-side"""
+    project = {"$project": {"business_id": 1, "status": 1}}
+    db.business_tasks.aggregate([
+        project,
+        {"$unionWith": {"coll": "compliance_events", "pipeline": [project]}},
+        {
+            "$group": {
+                "_id": "$business_id",
+                "total": {"$sum": 1},
+                "completed": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}}
+            }
+        },
+        {
+            "$project": {
+                "compliance_counts": {"total": "$total", "completed": "$completed"},
+                "compliance_score": {"$multiply": [{"$divide": ["$completed", "$total"]}, 100]}
+            }
+        },
+        {"$merge": {"into": "businesses", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}}
+    ])
+    # Businesses without any tasks or events
+    db.businesses.update_many(
+        {"compliance_counts": {"$exists": False}},
+        {"$set": {"compliance_counts": {"total": 0, "completed": 0}, "compliance_score": 100.0}}
+    )
+
+def _create_recent_activity_indexes(db: Database):
+    # Dashboard "recent activity" reads the newest tasks/events of one business
+    for collection in (db.business_tasks, db.compliance_events):
+        collection.create_index(
+            [("business_id", ASCENDING), ("_id", DESCENDING)],
+            name="business_id_1__id_-1"
+        )
+
+def _backfill_document_counts(db: Database):
+    """Seed document_counts (total, bytes, per type, per OCR status) from business_documents"""
+    counts = {}
+    for group in db.business_documents.aggregate([
+        {
+            "$group": {
+                "_id": {"business_id": "$business_id", "doc_type": "$doc_type", "ocr_status": "$ocr_status"},
+                "count": {"$sum": 1},
+                "bytes": {"$sum": "$size"}
+            }
+        }
+    ]):
+        key = group["_id"]
+        business = counts.setdefault(
+            key["business_id"], {"total": 0, "bytes": 0, "by_type": {}, "by_ocr_status": {}}
+        )
+        business["total"] += group["count"]
+        business["bytes"] += group["bytes"]
+        business["by_type"][key["doc_type"]] = business["by_type"].get(key["doc_type"], 0) + group["count"]
+        ocr_status = key.get("ocr_status") or "pending"
+        business["by_ocr_status"][ocr_status] = business["by_ocr_status"].get(ocr_status, 0) + group["count"]
+
+    updates = [
+        UpdateOne({"_id": business_id}, {"$set": {"document_counts": document_counts}})
+        for business_id, document_counts in counts.items()
+    ]
+    for start in range(0, len(updates), CHILD_MIGRATION_BATCH_SIZE):
+        db.businesses.bulk_write(updates[start:start + CHILD_MIGRATION_BATCH_SIZE], ordered=False)
+    # Businesses without any documents
+    db.businesses.update_many(
+        {"document_counts": {"$exists": False}},
+        {"$set": {"document_counts": {"total": 0, "bytes": 0, "by_type": {}, "by_ocr_status": {}}}}
+    )
+
+def _create_due_task_indexes(db: Database):
+    # Cross-tenant "due in the next N days" reads open tasks of every business by due date
+    db.business_tasks.create_index(
+        [("status", ASCENDING), ("due_date", ASCENDING), ("_id", ASCENDING)],
+        name="status_1_due_date_1__id_1"
+    )
+
+def _create_business_updated_at_index(db: Database):
+    # The compliance engine walks businesses changed since its last run
+    db.businesses.create_index(
+        [("updated_at", ASCENDING), ("_id", ASCENDING)],
+        name="updated_at_1__id_1"
+    )
+
+def _content_address_file_metadata(db: Database):
+    """Make file_metadata content-addressed: one file per hash, with ``ref_count``.
+
+    Uploads that raced past the old unindexed dedup check are merged into the
+    oldest file with the same hash (onboarding references are repointed, the
+    extra GridFS files deleted), then every file's ``ref_count`` is set to the
+    number of onboarding document slots referencing it and the unique index is
+    built. Apply before deploying the code that maintains the counts.
+    """
+    remap = {}
+    for group in db.file_metadata.aggregate([
+        {"$match": {"file_hash": {"$type": "string"}}},
+        {"$sort": {"_id": ASCENDING}},
+        {"$group": {"_id": "$file_hash", "ids": {"$push": "$_id"}}},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ], allowDiskUse=True):
+        keep, *duplicates = group["ids"]
+        for duplicate in duplicates:
+            remap[str(duplicate)] = str(keep)
+
+    ref_counts = {}
+    updates = []
+    for business in db.businesses.find({"documents": {"$type": "object"}}, {"documents": 1}):
+        fields = {}
+        for doc_type, doc in business["documents"].items():
+            if not isinstance(doc, dict) or not doc.get("file_id"):
+                continue
+            file_id = remap.get(doc["file_id"], doc["file_id"])
+            if file_id != doc["file_id"]:
+                fields[f"documents.{doc_type}.file_id"] = file_id
+            ref_counts[file_id] = ref_counts.get(file_id, 0) + 1
+        if fields:
+            updates.append(UpdateOne({"_id": business["_id"]}, {"$set": fields}))
+    for start in range(0, len(updates), CHILD_MIGRATION_BATCH_SIZE):
+        db.businesses.bulk_write(updates[start:start + CHILD_MIGRATION_BATCH_SIZE], ordered=False)
+
+    duplicate_ids = [ObjectId(file_id) for file_id in remap]
+    for start in range(0, len(duplicate_ids), CHILD_MIGRATION_BATCH_SIZE):
+        batch = duplicate_ids[start:start + CHILD_MIGRATION_BATCH_SIZE]
+        db["documents.chunks"].delete_many({"files_id": {"$in": batch}})
+        db["documents.files"].delete_many({"_id": {"$in": batch}})
+        db.file_metadata.delete_many({"_id": {"$in": batch}})
+    logger.info(f"Merged {len(duplicate_ids)} duplicate document files")
+
+    db.file_metadata.update_many({}, {"$set": {"ref_count": 0}})
+    counted = [
+        UpdateOne({"_id": ObjectId(file_id)}, {"$set": {"ref_count": count}})
+        for file_id, count in ref_counts.items() if ObjectId.is_valid(file_id)
+    ]
+    for start in range(0, len(counted), CHILD_MIGRATION_BATCH_SIZE):
+        db.file_metadata.bulk_write(counted[start:start + CHILD_MIGRATION_BATCH_SIZE], ordered=False)
+
+    db.file_metadata.create_index(
+        [("file_hash", ASCENDING)],
+        name="file_hash_1",
+        unique=True,
+        partialFilterExpression={"file_hash": {"$type": "string"}}
+    )
+
+def _create_upload_token_ttl_index(db: Database):
+    # Hash-first upload tokens nobody redeemed disappear once they expire
+    db.upload_tokens.create_index([("expires_at", ASCENDING)], name="expires_at_1", expireAfterSeconds=0)
+
+def _create_upload_session_indexes(db: Database):
+    # Resumable uploads write GridFS chunks directly, so make sure the index the
+    # driver would create on first use exists (same name and keys)
+    db["documents.chunks"].create_index(
+        [("files_id", ASCENDING), ("n", ASCENDING)], name="files_id_1_n_1", unique=True
+    )
+    # Not a TTL index: the cleaner must delete each expired session's chunks with it
+    db.upload_sessions.create_index([("expires_at", ASCENDING)], name="expires_at_1")
+
+# Append new steps at the end; never renumber or edit an applied step.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Drop legacy and conflicting business indexes", _drop_legacy_business_indexes),
+    Migration(2, "Create base indexes for businesses, companies and users", _create_base_indexes),
+    Migration(3, "Create compound indexes for keyset-paginated listings", _create_list_indexes),
+    Migration(4, "Create indexes for business documents, tasks and compliance events", _create_child_collection_indexes),
+    Migration(5, "Move embedded documents, tasks and compliance events into child collections", _move_embedded_children),
+    Migration(6, "Backfill compliance counters and scores", _backfill_compliance_counters),
+    Migration(7, "Create recent-activity indexes for tasks and compliance events", _create_recent_activity_indexes),
+    Migration(8, "Backfill per-business document counters", _backfill_document_counts),
+    Migration(9, "Create cross-business due-task index", _create_due_task_indexes),
+    Migration(10, "Create business updated_at index for incremental compliance runs", _create_business_updated_at_index),
+    Migration(11, "Content-address file metadata: unique hash index and reference counts", _content_address_file_metadata),
+    Migration(12, "Create TTL index for upload tokens", _create_upload_token_ttl_index),
+    Migration(13, "Create resumable upload session and GridFS chunk indexes", _create_upload_session_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version if MIGRATIONS else 0
+
+_LATEST_QUERY = {"filter": {}, "projection": {"_id": 1}, "sort": [("_id", DESCENDING)]}
+
+def get_schema_version(db: Database) -> int:
+    """Highest migration version recorded in the database"""
+    latest = db[MIGRATIONS_COLLECTION].find_one(**_LATEST_QUERY)
+    return latest["_id"] if latest else 0
+
+def migrate(db: Database, target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to ``target`` (default: latest) in order"""
+    target = LATEST_VERSION if target is None else target
+    current = get_schema_version(db)
+    applied = []
+
+    for migration in MIGRATIONS:
+        if migration.version <= current or migration.version > target:
+            continue
+
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        started_at = datetime.utcnow()
+        migration.apply(db)
+        db[MIGRATIONS_COLLECTION].replace_one(
+            {"_id": migration.version},
+            {
+                "_id": migration.version,
+                "description": migration.description,
+                "started_at": started_at,
+                "applied_at": datetime.utcnow()
+            },
+            upsert=True
+        )
+        applied.append(migration.version)
+
+    if applied:
+        logger.info(f"Schema migrated from version {current} to {applied[-1]}")
+    else:
+        logger.info(f"Schema already at version {current}, nothing to apply")
+    return applied
+
+async def check_schema_version(db: AsyncIOMotorDatabase) -> bool:
+    """Startup check: compare the recorded version with the code's version without touching indexes"""
+    latest = await db[MIGRATIONS_COLLECTION].find_one(**_LATEST_QUERY)
+    current = latest["_id"] if latest else 0
+    if current < LATEST_VERSION:
+        message = (
+            f"Database schema is at version {current}, code expects {LATEST_VERSION}. "
+            f"Run `python -m core.migrations` to apply pending migrations."
+        )
+        if settings.SCHEMA_VERSION_STRICT:
+            raise RuntimeError(message)
+        logger.warning(message)
+        return False
+    if current > LATEST_VERSION:
+        logger.warning(f"Database schema version {current} is newer than this build ({LATEST_VERSION})")
+    return True
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Apply LegalEase MongoDB schema migrations")
+    parser.add_argument("--status", action="store_true", help="Show the current schema version and exit")
+    parser.add_argument("--target", type=int, default=None, help="Migrate up to this version (default: latest)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    client = MongoClient(settings.MONGODB_URL, serverSelectionTimeoutMS=settings.MONGODB_TIMEOUT_MS)
+    try:
+        db = client[settings.MONGODB_DB_NAME]
+        if args.status:
+            print(f"current version: {get_schema_version(db)}, latest version: {LATEST_VERSION}")
+            return
+        migrate(db, args.target)
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,95 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.database import Database
-from .config import settings
 import logging
+import threading
+from typing import Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+from .config import settings
 
 logger = logging.getLogger(__name__)
 
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connection pool listener that keeps utilization counters for monitoring"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.pools = 0
+            self.open_connections = 0
+            self.checked_out = 0
+            self.peak_checked_out = 0
+            self.total_created = 0
+            self.total_closed = 0
+            self.total_checkouts = 0
+            self.checkout_failures = 0
+            self.pool_clears = 0
+
+    def pool_created(self, event):
+        with self._lock:
+            self.pools += 1
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        with self._lock:
+            self.pools = max(0, self.pools - 1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+            self.total_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(0, self.open_connections - 1)
+            self.total_closed += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+            self.total_checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "pools": self.pools,
+                "open_connections": self.open_connections,
+                "in_use": self.checked_out,
+                "idle": max(0, self.open_connections - self.checked_out),
+                "peak_in_use": self.peak_checked_out,
+                "total_created": self.total_created,
+                "total_closed": self.total_closed,
+                "total_checkouts": self.total_checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+            }
+
 class MongoDB:
-    client: AsyncIOMotorClient = None
-    db: Database = None
+    client: Optional[AsyncIOMotorClient] = None
+    db: Optional[AsyncIOMotorDatabase] = None
+    pool_monitor: PoolMonitor = PoolMonitor()
 
 async def connect_to_mongo():
     """Create database connection."""
@@ -18,8 +100,10 @@ async def connect_to_mongo():
             maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
             serverSelectionTimeoutMS=settings.MONGODB_TIMEOUT_MS,
             connectTimeoutMS=settings.MONGODB_TIMEOUT_MS,
+            waitQueueTimeoutMS=settings.MONGODB_TIMEOUT_MS,
             retryWrites=True,
-            w="majority"
+            w="majority",
+            event_listeners=[MongoDB.pool_monitor]
         )
         MongoDB.db = MongoDB.client[settings.MONGODB_DB_NAME]
         
@@ -27,8 +111,7 @@ async def connect_to_mongo():
         await MongoDB.client.admin.command('ping')
         logger.info("Successfully connected to MongoDB")
         
-        # Create indexes
-        await create_indexes()
+        # Indexes are managed by core.migrations
         
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {str(e)}")
@@ -42,37 +125,20 @@ async def close_mongo_connection():
             logger.info("MongoDB connection closed")
     except Exception as e:
         logger.error(f"Error closing MongoDB connection: {str(e)}")
+    finally:
+        MongoDB.client = None
+        MongoDB.db = None
 
-def get_db() -> Database:
+def get_db() -> AsyncIOMotorDatabase:
     """Get database instance."""
     if MongoDB.db is None:
         raise Exception("Database not initialized")
     return MongoDB.db
 
-async def create_indexes():
-    """Create necessary indexes."""
-    try:
-        # Create indexes for businesses collection
-        await MongoDB.db.businesses.create_index([("user_id", 1)])
-        await MongoDB.db.businesses.create_index([("status", 1)])
-        await MongoDB.db.businesses.create_index([("created_at", -1)])
-        
-        # Create text index for business name
-        await MongoDB.db.businesses.create_index([("basic_info.business_name", "text")])
-        
-        # Create unique index for business PAN and GSTIN
-        await MongoDB.db.businesses.create_index(
-            [("business_details.pan_number", 1)],
-            unique=True,
-            sparse=True
-        )
-        await MongoDB.db.businesses.create_index(
-            [("business_details.gstin", 1)],
-            unique=True,
-            sparse=True
-        )
-        
-        logger.info("Successfully created MongoDB indexes")
-    except Exception as e:
-        logger.error(f"Error creating MongoDB indexes: {str(e)}")
-        raise 
\ No newline at end of file
+def get_pool_stats() -> Dict:
+    """Connection pool utilization for monitoring"""
+    stats = MongoDB.pool_monitor.snapshot()
+    stats["min_pool_size"] = settings.MONGODB_MIN_POOL_SIZE
+    stats["max_pool_size"] = settings.MONGODB_MAX_POOL_SIZE
+    stats["utilization"] = round(stats["in_use"] / settings.MONGODB_MAX_POOL_SIZE, 4) if settings.MONGODB_MAX_POOL_SIZE else 0.0
+    return stats
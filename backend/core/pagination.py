@@ -0,0 +1,147 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+from bson import ObjectId, json_util
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection
+
+from .config import settings
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# List endpoints that return a bare JSON array carry the next cursor in this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Sort spec used for keyset pagination, e.g. [("created_at", -1), ("_id", -1)].
+# The last key must be unique (``_id``) so every document has a distinct position.
+SortSpec = List[Tuple[str, int]]
+
+class Page(NamedTuple):
+    items: List[Dict]
+    next_cursor: Optional[str]
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque cursor from the sort-key values of the last document on a page"""
+    raw = json_util.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def clamp_limit(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return settings.DEFAULT_PAGE_SIZE
+    return min(limit, settings.MAX_PAGE_SIZE)
+
+def parse_fields(fields: Optional[str], sort: SortSpec) -> Optional[Dict]:
+    """Projection for a comma-separated ``fields`` parameter; sort keys are always included"""
+    if not fields:
+        return None
+    projection = {name.strip(): 1 for name in fields.split(",") if name.strip()}
+    for key, _ in sort:
+        projection[key] = 1
+    return projection
+
+def _sort_values(doc: Dict, sort: SortSpec) -> List[Any]:
+    values = []
+    for key, _ in sort:
+        value = doc
+        for part in key.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        values.append(value)
+    return values
+
+def _after(sort: SortSpec, values: List[Any]) -> Dict:
+    """Filter for documents strictly after ``values`` in ``sort`` order"""
+    if len(values) != len(sort):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    clauses = []
+    for i, (key, direction) in enumerate(sort):
+        clause = {sort[j][0]: values[j] for j in range(i)}
+        clause[key] = {"$gt" if direction > 0 else "$lt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+def _with_cursor(query: Dict, sort: SortSpec, cursor: Optional[str]) -> Dict:
+    if not cursor:
+        return query
+    after = _after(sort, decode_cursor(cursor))
+    return {"$and": [query, after]} if query else after
+
+async def fetch_page(
+    collection: AsyncIOMotorCollection,
+    query: Dict,
+    sort: SortSpec,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict] = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> Page:
+    """One page of ``query`` in ``sort`` order, starting after ``cursor``"""
+    limit = clamp_limit(limit)
+    docs = await collection.find(
+        _with_cursor(query, sort, cursor), projection, session=session
+    ).sort(sort).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(_sort_values(docs[-1], sort))
+    return Page(docs, next_cursor)
+
+def rename_id(field: str = "id") -> Callable[[Dict], Dict]:
+    """Transform that exposes ``_id`` as a string under ``field``"""
+    def transform(doc: Dict) -> Dict:
+        if "_id" in doc:
+            doc[field] = str(doc.pop("_id"))
+        return doc
+    return transform
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return str(value)
+
+async def _ndjson_lines(
+    collection: AsyncIOMotorCollection,
+    query: Dict,
+    sort: SortSpec,
+    projection: Optional[Dict],
+    transform: Optional[Callable[[Dict], Dict]],
+    session: Optional[AsyncIOMotorClientSession]
+) -> AsyncIterator[bytes]:
+    async for doc in collection.find(query, projection, session=session).sort(sort).batch_size(settings.DEFAULT_PAGE_SIZE):
+        if transform:
+            doc = transform(doc)
+        yield (json.dumps(doc, default=_json_default) + "\n").encode()
+
+def stream_ndjson(
+    collection: AsyncIOMotorCollection,
+    query: Dict,
+    sort: SortSpec,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict] = None,
+    transform: Optional[Callable[[Dict], Dict]] = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> StreamingResponse:
+    """Stream every matching document after ``cursor`` as NDJSON, one batch in memory at a time"""
+    query = _with_cursor(query, sort, cursor)
+    return StreamingResponse(
+        _ndjson_lines(collection, query, sort, projection, transform, session),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+def wants_ndjson(response_format: Optional[str], accept: Optional[str]) -> bool:
+    return response_format == "ndjson" or (accept or "").startswith(NDJSON_MEDIA_TYPE)
@@ -0,0 +1,112 @@
+"""
+Read routing for reporting endpoints.
+
+Dashboard, stats and listing endpoints may read from secondaries, bounded by a
+per-endpoint ``maxStalenessSeconds`` (READ_STALENESS_SECONDS). Read-your-writes is
+kept with causally consistent sessions: any request that uses ``get_causal_session``
+answers with an ``X-Consistency-Token`` header, and a client that sends that token
+back on a later read is guaranteed to see its own earlier writes, even on a secondary.
+
+To try it locally, start a single-node replica set (``mongod --replSet rs0`` then
+``rs.initiate()``) or a three-node one, and point MONGODB_URL at it with
+``?replicaSet=rs0``. On a standalone server secondaryPreferred simply reads the primary.
+"""
+
+import base64
+import binascii
+from typing import AsyncIterator, Dict, Optional
+from bson import json_util
+from fastapi import Depends, HTTPException, Request
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+from .config import settings
+from .database import get_database
+
+CONSISTENCY_TOKEN_HEADER = "X-Consistency-Token"
+
+# The server rejects smaller bounds (heartbeat interval + idle write period)
+MIN_MAX_STALENESS_SECONDS = 90
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+def read_preference_for(endpoint: str):
+    """Read preference for a reporting endpoint; staleness -1 means unbounded"""
+    mode = READ_PREFERENCES[settings.REPORTING_READ_PREFERENCE]
+    if mode is Primary:
+        return Primary()
+    max_staleness = settings.READ_STALENESS_SECONDS.get(endpoint, MIN_MAX_STALENESS_SECONDS)
+    if max_staleness != -1:
+        max_staleness = max(max_staleness, MIN_MAX_STALENESS_SECONDS)
+    return mode(max_staleness=max_staleness)
+
+def reporting_database(db: AsyncIOMotorDatabase, endpoint: str) -> AsyncIOMotorDatabase:
+    """``db`` routed by the endpoint's read policy.
+
+    Reads use majority read concern so a causal session's afterClusterTime holds on
+    any member. Writes through this handle still go to the primary.
+    """
+    return db.client.get_database(
+        db.name,
+        read_preference=read_preference_for(endpoint),
+        read_concern=ReadConcern("majority")
+    )
+
+def reporting_db(endpoint: str):
+    """Dependency factory for ``reporting_database``"""
+    def dependency(db: AsyncIOMotorDatabase = Depends(get_database)) -> AsyncIOMotorDatabase:
+        return reporting_database(db, endpoint)
+    return dependency
+
+def encode_consistency_token(session: AsyncIOMotorClientSession) -> Optional[str]:
+    """Token for the latest operation seen by ``session``; None if there is nothing to carry"""
+    if session.operation_time is None or session.cluster_time is None:
+        return None
+    raw = json_util.dumps({
+        "operationTime": session.operation_time,
+        "clusterTime": session.cluster_time
+    }).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def apply_consistency_token(session: AsyncIOMotorClientSession, token: str):
+    """Make ``session``'s reads wait for the operation the token was issued for"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        times: Dict = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+        session.advance_cluster_time(times["clusterTime"])
+        session.advance_operation_time(times["operationTime"])
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid consistency token")
+
+async def get_causal_session(
+    request: Request,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+) -> AsyncIterator[AsyncIOMotorClientSession]:
+    """Request-scoped causally consistent session, advanced by the client's token.
+
+    The session stays open until the response has been sent, so streamed
+    responses can keep using it.
+    """
+    async with await db.client.start_session(causal_consistency=True) as session:
+        token = request.headers.get(CONSISTENCY_TOKEN_HEADER)
+        if token:
+            apply_consistency_token(session, token)
+        request.state.causal_session = session
+        yield session
+
+async def consistency_token_middleware(request: Request, call_next):
+    """Attach the token of the request's causal session (if it used one) to the response"""
+    response = await call_next(request)
+    session = getattr(request.state, "causal_session", None)
+    if session is not None:
+        token = encode_consistency_token(session)
+        if token:
+            response.headers[CONSISTENCY_TOKEN_HEADER] = token
+    return response
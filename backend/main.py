@@ -1,12 +1,23 @@
 import logging
 import os
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from core.config import settings
-from core.database import get_database
+from core.mongodb import connect_to_mongo, close_mongo_connection, get_db, get_pool_stats
+from core.health import health_monitor
+from core.migrations import check_schema_version
+from core.pagination import NEXT_CURSOR_HEADER
+from core.read_policy import CONSISTENCY_TOKEN_HEADER, consistency_token_middleware
 from api.v1 import automation, companies, tax_filing, business, auth, upload
+from services.business_service import response_cache
+from services.compliance_service import ComplianceEngine
+from services.resumable_upload_service import UPLOAD_OFFSET_HEADER, UploadSessionCleaner
+from services.task_sweep_service import TaskSweeper
+from services.upload_service import upload_size_middleware
 
 # Configure logging
 logging.basicConfig(
@@ -20,11 +31,47 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# MongoDB connection (one pooled client for the whole process)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        logger.info("Connecting to MongoDB...")
+        await connect_to_mongo()
+        app.mongodb = get_db()
+        logger.info("MongoDB connection established")
+        await check_schema_version(app.mongodb)
+    except Exception as e:
+        logger.error(f"Failed to connect to MongoDB: {str(e)}")
+        raise
+    
+    health_monitor.register_gauge("active_automation_sessions", lambda: len(automation.active_sessions))
+    health_monitor.register_gauge("response_cache", response_cache.stats)
+    compliance_engine = ComplianceEngine(app.mongodb)
+    health_monitor.register_gauge("compliance_engine", compliance_engine.metrics)
+    task_sweeper = TaskSweeper(app.mongodb)
+    health_monitor.register_gauge("task_sweep", task_sweeper.metrics)
+    upload_cleaner = UploadSessionCleaner(app.mongodb)
+    health_monitor.register_gauge("upload_session_cleanup", upload_cleaner.metrics)
+    await health_monitor.start(app.mongodb)
+    if settings.COMPLIANCE_ENGINE_ENABLED:
+        await compliance_engine.start()
+    if settings.TASK_SWEEP_ENABLED:
+        await task_sweeper.start()
+    if settings.UPLOAD_SESSION_CLEANUP_ENABLED:
+        await upload_cleaner.start()
+    yield
+    await upload_cleaner.stop()
+    await task_sweeper.stop()
+    await compliance_engine.stop()
+    await health_monitor.stop()
+    await close_mongo_connection()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
-    description="LegalEase Business Onboarding API"
+    description="LegalEase Business Onboarding API",
+    lifespan=lifespan
 )
 
 # Set up CORS middleware
@@ -34,39 +81,43 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, CONSISTENCY_TOKEN_HEADER, "ETag", "Content-Range", "Accept-Ranges", UPLOAD_OFFSET_HEADER, "Location"],
 )
 
+# Hand the causal session's token back so clients can read their own writes from secondaries
+app.middleware("http")(consistency_token_middleware)
+app.middleware("http")(upload_size_middleware)
+
 # Create required directories
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 os.makedirs('logs', exist_ok=True)
 
-# MongoDB connection
-@app.on_event("startup")
-async def startup_event():
-    try:
-        logger.info("Connecting to MongoDB...")
-        app.mongodb = get_database()
-        logger.info("MongoDB connection established")
-    except Exception as e:
-        logger.error(f"Failed to connect to MongoDB: {str(e)}")
-        raise
-
-# Health check endpoint
+# Health check endpoints
 @app.get("/health")
 async def health_check():
-    try:
-        # Check database connection
-        app.mongodb.command("ping")
-        return {
-            "status": "healthy",
-            "version": settings.VERSION,
-            "database": "connected"
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=503,
-            detail=f"Service unhealthy: {str(e)}"
-        )
+    """Last background health snapshot; never touches the database"""
+    snapshot = health_monitor.current()
+    if snapshot["status"] == "unhealthy":
+        return JSONResponse(status_code=503, content=snapshot)
+    return snapshot
+
+@app.get("/health/deep")
+async def deep_health_check():
+    """Run a live check now (MongoDB round trip) and refresh the snapshot"""
+    snapshot = await health_monitor.sample()
+    if snapshot["status"] == "unhealthy":
+        return JSONResponse(status_code=503, content=snapshot)
+    return snapshot
+
+@app.get("/health/pool")
+async def pool_stats():
+    """MongoDB connection pool utilization"""
+    return get_pool_stats()
+
+@app.get("/health/cache")
+async def cache_stats():
+    """Response cache hits and misses since startup"""
+    return response_cache.stats()
 
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_STR, tags=["Authentication"])
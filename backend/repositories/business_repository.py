@@ -0,0 +1,257 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from core.pagination import Page, fetch_page, parse_fields, stream_ndjson
+
+def _is_non_empty(field: str) -> Dict:
+    """Projection expression: True when ``field`` holds a non-empty array or object"""
+    value = {"$ifNull": [field, {}]}
+    return {
+        "$cond": [
+            {"$isArray": value},
+            {"$gt": [{"$size": value}, 0]},
+            {
+                "$cond": [
+                    {"$eq": [{"$type": value}, "object"]},
+                    {"$gt": [{"$size": {"$objectToArray": value}}, 0]},
+                    {"$toBool": value}
+                ]
+            }
+        ]
+    }
+
+def _all_present(fields: List[str]) -> Dict:
+    """Filter clause: every field is set and not empty"""
+    return {field: {"$nin": [None, "", {}, []]} for field in fields}
+
+# Steps 1-3 must have populated these before onboarding can be completed
+ONBOARDING_STEP_FIELDS = ["businessName", "panNumber", "registeredAddress", "contactInfo", "documents"]
+
+# Named projections: each endpoint asks for the smallest shape it can work with
+EXISTS_PROJECTION = {"_id": 1}
+
+# Enough to decide which onboarding steps are done, without pulling documents
+STEP_STATUS_PROJECTION = {
+    "businessName": 1,
+    "panNumber": 1,
+    "registeredAddress": 1,
+    "contactInfo": 1,
+    "termsAccepted": 1,
+    "currentStep": 1,
+    "status": 1,
+    "has_documents": _is_non_empty("$documents"),
+}
+
+# Onboarding records never carry the service-side history arrays
+ONBOARDING_PROJECTION = {
+    "tasks": 0,
+    "compliance_events": 0,
+}
+
+# History lives in child collections; skip any arrays a business still has from before migration 5
+PROFILE_PROJECTION = {
+    "documents": 0,
+    "tasks": 0,
+    "compliance_events": 0,
+}
+
+COMPLIANCE_PROJECTION = {"compliance_score": 1, "compliance_counts": 1}
+
+DOCUMENT_COUNTS_PROJECTION = {"document_counts": 1}
+
+VERSION_PROJECTION = {"version": 1}
+
+# Onboarding document references ({doc_type: {"file_id": ...}}); tiny, one entry per type
+DOCUMENT_REFS_PROJECTION = {"documents": 1}
+
+def attached_file_ids(business: Optional[Dict]) -> List[str]:
+    """File IDs an onboarding record's ``documents`` point at, one per slot"""
+    documents = (business or {}).get("documents")
+    if not isinstance(documents, dict):
+        return []
+    return [doc["file_id"] for doc in documents.values() if isinstance(doc, dict) and doc.get("file_id")]
+
+# Maintained by the server (version bumps, $inc'd counters); never taken from client input
+SERVER_MANAGED_FIELDS = {
+    "_id",
+    "version",
+    "compliance_counts",
+    "compliance_score",
+    "compliance_flagged",
+    "document_counts",
+}
+
+def without_server_managed_fields(fields: Dict) -> Dict:
+    """``fields`` minus anything under ``SERVER_MANAGED_FIELDS`` (dotted paths included)"""
+    return {key: value for key, value in fields.items() if key.split(".", 1)[0] not in SERVER_MANAGED_FIELDS}
+
+def with_version_bump(update: Dict) -> Dict:
+    """``update`` that also increments ``version``, which every write must do (ETags depend on it)"""
+    return dict(update, **{"$inc": dict(update.get("$inc", {}), version=1)})
+
+def compliance_score(total: int, completed: int) -> float:
+    """Share of completed tasks and events; a business with none is fully compliant"""
+    return (completed / total) * 100 if total else 100.0
+
+# Same formula as compliance_score, evaluated by the server after the counters move
+_SCORE_EXPRESSION = {
+    "$cond": [
+        {"$gt": ["$compliance_counts.total", 0]},
+        {"$multiply": [{"$divide": ["$compliance_counts.completed", "$compliance_counts.total"]}, 100]},
+        100.0
+    ]
+}
+
+def _compliance_counter_update(total: int, completed: int) -> List[Dict]:
+    """Update pipeline: ``$inc`` the counters and recompute compliance_score in the same write"""
+    return [
+        {
+            "$set": {
+                "compliance_counts.total": {"$add": [{"$ifNull": ["$compliance_counts.total", 0]}, total]},
+                "compliance_counts.completed": {"$add": [{"$ifNull": ["$compliance_counts.completed", 0]}, completed]},
+                "updated_at": "$$NOW",
+                "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]}
+            }
+        },
+        {"$set": {"compliance_score": _SCORE_EXPRESSION}}
+    ]
+
+# Newest first; backed by the (status, created_at, _id) and (created_at, _id) indexes
+LIST_SORT = [("created_at", -1), ("_id", -1)]
+
+class BusinessRepository:
+    """Projected queries for the ``businesses`` collection.
+
+    Pass a causal ``session`` to keep read-your-writes across requests (see core.read_policy).
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, session: Optional[AsyncIOMotorClientSession] = None):
+        self.collection = db.businesses
+        self.session = session
+
+    async def exists(self, business_id: str) -> bool:
+        return await self.collection.find_one(
+            {"_id": ObjectId(business_id)}, EXISTS_PROJECTION, session=self.session
+        ) is not None
+
+    async def get_step_status(self, business_id: str) -> Optional[Dict]:
+        return await self.collection.find_one(
+            {"_id": ObjectId(business_id)}, STEP_STATUS_PROJECTION, session=self.session
+        )
+
+    async def get_onboarding(self, business_id: str) -> Optional[Dict]:
+        return await self.collection.find_one(
+            {"_id": ObjectId(business_id)}, ONBOARDING_PROJECTION, session=self.session
+        )
+
+    async def get_version(self, business_id: str) -> Optional[int]:
+        """Just the version counter (0 if never written since versioning); None if no such business"""
+        business = await self.collection.find_one(
+            {"_id": ObjectId(business_id)}, VERSION_PROJECTION, session=self.session
+        )
+        return None if business is None else business.get("version", 0)
+
+    async def get_profile(self, business_id: str) -> Optional[Dict]:
+        """The business itself; constant size however much history it has"""
+        return await self.collection.find_one(
+            {"_id": ObjectId(business_id)}, PROFILE_PROJECTION, session=self.session
+        )
+
+    async def list_page(
+        self,
+        query: Dict,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Page:
+        projection = parse_fields(fields, LIST_SORT) or ONBOARDING_PROJECTION
+        return await fetch_page(self.collection, query, LIST_SORT, limit, cursor, projection, self.session)
+
+    def stream(self, query: Dict, cursor: Optional[str] = None, fields: Optional[str] = None, transform=None):
+        projection = parse_fields(fields, LIST_SORT) or ONBOARDING_PROJECTION
+        return stream_ndjson(self.collection, query, LIST_SORT, cursor, projection, transform, self.session)
+
+    async def insert(self, business: Dict):
+        return await self.collection.insert_one(business, session=self.session)
+
+    async def get_compliance(self, business_id: str) -> Optional[Dict]:
+        return await self.collection.find_one(
+            {"_id": ObjectId(business_id)}, COMPLIANCE_PROJECTION, session=self.session
+        )
+
+    async def adjust_compliance(self, business_id: str, total: int = 0, completed: int = 0):
+        """Shift the task/event counters and the score with them; also bumps ``updated_at``.
+
+        ``matched_count`` tells whether the business exists.
+        """
+        return await self.collection.update_one(
+            {"_id": ObjectId(business_id)},
+            _compliance_counter_update(total, completed),
+            session=self.session
+        )
+
+    async def get_document_counts(self, business_id: str) -> Optional[Dict]:
+        return await self.collection.find_one(
+            {"_id": ObjectId(business_id)}, DOCUMENT_COUNTS_PROJECTION, session=self.session
+        )
+
+    async def adjust_document_counts(self, business_id: str, delta: Dict):
+        """``$inc`` the ``document_counts`` paths in ``delta`` and bump ``updated_at``.
+
+        ``matched_count`` tells whether the business exists.
+        """
+        return await self.collection.update_one(
+            {"_id": ObjectId(business_id)},
+            with_version_bump({
+                "$inc": {f"document_counts.{path}": value for path, value in delta.items()},
+                "$set": {"updated_at": datetime.utcnow()}
+            }),
+            session=self.session
+        )
+
+    async def replace_documents(self, business_id: str, fields: Dict) -> Optional[Dict]:
+        """Set step 3 ``fields`` (including ``documents``) and return the previous document references.
+
+        Returns None when the business does not exist.
+        """
+        return await self.collection.find_one_and_update(
+            {"_id": ObjectId(business_id)},
+            with_version_bump({"$set": fields}),
+            projection=DOCUMENT_REFS_PROJECTION,
+            return_document=ReturnDocument.BEFORE,
+            session=self.session
+        )
+
+    async def update_and_get(
+        self,
+        business_id: str,
+        update: Dict,
+        projection: Optional[Dict] = None,
+        conditions: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        """Apply ``update`` (plus the version bump) and return the post-image in one round trip.
+
+        Returns None when no business matches ``_id`` (and ``conditions``).
+        """
+        query = {"_id": ObjectId(business_id)}
+        if conditions:
+            query.update(conditions)
+        return await self.collection.find_one_and_update(
+            query,
+            with_version_bump(update),
+            projection=projection,
+            return_document=ReturnDocument.AFTER,
+            session=self.session
+        )
+
+    async def complete_onboarding(self, business_id: str, fields: Dict) -> Optional[Dict]:
+        """Set ``fields`` only if every earlier onboarding step is done"""
+        return await self.update_and_get(
+            business_id,
+            {"$set": fields},
+            projection=ONBOARDING_PROJECTION,
+            conditions=_all_present(ONBOARDING_STEP_FIELDS)
+        )
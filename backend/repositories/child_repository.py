@@ -0,0 +1,74 @@
+from typing import Dict, Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from core.pagination import Page, SortSpec, fetch_page, parse_fields
+
+def to_child_document(business_id: str, item: Dict) -> Dict:
+    """Stored shape of an embedded-model dict: its ``id`` becomes ``_id``, keyed by business"""
+    doc = dict(item)
+    item_id = doc.pop("id", None)
+    doc["_id"] = ObjectId(item_id) if item_id and ObjectId.is_valid(item_id) else ObjectId()
+    doc["business_id"] = ObjectId(business_id)
+    return doc
+
+def from_child_document(doc: Dict) -> Dict:
+    """Model-shaped dict from a stored child document"""
+    doc = dict(doc)
+    doc["id"] = str(doc.pop("_id"))
+    doc.pop("business_id", None)
+    return doc
+
+class BusinessChildRepository:
+    """Queries for a collection of per-business history records keyed by ``business_id``.
+
+    Subclasses set ``collection_name`` and ``list_sort``; every query is scoped to one
+    business and served by a ``business_id``-prefixed index.
+    """
+
+    collection_name: str
+    list_sort: SortSpec
+    # Order for the dashboard's recent activity; backed by a (business_id, ...) index
+    recent_sort: SortSpec = [("_id", -1)]
+
+    def __init__(self, db: AsyncIOMotorDatabase, session: Optional[AsyncIOMotorClientSession] = None):
+        self.collection = db[self.collection_name]
+        self.session = session
+
+    async def insert(self, business_id: str, item: Dict) -> Dict:
+        doc = to_child_document(business_id, item)
+        await self.collection.insert_one(doc, session=self.session)
+        return doc
+
+    async def get(self, business_id: str, item_id: str) -> Optional[Dict]:
+        return await self.collection.find_one(
+            {"_id": ObjectId(item_id), "business_id": ObjectId(business_id)}, session=self.session
+        )
+
+    async def set_status(self, business_id: str, item_id: str, status: str, fields: Optional[Dict] = None) -> Optional[Dict]:
+        """Move a record to ``status`` and return its pre-image.
+
+        Returns None if the record does not exist or already has that status, so a
+        transition is only ever applied (and counted) once.
+        """
+        return await self.collection.find_one_and_update(
+            {"_id": ObjectId(item_id), "business_id": ObjectId(business_id), "status": {"$ne": status}},
+            {"$set": {"status": status, **(fields or {})}},
+            return_document=ReturnDocument.BEFORE,
+            session=self.session
+        )
+
+    async def list_page(
+        self,
+        business_id: str,
+        filters: Optional[Dict] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Page:
+        query = {"business_id": ObjectId(business_id), **(filters or {})}
+        return await fetch_page(
+            self.collection, query, self.list_sort, limit, cursor,
+            parse_fields(fields, self.list_sort), self.session
+        )
@@ -0,0 +1,37 @@
+from typing import Dict, Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from core.pagination import Page, fetch_page, stream_ndjson
+
+LIST_SORT = [("_id", 1)]
+
+class CompanyRepository:
+    """Queries for the ``companies`` collection"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.companies
+
+    async def get(self, company_id: ObjectId) -> Optional[Dict]:
+        return await self.collection.find_one({"_id": company_id})
+
+    async def list_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+        return await fetch_page(self.collection, {}, LIST_SORT, limit, cursor)
+
+    def stream(self, cursor: Optional[str] = None, transform=None):
+        return stream_ndjson(self.collection, {}, LIST_SORT, cursor, transform=transform)
+
+    async def insert(self, company: Dict):
+        return await self.collection.insert_one(company)
+
+    async def update(self, company_id: ObjectId, update_data: Dict) -> Optional[Dict]:
+        """Apply ``update_data`` and return the updated company, or None if it does not exist"""
+        return await self.collection.find_one_and_update(
+            {"_id": company_id},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def delete(self, company_id: ObjectId):
+        return await self.collection.delete_one({"_id": company_id})
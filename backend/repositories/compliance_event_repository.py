@@ -0,0 +1,9 @@
+from repositories.child_repository import BusinessChildRepository
+
+class ComplianceEventRepository(BusinessChildRepository):
+    """Per-business compliance events (``compliance_events``)"""
+
+    collection_name = "compliance_events"
+
+    # Soonest due first; backed by the (business_id, due_date, _id) indexes
+    list_sort = [("due_date", 1), ("_id", 1)]
@@ -0,0 +1,85 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Type
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+
+from repositories.child_repository import BusinessChildRepository
+from repositories.compliance_event_repository import ComplianceEventRepository
+from repositories.document_repository import BusinessDocumentRepository, stats_from_counts
+from repositories.task_repository import TaskRepository, open_due_query
+from schemas.business import TaskPriority
+
+DASHBOARD_HEADER_PROJECTION = {
+    "name": 1,
+    "businessName": 1,
+    "compliance_score": 1,
+}
+
+# Read alongside the header but reshaped before it is returned
+DASHBOARD_PROJECTION = dict(DASHBOARD_HEADER_PROJECTION, document_counts=1)
+
+def _latest(repository: Type[BusinessChildRepository], count: int) -> List[Dict]:
+    return [{"$sort": dict(repository.recent_sort)}, {"$limit": count}]
+
+def _lookup(repository: Type[BusinessChildRepository], pipeline: List[Dict], field: str) -> Dict:
+    # Uncorrelated sub-pipeline: runs once, on the child collection's business_id index
+    return {"$lookup": {"from": repository.collection_name, "pipeline": pipeline, "as": field}}
+
+def dashboard_pipeline(business_id: ObjectId, upcoming_cutoff: datetime, recent: int) -> List[Dict]:
+    return [
+        {"$match": {"_id": business_id}},
+        {"$project": DASHBOARD_PROJECTION},
+        _lookup(BusinessDocumentRepository, [
+            {"$match": {"business_id": business_id}},
+            *_latest(BusinessDocumentRepository, recent)
+        ], "recent_documents"),
+        _lookup(TaskRepository, [
+            {"$match": {"business_id": business_id, **open_due_query(due_before=upcoming_cutoff)}},
+            {
+                "$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "urgent": {"$sum": {"$cond": [{"$eq": ["$priority", TaskPriority.URGENT.value]}, 1, 0]}}
+                }
+            }
+        ], "upcoming_tasks"),
+        _lookup(TaskRepository, [
+            {"$match": {"business_id": business_id}},
+            *_latest(TaskRepository, recent)
+        ], "recent_tasks"),
+        _lookup(ComplianceEventRepository, [
+            {"$match": {"business_id": business_id}},
+            *_latest(ComplianceEventRepository, recent)
+        ], "recent_events"),
+    ]
+
+class DashboardRepository:
+    """Everything the business dashboard shows, in one aggregation round trip"""
+
+    def __init__(self, db: AsyncIOMotorDatabase, session: Optional[AsyncIOMotorClientSession] = None):
+        self.collection = db.businesses
+        self.session = session
+
+    async def get(self, business_id: str, upcoming_cutoff: datetime, recent: int) -> Optional[Dict]:
+        """Header, document stats, upcoming task counts and the latest ``recent`` records.
+
+        Returns None when the business does not exist.
+        """
+        cursor = self.collection.aggregate(
+            dashboard_pipeline(ObjectId(business_id), upcoming_cutoff, recent),
+            session=self.session
+        )
+        results = await cursor.to_list(length=1)
+        if not results:
+            return None
+
+        result = results[0]
+        upcoming = result["upcoming_tasks"][0] if result["upcoming_tasks"] else {"total": 0, "urgent": 0}
+        return {
+            "business": {key: result.get(key) for key in DASHBOARD_HEADER_PROJECTION},
+            "document_stats": stats_from_counts(result.get("document_counts")),
+            "upcoming_tasks": {"total": upcoming["total"], "urgent": upcoming["urgent"]},
+            "recent_documents": result["recent_documents"],
+            "recent_tasks": result["recent_tasks"],
+            "recent_events": result["recent_events"],
+        }
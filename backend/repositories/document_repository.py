@@ -0,0 +1,100 @@
+from typing import Dict, Iterable, Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from repositories.child_repository import BusinessChildRepository
+
+OCR_STATUSES = ["completed", "pending", "failed"]
+
+# Fields needed to move the per-business counters when a document changes
+COUNTED_PROJECTION = {"business_id": 1, "doc_type": 1, "size": 1, "ocr_status": 1, "file_path": 1}
+
+def empty_document_counts() -> Dict:
+    return {"total": 0, "bytes": 0, "by_type": {}, "by_ocr_status": {}}
+
+def without_zero_counts(counts: Dict) -> Dict:
+    """``counts`` minus the ``by_type``/``by_ocr_status`` entries decremented to 0 (a recount never has them)"""
+    return dict(counts, **{
+        group: {key: count for key, count in counts.get(group, {}).items() if count}
+        for group in ("by_type", "by_ocr_status")
+    })
+
+def document_counts_delta(document: Dict, sign: int = 1) -> Dict:
+    """``$inc`` paths (under ``document_counts``) for adding (+1) or removing (-1) a document"""
+    doc_type = document["doc_type"]
+    return {
+        "total": sign,
+        "bytes": sign * (document.get("size") or 0),
+        f"by_type.{getattr(doc_type, 'value', doc_type)}": sign,
+        f"by_ocr_status.{document.get('ocr_status', 'pending')}": sign,
+    }
+
+def stats_from_counts(counts: Optional[Dict]) -> Dict:
+    """API shape of the stored ``document_counts``"""
+    counts = counts or empty_document_counts()
+    by_ocr_status = counts.get("by_ocr_status", {})
+    return {
+        "total_documents": counts.get("total", 0),
+        "total_size": counts.get("bytes", 0),
+        "by_type": {doc_type: count for doc_type, count in counts.get("by_type", {}).items() if count},
+        "processing_status": {status: by_ocr_status.get(status, 0) for status in OCR_STATUSES}
+    }
+
+class BusinessDocumentRepository(BusinessChildRepository):
+    """Documents uploaded through the business service (``business_documents``)"""
+
+    collection_name = "business_documents"
+
+    # Newest first; backed by the (business_id, upload_date, _id) indexes
+    list_sort = [("upload_date", -1), ("_id", -1)]
+    recent_sort = list_sort
+
+    async def set_ocr_result(self, document_id: str, status: str, ocr_data: Dict) -> Optional[Dict]:
+        """Record an OCR outcome and return the pre-image.
+
+        Returns None if the document is gone or already has ``status``, so the
+        counters are moved at most once per transition.
+        """
+        return await self.collection.find_one_and_update(
+            {"_id": ObjectId(document_id), "ocr_status": {"$ne": status}},
+            {"$set": {"ocr_status": status, "ocr_data": ocr_data}},
+            projection=COUNTED_PROJECTION,
+            return_document=ReturnDocument.BEFORE,
+            session=self.session
+        )
+
+    async def delete(self, business_id: str, document_id: str) -> Optional[Dict]:
+        """Delete a document and return what is needed to un-count it (None if not found)"""
+        return await self.collection.find_one_and_delete(
+            {"_id": ObjectId(document_id), "business_id": ObjectId(business_id)},
+            projection=COUNTED_PROJECTION,
+            session=self.session
+        )
+
+    async def count_by_business(self, business_ids: Iterable[ObjectId]) -> Dict[ObjectId, Dict]:
+        """``document_counts`` recomputed from the documents themselves"""
+        cursor = self.collection.aggregate(
+            [
+                {"$match": {"business_id": {"$in": list(business_ids)}}},
+                {
+                    "$group": {
+                        "_id": {"business_id": "$business_id", "doc_type": "$doc_type", "ocr_status": "$ocr_status"},
+                        "count": {"$sum": 1},
+                        "bytes": {"$sum": "$size"}
+                    }
+                }
+            ],
+            session=self.session
+        )
+        counts: Dict[ObjectId, Dict] = {}
+        async for group in cursor:
+            key = group["_id"]
+            business = counts.setdefault(key["business_id"], empty_document_counts())
+            business["total"] += group["count"]
+            business["bytes"] += group["bytes"]
+            by_type = business["by_type"]
+            by_type[key["doc_type"]] = by_type.get(key["doc_type"], 0) + group["count"]
+            by_ocr_status = business["by_ocr_status"]
+            ocr_status = key.get("ocr_status") or "pending"
+            by_ocr_status[ocr_status] = by_ocr_status.get(ocr_status, 0) + group["count"]
+        return counts
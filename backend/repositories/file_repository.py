@@ -0,0 +1,136 @@
+from typing import Dict, Iterable, List, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+
+from core.pagination import Page, fetch_page, parse_fields, stream_ndjson
+
+# Fields an onboarding step copies into the business' document references
+ATTACHMENT_PROJECTION = {
+    "filename": 1,
+    "file_size": 1,
+    "file_hash": 1,
+    "content_type": 1,
+}
+
+DEDUP_PROJECTION = {"filename": 1}
+
+HASH_PROJECTION = {"file_hash": 1}
+
+REF_COUNT_PROJECTION = {"ref_count": 1}
+
+# Everything a client sees about a file: the stored content's description, not
+# bookkeeping that changes as records attach and detach it
+INFO_PROJECTION = {"ref_count": 0}
+
+# Missing counts to 0 too: metadata written before reference counting was never attached
+UNREFERENCED = {"ref_count": {"$not": {"$gt": 0}}}
+
+# Newest uploads first; backed by the (document_type, uploaded_at, _id) and (uploaded_at, _id) indexes
+LIST_SORT = [("uploaded_at", -1), ("_id", -1)]
+
+class FileMetadataRepository:
+    """Projected queries for the ``file_metadata`` collection"""
+
+    def __init__(self, db: AsyncIOMotorDatabase, session: Optional[AsyncIOMotorClientSession] = None):
+        self.collection = db.file_metadata
+        self.session = session
+
+    async def get_many_for_attachment(self, file_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Attachment metadata for several files in one ``$in`` query, keyed by string ID.
+
+        Malformed or unknown IDs are simply absent from the result.
+        """
+        object_ids = []
+        for file_id in file_ids:
+            try:
+                object_ids.append(ObjectId(file_id))
+            except (InvalidId, TypeError):
+                continue
+        if not object_ids:
+            return {}
+        cursor = self.collection.find(
+            {"_id": {"$in": object_ids}}, ATTACHMENT_PROJECTION, session=self.session
+        )
+        return {str(doc["_id"]): doc async for doc in cursor}
+
+    async def find_by_hash(self, file_hash: str) -> Optional[Dict]:
+        """The stored file with this content, via the unique ``file_hash`` index"""
+        return await self.collection.find_one(
+            {"file_hash": file_hash}, DEDUP_PROJECTION, session=self.session
+        )
+
+    async def get_hash(self, file_id: str) -> Optional[str]:
+        """Content hash of a file (its ETag); None if unknown or the ID is malformed"""
+        try:
+            metadata = await self.collection.find_one(
+                {"_id": ObjectId(file_id)}, HASH_PROJECTION, session=self.session
+            )
+        except InvalidId:
+            return None
+        return metadata.get("file_hash") if metadata else None
+
+    async def get_info(self, file_id: str) -> Optional[Dict]:
+        return await self.collection.find_one({"_id": ObjectId(file_id)}, INFO_PROJECTION, session=self.session)
+
+    async def list_page(
+        self,
+        query: Dict,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Page:
+        return await fetch_page(self.collection, query, LIST_SORT, limit, cursor, parse_fields(fields, LIST_SORT), self.session)
+
+    def stream(self, query: Dict, cursor: Optional[str] = None, fields: Optional[str] = None, transform=None):
+        return stream_ndjson(self.collection, query, LIST_SORT, cursor, parse_fields(fields, LIST_SORT), transform, self.session)
+
+    async def insert(self, metadata: Dict):
+        return await self.collection.insert_one(metadata, session=self.session)
+
+    async def delete(self, file_id: str):
+        return await self.collection.delete_one({"_id": ObjectId(file_id)}, session=self.session)
+
+    async def get_ref_count(self, file_id: str) -> Optional[int]:
+        """How many onboarding document slots point at the file; None if there is no such file"""
+        metadata = await self.collection.find_one(
+            {"_id": ObjectId(file_id)}, REF_COUNT_PROJECTION, session=self.session
+        )
+        return None if metadata is None else metadata.get("ref_count", 0)
+
+    async def add_references(self, counts: Dict[str, int]) -> int:
+        """``$inc`` each file's ``ref_count`` by its (possibly negative) count in one bulk write.
+
+        Returns how many of the files still existed.
+        """
+        if not counts:
+            return 0
+        result = await self.collection.bulk_write(
+            [UpdateOne({"_id": ObjectId(file_id)}, {"$inc": {"ref_count": count}}) for file_id, count in counts.items()],
+            ordered=False,
+            session=self.session
+        )
+        return result.matched_count
+
+    async def release_references(self, counts: Dict[str, int]) -> List[str]:
+        """Drop references and return the files nothing points at any more"""
+        unreferenced = []
+        for file_id, count in counts.items():
+            metadata = await self.collection.find_one_and_update(
+                {"_id": ObjectId(file_id)},
+                {"$inc": {"ref_count": -count}},
+                projection=REF_COUNT_PROJECTION,
+                return_document=ReturnDocument.AFTER,
+                session=self.session
+            )
+            if metadata is not None and metadata["ref_count"] <= 0:
+                unreferenced.append(file_id)
+        return unreferenced
+
+    async def delete_if_unreferenced(self, file_id: str) -> bool:
+        """Delete the metadata only while no record references the file (checked in the same write)"""
+        result = await self.collection.delete_one(
+            dict(UNREFERENCED, _id=ObjectId(file_id)), session=self.session
+        )
+        return result.deleted_count == 1
@@ -0,0 +1,17 @@
+from fastapi import Depends
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from core.database import get_database
+from core.dataloader import DataLoader
+from repositories.file_repository import FileMetadataRepository
+
+class RequestLoaders:
+    """Batching loaders shared by everything handling one request"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        # Attachment metadata keyed by string file ID
+        self.file_metadata = DataLoader(FileMetadataRepository(db).get_many_for_attachment)
+
+def get_loaders(db: AsyncIOMotorDatabase = Depends(get_database)) -> RequestLoaders:
+    """FastAPI dependency: a fresh set of loaders (and memo cache) per request"""
+    return RequestLoaders(db)
@@ -0,0 +1,123 @@
+from datetime import datetime
+from typing import Dict, Optional, Set
+from bson import ObjectId
+
+from core.pagination import Page, fetch_page, parse_fields
+from repositories.child_repository import BusinessChildRepository
+from schemas.business import TaskPriority, TaskStatus
+
+# Spelled out (rather than ``$ne: completed``) so the status index can be used for equality
+OPEN_STATUSES = [status.value for status in TaskStatus if status is not TaskStatus.COMPLETED]
+
+# Open tasks that can still become overdue
+NOT_YET_OVERDUE_STATUSES = [TaskStatus.PENDING.value, TaskStatus.IN_PROGRESS.value]
+
+def open_due_query(due_after: Optional[datetime] = None, due_before: Optional[datetime] = None) -> Dict:
+    """Open tasks with ``due_after <= due_date <= due_before`` (either bound optional)"""
+    query: Dict = {"status": {"$in": OPEN_STATUSES}}
+    due_date: Dict = {}
+    if due_after is not None:
+        due_date["$gte"] = due_after
+    if due_before is not None:
+        due_date["$lte"] = due_before
+    if due_date:
+        query["due_date"] = due_date
+    return query
+
+class TaskRepository(BusinessChildRepository):
+    """Per-business compliance tasks (``business_tasks``)"""
+
+    collection_name = "business_tasks"
+
+    # Soonest due first; backed by the (business_id, due_date, _id) indexes
+    list_sort = [("due_date", 1), ("_id", 1)]
+
+    async def open_due_page(
+        self,
+        business_id: str,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Page:
+        """One business' open tasks in a due-date window, soonest first.
+
+        Served by (business_id, status, due_date, _id): one index range per open
+        status, merged in due-date order, so completed history is never read.
+        """
+        return await self.list_page(business_id, open_due_query(due_after, due_before), limit, cursor, fields)
+
+    async def open_due_page_all(
+        self,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Page:
+        """Open tasks of every business in a due-date window, soonest first.
+
+        Served by (status, due_date, _id).
+        """
+        return await fetch_page(
+            self.collection, open_due_query(due_after, due_before), self.list_sort, limit, cursor,
+            parse_fields(fields and f"{fields},business_id", self.list_sort), self.session
+        )
+
+    # Cross-business sweeps; each is one server-side update_many on the (status, due_date, _id) index.
+    # With ``dry_run`` they count what they would change instead. ``touched``, if
+    # given, collects the businesses whose tasks an update changed.
+
+    async def _sweep(self, query: Dict, update: Dict, dry_run: bool, touched: Optional[Set[ObjectId]]) -> int:
+        if dry_run:
+            return await self.collection.count_documents(query, session=self.session)
+        result = await self.collection.update_many(query, update, session=self.session)
+        if touched is not None and result.modified_count:
+            # Read after the update, by the values just set (they carry this run's timestamp),
+            # so tasks that started matching between a read and the update are not missed
+            touched.update(await self.collection.distinct("business_id", update["$set"], session=self.session))
+        return result.modified_count
+
+    async def mark_overdue(self, now: datetime, dry_run: bool = False, touched: Optional[Set[ObjectId]] = None) -> int:
+        """Pending and in-progress tasks past their due date become ``overdue``"""
+        return await self._sweep(
+            {"status": {"$in": NOT_YET_OVERDUE_STATUSES}, "due_date": {"$lt": now}},
+            {"$set": {"status": TaskStatus.OVERDUE.value, "updated_at": now}},
+            dry_run,
+            touched
+        )
+
+    async def escalate_due_before(
+        self,
+        now: datetime,
+        cutoff: datetime,
+        dry_run: bool = False,
+        touched: Optional[Set[ObjectId]] = None
+    ) -> int:
+        """Open tasks due before ``cutoff`` (overdue ones included) become ``urgent``"""
+        return await self._sweep(
+            {
+                "status": {"$in": OPEN_STATUSES},
+                "due_date": {"$lt": cutoff},
+                "priority": {"$ne": TaskPriority.URGENT.value}
+            },
+            {"$set": {"priority": TaskPriority.URGENT.value, "updated_at": now}},
+            dry_run,
+            touched
+        )
+
+    async def stamp_reminders(
+        self,
+        now: datetime,
+        cutoff: datetime,
+        dry_run: bool = False,
+        touched: Optional[Set[ObjectId]] = None
+    ) -> int:
+        """Open tasks entering the reminder window (due by ``cutoff``) get ``reminder_at``, once"""
+        return await self._sweep(
+            dict(open_due_query(now, cutoff), reminder_at={"$exists": False}),
+            {"$set": {"reminder_at": now}},
+            dry_run,
+            touched
+        )
@@ -0,0 +1,192 @@
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from bson import Binary, ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+
+# Everything but the buffered partial chunk
+STATUS_PROJECTION = {"tail": 0}
+
+EXPIRED_PROJECTION = {"file_id": 1}
+
+class UploadSessionRepository:
+    """Resumable uploads in progress, in the ``upload_sessions`` collection.
+
+    A session owns the GridFS file ID its chunks are written under. ``offset``
+    counts the bytes received so far: whole chunks already in
+    ``documents.chunks`` plus ``tail``, the partial chunk kept on the session.
+
+    Only the request holding the session's write lock (``writer`` until
+    ``locked_until``) writes chunks, so two requests at the same offset never
+    write the same chunk. ``finalizing`` marks a session whose file is being
+    assembled; it is deleted once the file is committed or aborted.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, session: Optional[AsyncIOMotorClientSession] = None):
+        self.collection = db.upload_sessions
+        self.session = session
+
+    async def insert(self, upload: Dict):
+        return await self.collection.insert_one(upload, session=self.session)
+
+    async def get(self, upload_id: str, projection: Optional[Dict] = None) -> Optional[Dict]:
+        """A live session; None if unknown, malformed or expired (cleanup may not have run yet)"""
+        try:
+            query = {"_id": ObjectId(upload_id), "expires_at": {"$gt": datetime.utcnow()}}
+        except InvalidId:
+            return None
+        return await self.collection.find_one(query, projection, session=self.session)
+
+    async def lock(self, upload_id: ObjectId, offset: int, writer: ObjectId, locked_until: datetime) -> Optional[Dict]:
+        """Take the write lock of a live session still at ``offset``; None if it moved, is locked or is finalizing"""
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {
+                "_id": upload_id,
+                "offset": offset,
+                "expires_at": {"$gt": now},
+                "finalizing": {"$ne": True},
+                "locked_until": {"$not": {"$gt": now}}
+            },
+            {"$set": {"writer": writer, "locked_until": locked_until}},
+            return_document=ReturnDocument.AFTER,
+            session=self.session
+        )
+
+    async def hold(self, upload_id: ObjectId, writer: ObjectId, locked_until: datetime) -> bool:
+        """Extend ``writer``'s lock; False if it ran out and another request took the session"""
+        result = await self.collection.update_one(
+            {"_id": upload_id, "writer": writer},
+            {"$set": {"locked_until": locked_until}},
+            session=self.session
+        )
+        return result.matched_count == 1
+
+    async def unlock(self, upload_id: ObjectId, writer: ObjectId):
+        return await self.collection.update_one(
+            {"_id": upload_id, "writer": writer},
+            {"$unset": {"writer": "", "locked_until": ""}},
+            session=self.session
+        )
+
+    async def advance(
+        self,
+        upload_id: ObjectId,
+        writer: ObjectId,
+        from_offset: int,
+        to_offset: int,
+        tail: bytes,
+        expires_at: datetime,
+        locked_until: datetime
+    ) -> bool:
+        """Record progress (and extend the lock), only if ``writer`` still holds the session at ``from_offset``"""
+        result = await self.collection.update_one(
+            {"_id": upload_id, "writer": writer, "offset": from_offset},
+            {"$set": {
+                "offset": to_offset,
+                "tail": Binary(tail),
+                "updated_at": datetime.utcnow(),
+                "expires_at": expires_at,
+                "locked_until": locked_until
+            }},
+            session=self.session
+        )
+        return result.matched_count == 1
+
+    async def start_finalizing(self, upload_id: ObjectId, offset: int, expires_at: datetime) -> Optional[Dict]:
+        """Mark an unlocked session still at ``offset`` as finalizing and return it, so only one request finalizes it"""
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {
+                "_id": upload_id,
+                "offset": offset,
+                "expires_at": {"$gt": now},
+                "finalizing": {"$ne": True},
+                "locked_until": {"$not": {"$gt": now}}
+            },
+            {"$set": {"finalizing": True, "updated_at": now, "expires_at": expires_at}},
+            return_document=ReturnDocument.AFTER,
+            session=self.session
+        )
+
+    async def delete(self, upload_id: ObjectId) -> Optional[Dict]:
+        return await self.collection.find_one_and_delete(
+            {"_id": upload_id}, EXPIRED_PROJECTION, session=self.session
+        )
+
+    async def delete_idle(self, upload_id: ObjectId) -> Optional[Dict]:
+        """Remove a session nobody is writing to or finalizing"""
+        return await self.collection.find_one_and_delete(
+            {"_id": upload_id, "finalizing": {"$ne": True}, "locked_until": {"$not": {"$gt": datetime.utcnow()}}},
+            EXPIRED_PROJECTION,
+            session=self.session
+        )
+
+    async def expired(self, now: datetime, limit: int) -> List[Dict]:
+        cursor = self.collection.find(
+            {"expires_at": {"$lte": now}}, EXPIRED_PROJECTION, session=self.session
+        ).sort("expires_at", ASCENDING).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def take_expired(self, upload_id: ObjectId, now: datetime) -> Optional[Dict]:
+        """Remove a session if it is still expired (it may have been resumed since it was listed)"""
+        return await self.collection.find_one_and_delete(
+            {"_id": upload_id, "expires_at": {"$lte": now}}, EXPIRED_PROJECTION, session=self.session
+        )
+
+class GridFSChunkRepository:
+    """Direct access to a GridFS bucket's ``files`` and ``chunks`` collections.
+
+    Resumable uploads arrive over many requests, which a driver upload stream
+    cannot span, so their chunks are written here one by one and the file
+    document is inserted last, at which point the file becomes visible.
+    """
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        bucket_name: str = "documents",
+        session: Optional[AsyncIOMotorClientSession] = None
+    ):
+        self.files = db[f"{bucket_name}.files"]
+        self.chunks = db[f"{bucket_name}.chunks"]
+        self.session = session
+
+    async def write(self, file_id: ObjectId, first_n: int, chunks: List[bytes]):
+        """Store chunks ``first_n, first_n + 1, ...``.
+
+        Callers hold the session's write lock, so a chunk that already exists is
+        left over from a cut-off request at the same offset and is overwritten.
+        """
+        if not chunks:
+            return
+        await self.chunks.bulk_write(
+            [
+                UpdateOne({"files_id": file_id, "n": first_n + i}, {"$set": {"data": Binary(data)}}, upsert=True)
+                for i, data in enumerate(chunks)
+            ],
+            ordered=False,
+            session=self.session
+        )
+
+    async def iter_chunks(self, file_id: ObjectId) -> AsyncIterator[Dict]:
+        cursor = self.chunks.find({"files_id": file_id}, session=self.session).sort("n", ASCENDING)
+        async for chunk in cursor:
+            yield chunk
+
+    async def insert_file(self, file_doc: Dict):
+        return await self.files.insert_one(file_doc, session=self.session)
+
+    async def committed(self, file_ids: Iterable[ObjectId]) -> List[ObjectId]:
+        """Those of ``file_ids`` whose file document exists, i.e. whose chunks belong to a stored file"""
+        cursor = self.files.find({"_id": {"$in": list(file_ids)}}, {"_id": 1}, session=self.session)
+        return [doc["_id"] async for doc in cursor]
+
+    async def delete_file(self, file_id: ObjectId):
+        """Remove a stored file: its file document first (so it disappears at once), then its chunks"""
+        await self.files.delete_one({"_id": file_id}, session=self.session)
+        await self.delete_chunks([file_id])
+
+    async def delete_chunks(self, file_ids: Iterable[ObjectId]):
+        return await self.chunks.delete_many({"files_id": {"$in": list(file_ids)}}, session=self.session)
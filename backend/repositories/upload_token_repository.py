@@ -0,0 +1,32 @@
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+
+class UploadTokenRepository:
+    """One-shot tokens for hash-first uploads in the ``upload_tokens`` collection.
+
+    A token records the SHA-256 and size the client declared; a TTL index on
+    ``expires_at`` removes unused ones.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, session: Optional[AsyncIOMotorClientSession] = None):
+        self.collection = db.upload_tokens
+        self.session = session
+
+    async def issue(self, declared: Dict, ttl_seconds: int) -> Dict:
+        now = datetime.utcnow()
+        token = dict(
+            declared,
+            _id=secrets.token_urlsafe(32),
+            created_at=now,
+            expires_at=now + timedelta(seconds=ttl_seconds)
+        )
+        await self.collection.insert_one(token, session=self.session)
+        return token
+
+    async def take(self, token: str) -> Optional[Dict]:
+        """Consume a token; None if unknown, already used or expired (the TTL monitor may lag)"""
+        return await self.collection.find_one_and_delete(
+            {"_id": token, "expires_at": {"$gt": datetime.utcnow()}}, session=self.session
+        )
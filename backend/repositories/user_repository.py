@@ -0,0 +1,49 @@
+from typing import Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from core.pagination import Page, fetch_page, parse_fields, stream_ndjson
+
+EXISTS_PROJECTION = {"_id": 1}
+
+LIST_SORT = [("_id", 1)]
+
+class UserRepository:
+    """Projected queries for the ``users`` collection"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.users
+
+    async def exists_by_email(self, email: str) -> bool:
+        return await self.collection.find_one({"email": email}, EXISTS_PROJECTION) is not None
+
+    async def get_by_email(self, email: str) -> Optional[Dict]:
+        return await self.collection.find_one({"email": email})
+
+    async def get_by_id(self, user_id) -> Optional[Dict]:
+        return await self.collection.find_one({"_id": user_id})
+
+    async def list_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Page:
+        return await fetch_page(self.collection, {}, LIST_SORT, limit, cursor, parse_fields(fields, LIST_SORT))
+
+    def stream(self, cursor: Optional[str] = None, fields: Optional[str] = None, transform=None):
+        return stream_ndjson(self.collection, {}, LIST_SORT, cursor, parse_fields(fields, LIST_SORT), transform)
+
+    async def insert(self, user: Dict):
+        return await self.collection.insert_one(user)
+
+    async def update_by_email(self, email: str, update_data: Dict) -> Optional[Dict]:
+        """Apply ``update_data`` and return the updated user, or None if no user has ``email``"""
+        return await self.collection.find_one_and_update(
+            {"email": email},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def update_by_id(self, user_id, update_data: Dict):
+        return await self.collection.update_one({"_id": user_id}, {"$set": update_data})
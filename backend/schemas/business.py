@@ -1,10 +1,63 @@
 from pydantic import BaseModel, Field, EmailStr, field_validator
-from typing import Optional, List, Dict
+from typing import Any, Callable, Optional, List, Dict, Union, get_args, get_origin
 from datetime import datetime
 from enum import Enum
 from bson import ObjectId
 import re
 
+def _trusted_converter(annotation) -> Optional[Callable[[Any], Any]]:
+    """Cheap conversion of a stored value for ``annotation``, or None to keep it as is"""
+    origin = get_origin(annotation)
+    if origin is Union:
+        # Optional[X]: None is stored as None, anything else is an X
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _trusted_converter(args[0]) if len(args) == 1 else None
+    if origin is list:
+        args = get_args(annotation)
+        item = _trusted_converter(args[0]) if args else None
+        if item is None:
+            return None
+        return lambda value: [item(v) for v in value] if isinstance(value, list) else value
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return lambda value: value if value is None or isinstance(value, annotation) else annotation(value)
+    if isinstance(annotation, type) and issubclass(annotation, TrustedModel):
+        return lambda value: annotation.from_db(value) if isinstance(value, dict) else value
+    return None
+
+class TrustedModel(BaseModel):
+    """Model that can be built from our own stored documents without re-validation.
+
+    ``from_db`` skips the field validators (PAN/GSTIN/IFSC/phone regexes, email
+    parsing, datetime coercion) and only rebuilds what serialization needs:
+    nested models and enum members. Use it for documents read back from MongoDB,
+    never for request input.
+
+    Only worth it for models with Python validators or nested models: flat models
+    such as ``Task`` validate in pydantic-core faster than ``model_construct`` runs.
+    """
+
+    @classmethod
+    def _trusted_fields(cls) -> Dict[str, Callable[[Any], Any]]:
+        # Per class, not inherited: subclasses have their own fields
+        converters = cls.__dict__.get("_trusted_converters")
+        if converters is None:
+            converters = {}
+            for name, field in cls.model_fields.items():
+                converter = _trusted_converter(field.annotation)
+                if converter is not None:
+                    converters[name] = converter
+            cls._trusted_converters = converters
+        return converters
+
+    @classmethod
+    def from_db(cls, data: Dict):
+        """Instance from a stored document; unknown keys (e.g. ``_id``) are dropped, defaults filled"""
+        values = {name: data[name] for name in cls.model_fields if name in data}
+        for name, converter in cls._trusted_fields().items():
+            if name in values:
+                values[name] = converter(values[name])
+        return cls.model_construct(**values)
+
 # Basic Enums
 class BusinessType(str, Enum):
     PVT_LTD = "Pvt Ltd"
@@ -52,7 +105,7 @@ class AgentStatus(str, Enum):
     OFFLINE = "offline"
 
 # Base Models
-class Address(BaseModel):
+class Address(TrustedModel):
     street: str
     city: str
     state: str
@@ -66,7 +119,7 @@ class Address(BaseModel):
             raise ValueError('Postal code must be 6 digits')
         return v
 
-class BankDetails(BaseModel):
+class BankDetails(TrustedModel):
     account_name: str
     account_number: str
     ifsc_code: str
@@ -87,7 +140,7 @@ class BankDetails(BaseModel):
             raise ValueError('Invalid IFSC code format')
         return v
 
-class ContactInfo(BaseModel):
+class ContactInfo(TrustedModel):
     email: EmailStr
     phone: str
     website: Optional[str] = None
@@ -163,7 +216,7 @@ class ChatMessage(BaseModel):
     metadata: Optional[Dict] = None
 
 # Main Business Model
-class Business(BaseModel):
+class Business(TrustedModel):
     id: str = Field(default_factory=lambda: str(ObjectId()))
     
     # Basic Info
@@ -180,10 +233,7 @@ class Business(BaseModel):
     contact_info: Optional[ContactInfo] = None
     bank_details: Optional[BankDetails] = None
     
-    # Documents and Compliance
-    documents: List[Document] = []
-    tasks: List[Task] = []
-    compliance_events: List[ComplianceEvent] = []
+    # Compliance (documents, tasks and events live in their own collections)
     compliance_score: float = 0.0
     
     # Settings and Configuration
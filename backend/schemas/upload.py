@@ -0,0 +1,27 @@
+from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+
+class UploadHandshake(BaseModel):
+    """What a client knows about a file before sending it"""
+    sha256: str = Field(pattern=r"^[0-9a-fA-F]{64}$")
+    size: int = Field(gt=0)
+    filename: str = Field(min_length=1)
+    document_type: str
+
+    @field_validator('sha256')
+    @classmethod
+    def normalize_hash(cls, v):
+        # Stored hashes are lowercase hexdigests
+        return v.lower()
+
+class UploadSessionCreate(BaseModel):
+    """A resumable upload: the total size up front, the bytes over as many requests as needed"""
+    filename: str = Field(min_length=1)
+    document_type: str
+    size: int = Field(gt=0)
+    sha256: Optional[str] = Field(None, pattern=r"^[0-9a-fA-F]{64}$")  # verified on completion when given
+
+    @field_validator('sha256')
+    @classmethod
+    def normalize_hash(cls, v):
+        return v.lower() if v else v
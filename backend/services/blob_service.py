@@ -0,0 +1,76 @@
+import logging
+from collections import Counter
+from typing import Iterable, List, Optional
+from bson import ObjectId
+from fastapi import HTTPException
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+
+from repositories.file_repository import FileMetadataRepository
+
+logger = logging.getLogger(__name__)
+
+class DocumentBlobStore:
+    """Content-addressed document files shared between onboarding records.
+
+    Each distinct SHA-256 is stored once in GridFS; its ``file_metadata`` entry
+    (unique on ``file_hash``) carries ``ref_count``, the number of onboarding
+    document slots pointing at it. Attaching increments the count before the
+    record is written, so a file is never collected while being attached;
+    detaching decrements it, and a file whose count reaches zero is deleted.
+    Uploaded files that were never attached stay until deleted explicitly.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, session: Optional[AsyncIOMotorClientSession] = None):
+        self.files = FileMetadataRepository(db, session)
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name="documents")
+        self.session = session
+
+    async def attach(self, file_ids: Iterable[str]):
+        """Take a reference on each file (once per occurrence); 409 if one was deleted meanwhile"""
+        counts = Counter(file_ids)
+        if await self.files.add_references(counts) < len(counts):
+            # Put back the references that did land; the files themselves stay
+            await self.files.add_references({file_id: -count for file_id, count in counts.items()})
+            raise HTTPException(
+                status_code=409,
+                detail="A referenced file was deleted while it was being attached, please upload it again"
+            )
+
+    async def release(self, file_ids: Iterable[str], collect: bool = True) -> List[str]:
+        """Drop a reference on each file; with ``collect``, delete those no record uses any more"""
+        unreferenced = await self.files.release_references(Counter(file_ids))
+        if not collect:
+            return []
+        collected = [file_id for file_id in unreferenced if await self._collect(file_id)]
+        if collected:
+            logger.info(f"Collected {len(collected)} unreferenced document files")
+        return collected
+
+    async def delete(self, file_id: str):
+        """Delete a file nobody references; 409 while attached, 404 if it does not exist"""
+        if not ObjectId.is_valid(file_id):
+            raise HTTPException(status_code=404, detail="Document not found")
+        if await self._collect(file_id):
+            return
+        ref_count = await self.files.get_ref_count(file_id)
+        if ref_count is not None:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Document is still attached to {ref_count} onboarding record(s)"
+            )
+        # GridFS files stored without metadata (before uploads recorded it)
+        try:
+            await self.bucket.delete(ObjectId(file_id), session=self.session)
+        except NoFile:
+            raise HTTPException(status_code=404, detail="Document not found")
+
+    async def _collect(self, file_id: str) -> bool:
+        # The metadata delete re-checks the count, so a concurrent attach wins
+        if not await self.files.delete_if_unreferenced(file_id):
+            return False
+        try:
+            await self.bucket.delete(ObjectId(file_id), session=self.session)
+        except NoFile:
+            pass
+        return True
@@ -1,16 +1,33 @@
 import logging
-from typing import Optional, List, Dict
+from typing import Optional, Dict, Tuple
 from datetime import datetime, timedelta
-from bson import ObjectId
 from fastapi import HTTPException, UploadFile
 from pymongo.errors import DuplicateKeyError, OperationFailure
 import magic
 import hashlib
 import os
 import asyncio
-from pymongo.database import Database
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
 
+from core.cache import MemoryCacheBackend, ResponseCache, TTLCache
 from core.config import settings
+from core.pagination import Page
+from repositories.business_repository import (
+    BusinessRepository,
+    PROFILE_PROJECTION,
+    compliance_score,
+    without_server_managed_fields
+)
+from repositories.child_repository import BusinessChildRepository, from_child_document
+from repositories.compliance_event_repository import ComplianceEventRepository
+from repositories.dashboard_repository import DashboardRepository
+from repositories.document_repository import (
+    BusinessDocumentRepository,
+    document_counts_delta,
+    empty_document_counts,
+    stats_from_counts
+)
+from repositories.task_repository import TaskRepository
 from schemas.business import (
     Business,
     Document,
@@ -25,22 +42,59 @@ from schemas.business import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Absorbs dashboard refreshes; writes through this process invalidate their business
+dashboard_cache = TTLCache(ttl=settings.DASHBOARD_CACHE_TTL_SECONDS)
+
+# Serialized business and onboarding responses polled by the frontend
+response_cache = ResponseCache(
+    MemoryCacheBackend(ttl=settings.RESPONSE_CACHE_TTL_SECONDS, maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES),
+    enabled=settings.RESPONSE_CACHE_ENABLED
+)
+
+def business_response_key(business_id: str) -> str:
+    return f"business:{business_id}"
+
+def onboarding_response_key(business_id: str) -> str:
+    return f"onboarding:{business_id}"
+
+async def invalidate_business_caches(business_id: str):
+    """Drop everything cached for a business; call after every write to it.
+
+    Only this process' caches are cleared; other workers serve their copy until
+    its TTL runs out (or share one through a shared ``CacheBackend``).
+    """
+    dashboard_cache.invalidate(business_id)
+    await response_cache.invalidate(business_response_key(business_id), onboarding_response_key(business_id))
+
 class BusinessService:
-    def __init__(self, db: Database):
+    def __init__(self, db: AsyncIOMotorDatabase, session: Optional[AsyncIOMotorClientSession] = None):
         self.db = db
         self.collection = self.db.businesses
+        # Request-scoped causal session; background work must not use it
+        self.session = session
+        self.businesses = BusinessRepository(db, session)
+        self.documents = BusinessDocumentRepository(db, session)
+        self.tasks = TaskRepository(db, session)
+        self.compliance_events = ComplianceEventRepository(db, session)
+        self.dashboard = DashboardRepository(db, session)
 
     async def create_business(self, business_data: dict) -> Business:
         """Create a new business"""
         try:
             business = Business(**business_data)
-            result = self.collection.insert_one(business.dict())
-            
-            # Get the created business
-            created_business = self.collection.find_one(
-                {"_id": result.inserted_id}
+            # No tasks or events yet: counters start at zero and the score at 100
+            business.compliance_score = compliance_score(0, 0)
+            await self.collection.insert_one(
+                dict(
+                    business.dict(),
+                    compliance_counts={"total": 0, "completed": 0},
+                    document_counts=empty_document_counts()
+                ),
+                session=self.session
             )
-            return Business(**created_business)
+            
+            # The stored document is exactly the validated model, no need to read it back
+            return business
             
         except DuplicateKeyError as e:
             logger.error(f"Duplicate key error: {e}")
@@ -56,12 +110,19 @@ class BusinessService:
             )
 
     async def get_business_by_id(self, business_id: str) -> Business:
-        """Get business by ID"""
+        """Get business by ID (without its documents, tasks and events)"""
+        business, _ = await self.get_business_with_version(business_id)
+        return business
+
+    async def get_business_with_version(self, business_id: str) -> Tuple[Business, int]:
+        """The business and the version counter its ETag is derived from"""
         try:
-            business = self.collection.find_one({"_id": ObjectId(business_id)})
+            business = await self.businesses.get_profile(business_id)
             if not business:
                 raise HTTPException(status_code=404, detail="Business not found")
-            return Business(**business)
+            return Business.from_db(business), business.get("version", 0)
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error getting business: {e}")
             raise HTTPException(
@@ -72,18 +133,24 @@ class BusinessService:
     async def update_business(self, business_id: str, update_data: dict) -> Business:
         """Update business details"""
         try:
+            # A client $set of version or a counter would clash with their $inc (or corrupt them)
+            update_data = without_server_managed_fields(update_data)
             update_data["updated_at"] = datetime.utcnow()
             
-            result = self.collection.update_one(
-                {"_id": ObjectId(business_id)},
-                {"$set": update_data}
+            business = await self.businesses.update_and_get(
+                business_id,
+                {"$set": update_data},
+                projection=PROFILE_PROJECTION
             )
             
-            if result.modified_count == 0:
+            if not business:
                 raise HTTPException(status_code=404, detail="Business not found")
             
-            return await self.get_business_by_id(business_id)
+            await invalidate_business_caches(business_id)
+            return Business.from_db(business)
             
+        except HTTPException:
+            raise
         except DuplicateKeyError as e:
             logger.error(f"Duplicate key error: {e}")
             raise HTTPException(
@@ -114,6 +181,9 @@ class BusinessService:
             if file_type not in settings.ALLOWED_FILE_TYPES:
                 raise HTTPException(status_code=400, detail="Invalid file type")
             
+            if not await self.businesses.exists(business_id):
+                raise HTTPException(status_code=404, detail="Business not found")
+            
             # Save file
             upload_dir = os.path.join(settings.UPLOAD_DIR, business_id)
             os.makedirs(upload_dir, exist_ok=True)
@@ -141,24 +211,27 @@ class BusinessService:
                 hash=sha256_hash.hexdigest()
             )
             
-            # Update business record
-            result = self.collection.update_one(
-                {"_id": ObjectId(business_id)},
-                {
-                    "$push": {"documents": document.dict()},
-                    "$set": {"updated_at": datetime.utcnow()}
-                }
+            # Count it on the business first: a lost insert after this is fixed by the rebuild
+            # command, a missing business is not
+            document_data = document.dict()
+            result = await self.businesses.adjust_document_counts(
+                business_id, document_counts_delta(document_data)
             )
-            
-            if result.modified_count == 0:
+            if result.matched_count == 0:
+                os.remove(file_path)
                 raise HTTPException(status_code=404, detail="Business not found")
             
+            await self.documents.insert(business_id, document_data)
+            await invalidate_business_caches(business_id)
+            
             # Start OCR processing in background if enabled
             if settings.OCR_ENABLED:
                 asyncio.create_task(self._process_document_ocr(business_id, document))
             
             return document
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error uploading document: {e}")
             # Clean up file if upload failed
@@ -171,40 +244,52 @@ class BusinessService:
 
     async def _process_document_ocr(self, business_id: str, document: Document):
         """Background task for OCR processing"""
+        # Outlives the request, so it must not use the request's session
+        documents = BusinessDocumentRepository(self.db)
         try:
             # Simulate OCR processing
             await asyncio.sleep(2)
-            ocr_data = {
+            ocr_status, ocr_data = "completed", {
                 "processed": True,
                 "text": "Sample OCR text",
                 "processed_at": datetime.utcnow().isoformat()
             }
-            
-            self.collection.update_one(
-                {
-                    "_id": ObjectId(business_id),
-                    "documents.id": document.id
-                },
-                {
-                    "$set": {
-                        "documents.$.ocr_status": "completed",
-                        "documents.$.ocr_data": ocr_data
-                    }
-                }
-            )
         except Exception as e:
             logger.error(f"Error processing OCR: {e}")
-            self.collection.update_one(
-                {
-                    "_id": ObjectId(business_id),
-                    "documents.id": document.id
-                },
-                {
-                    "$set": {
-                        "documents.$.ocr_status": "failed",
-                        "documents.$.ocr_data": {"error": str(e)}
-                    }
-                }
+            ocr_status, ocr_data = "failed", {"error": str(e)}
+        
+        try:
+            before = await documents.set_ocr_result(document.id, ocr_status, ocr_data)
+            if before is not None:
+                await BusinessRepository(self.db).adjust_document_counts(business_id, {
+                    f"by_ocr_status.{before.get('ocr_status', 'pending')}": -1,
+                    f"by_ocr_status.{ocr_status}": 1
+                })
+            await invalidate_business_caches(business_id)
+        except Exception as e:
+            logger.error(f"Error saving OCR result for document {document.id}: {e}")
+
+    async def delete_document(self, business_id: str, document_id: str):
+        """Delete a document, its stored file and its share of the document counters"""
+        try:
+            document = await self.documents.delete(business_id, document_id)
+            if document is None:
+                raise HTTPException(status_code=404, detail="Document not found")
+            
+            await self.businesses.adjust_document_counts(business_id, document_counts_delta(document, -1))
+            await invalidate_business_caches(business_id)
+            
+            file_path = document.get("file_path")
+            if file_path and os.path.exists(file_path):
+                os.remove(file_path)
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error deleting document: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to delete document"
             )
 
     async def create_task(self, business_id: str, task_data: dict) -> Task:
@@ -212,19 +297,18 @@ class BusinessService:
         try:
             task = Task(**task_data)
             
-            result = self.collection.update_one(
-                {"_id": ObjectId(business_id)},
-                {
-                    "$push": {"tasks": task.dict()},
-                    "$set": {"updated_at": datetime.utcnow()}
-                }
+            result = await self.businesses.adjust_compliance(
+                business_id, total=1, completed=int(task.status == TaskStatus.COMPLETED)
             )
-            
-            if result.modified_count == 0:
+            if result.matched_count == 0:
                 raise HTTPException(status_code=404, detail="Business not found")
             
+            await self.tasks.insert(business_id, task.dict())
+            await invalidate_business_caches(business_id)
             return task
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error creating task: {e}")
             raise HTTPException(
@@ -240,46 +324,142 @@ class BusinessService:
         """Create a new compliance event"""
         event = ComplianceEvent(**event_data)
         
-        result = self.collection.update_one(
-            {"_id": ObjectId(business_id)},
-            {
-                "$push": {"compliance_events": event.dict()},
-                "$set": {"updated_at": datetime.utcnow()}
-            }
+        result = await self.businesses.adjust_compliance(
+            business_id, total=1, completed=int(event.status == TaskStatus.COMPLETED)
         )
-        
-        if result.modified_count == 0:
+        if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Business not found")
         
+        await self.compliance_events.insert(business_id, event.dict())
+        await invalidate_business_caches(business_id)
         return event
 
-    async def get_upcoming_tasks(self, business_id: str, days: int = 30) -> List[Task]:
-        """Get upcoming tasks for the next N days"""
+    async def _transition(
+        self,
+        repository: BusinessChildRepository,
+        business_id: str,
+        item_id: str,
+        status: TaskStatus,
+        fields: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        """Change a task's or event's status and move the completed counter with it.
+
+        Returns the record as it is now, or None if it does not exist.
+        """
+        before = await repository.set_status(business_id, item_id, status.value, fields)
+        if before is None:
+            # Either missing (None) or already in that status (nothing to count)
+            return await repository.get(business_id, item_id)
+        
+        completed = int(status == TaskStatus.COMPLETED) - int(before["status"] == TaskStatus.COMPLETED.value)
+        if completed:
+            await self.businesses.adjust_compliance(business_id, completed=completed)
+        await invalidate_business_caches(business_id)
+        return dict(before, status=status.value, **(fields or {}))
+
+    async def update_task_status(self, business_id: str, task_id: str, status: TaskStatus) -> Task:
+        """Move a task to ``status``"""
+        task = await self._transition(
+            self.tasks, business_id, task_id, status, {"updated_at": datetime.utcnow()}
+        )
+        if task is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return Task(**from_child_document(task))
+
+    async def update_compliance_event_status(
+        self,
+        business_id: str,
+        event_id: str,
+        status: TaskStatus
+    ) -> ComplianceEvent:
+        """Move a compliance event to ``status``"""
+        event = await self._transition(self.compliance_events, business_id, event_id, status)
+        if event is None:
+            raise HTTPException(status_code=404, detail="Compliance event not found")
+        return ComplianceEvent(**from_child_document(event))
+
+    async def list_documents(
+        self,
+        business_id: str,
+        doc_type: Optional[DocumentType] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Page:
+        """One page of a business' documents, newest first"""
+        filters = {"doc_type": doc_type.value} if doc_type else None
+        return await self.documents.list_page(business_id, filters, limit, cursor, fields)
+
+    async def list_tasks(
+        self,
+        business_id: str,
+        status: Optional[TaskStatus] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Page:
+        """One page of a business' tasks, soonest due first"""
+        filters = {"status": status.value} if status else None
+        return await self.tasks.list_page(business_id, filters, limit, cursor, fields)
+
+    async def list_compliance_events(
+        self,
+        business_id: str,
+        status: Optional[TaskStatus] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Page:
+        """One page of a business' compliance events, soonest due first"""
+        filters = {"status": status.value} if status else None
+        return await self.compliance_events.list_page(business_id, filters, limit, cursor, fields)
+
+    async def get_dashboard(self, business_id: str, recent: int = 3) -> Dict:
+        """Dashboard summary from one aggregation, cached per business for a few seconds"""
+        return await dashboard_cache.get_or_load(
+            business_id, lambda: self._load_dashboard(business_id, recent)
+        )
+
+    async def _load_dashboard(self, business_id: str, recent: int) -> Dict:
+        cutoff_date = datetime.utcnow() + timedelta(days=settings.DASHBOARD_UPCOMING_DAYS)
+        data = await self.dashboard.get(business_id, cutoff_date, recent)
+        if data is None:
+            raise HTTPException(status_code=404, detail="Business not found")
+        
+        business = data["business"]
+        upcoming = data["upcoming_tasks"]
+        return {
+            "business_name": business.get("name") or business.get("businessName"),
+            "compliance_score": business.get("compliance_score", compliance_score(0, 0)),
+            "document_stats": data["document_stats"],
+            "tasks": {
+                "total": upcoming["total"],
+                "urgent": upcoming["urgent"],
+                "normal": upcoming["total"] - upcoming["urgent"]
+            },
+            "recent_activity": {
+                "documents": [Document(**from_child_document(doc)).dict() for doc in data["recent_documents"]],
+                "tasks": [Task(**from_child_document(doc)).dict() for doc in data["recent_tasks"]],
+                "compliance_events": [
+                    ComplianceEvent(**from_child_document(doc)).dict() for doc in data["recent_events"]
+                ]
+            }
+        }
+
+    async def get_upcoming_tasks(
+        self,
+        business_id: str,
+        days: int = 30,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Page:
+        """Open tasks due within the next N days (overdue ones included), soonest first"""
         try:
             cutoff_date = datetime.utcnow() + timedelta(days=days)
+            return await self.tasks.open_due_page(business_id, due_before=cutoff_date, limit=limit, cursor=cursor)
             
-            pipeline = [
-                {"$match": {"_id": ObjectId(business_id)}},
-                {"$unwind": "$tasks"},
-                {
-                    "$match": {
-                        "tasks.status": {"$ne": TaskStatus.COMPLETED},
-                        "tasks.due_date": {"$lte": cutoff_date}
-                    }
-                },
-                {"$sort": {"tasks.due_date": 1}},
-                {"$group": {
-                    "_id": "$_id",
-                    "tasks": {"$push": "$tasks"}
-                }}
-            ]
-            
-            result = list(self.collection.aggregate(pipeline))
-            if not result:
-                return []
-            
-            return [Task(**task) for task in result[0]["tasks"]]
-            
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error getting upcoming tasks: {e}")
             raise HTTPException(
@@ -287,54 +467,61 @@ class BusinessService:
                 detail="Failed to get upcoming tasks"
             )
 
-    async def get_compliance_score(self, business_id: str) -> float:
-        """Calculate compliance score based on tasks and events"""
+    async def get_overdue_tasks(
+        self,
+        business_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Page:
+        """Open tasks already past their due date, oldest first"""
         try:
-            pipeline = [
-                {"$match": {"_id": ObjectId(business_id)}},
-                {
-                    "$project": {
-                        "total_tasks": {"$size": "$tasks"},
-                        "total_events": {"$size": "$compliance_events"},
-                        "completed_tasks": {
-                            "$size": {
-                                "$filter": {
-                                    "input": "$tasks",
-                                    "cond": {"$eq": ["$$this.status", TaskStatus.COMPLETED]}
-                                }
-                            }
-                        },
-                        "completed_events": {
-                            "$size": {
-                                "$filter": {
-                                    "input": "$compliance_events",
-                                    "cond": {"$eq": ["$$this.status", TaskStatus.COMPLETED]}
-                                }
-                            }
-                        }
-                    }
-                }
-            ]
-            
-            result = list(self.collection.aggregate(pipeline))
-            if not result:
-                raise HTTPException(status_code=404, detail="Business not found")
-            
-            data = result[0]
-            total_items = data["total_tasks"] + data["total_events"]
-            if total_items == 0:
-                return 100.0
+            return await self.tasks.open_due_page(
+                business_id, due_before=datetime.utcnow(), limit=limit, cursor=cursor
+            )
             
-            score = ((data["completed_tasks"] + data["completed_events"]) / total_items) * 100
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting overdue tasks: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to get overdue tasks"
+            )
+
+    async def get_tasks_due_all_businesses(
+        self,
+        days: int = 7,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Page:
+        """Open tasks of every business due between now and N days from now, soonest first"""
+        try:
+            now = datetime.utcnow()
+            return await self.tasks.open_due_page_all(
+                due_after=now, due_before=now + timedelta(days=days), limit=limit, cursor=cursor, fields=fields
+            )
             
-            # Update business compliance score
-            self.collection.update_one(
-                {"_id": ObjectId(business_id)},
-                {"$set": {"compliance_score": score}}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting tasks due across businesses: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to get due tasks"
             )
+
+    async def get_compliance_score(self, business_id: str) -> float:
+        """Compliance score, kept current by task/event creation and status changes"""
+        try:
+            business = await self.businesses.get_compliance(business_id)
+            if not business:
+                raise HTTPException(status_code=404, detail="Business not found")
             
-            return score
+            return business.get("compliance_score", compliance_score(0, 0))
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error calculating compliance score: {e}")
             raise HTTPException(
@@ -345,67 +532,14 @@ class BusinessService:
     async def get_document_stats(self, business_id: str) -> Dict:
         """Get document statistics"""
         try:
-            pipeline = [
-                {"$match": {"_id": ObjectId(business_id)}},
-                {
-                    "$project": {
-                        "total_documents": {"$size": "$documents"},
-                        "total_size": {"$sum": "$documents.size"},
-                        "by_type": {
-                            "$arrayToObject": {
-                                "$map": {
-                                    "input": {"$setUnion": "$documents.doc_type"},
-                                    "as": "type",
-                                    "in": {
-                                        "k": "$$type",
-                                        "v": {
-                                            "$size": {
-                                                "$filter": {
-                                                    "input": "$documents",
-                                                    "cond": {"$eq": ["$$this.doc_type", "$$type"]}
-                                                }
-                                            }
-                                        }
-                                    }
-                                }
-                            }
-                        },
-                        "processing_status": {
-                            "completed": {
-                                "$size": {
-                                    "$filter": {
-                                        "input": "$documents",
-                                        "cond": {"$eq": ["$$this.ocr_status", "completed"]}
-                                    }
-                                }
-                            },
-                            "pending": {
-                                "$size": {
-                                    "$filter": {
-                                        "input": "$documents",
-                                        "cond": {"$eq": ["$$this.ocr_status", "pending"]}
-                                    }
-                                }
-                            },
-                            "failed": {
-                                "$size": {
-                                    "$filter": {
-                                        "input": "$documents",
-                                        "cond": {"$eq": ["$$this.ocr_status", "failed"]}
-                                    }
-                                }
-                            }
-                        }
-                    }
-                }
-            ]
-            
-            result = list(self.collection.aggregate(pipeline))
-            if not result:
+            business = await self.businesses.get_document_counts(business_id)
+            if not business:
                 raise HTTPException(status_code=404, detail="Business not found")
             
-            return result[0]
+            return stats_from_counts(business.get("document_counts"))
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error getting document stats: {e}")
             raise HTTPException(
@@ -415,17 +549,19 @@ class BusinessService:
 
     async def update_settings(self, business_id: str, settings_data: dict) -> Business:
         """Update business settings"""
-        result = self.collection.update_one(
-            {"_id": ObjectId(business_id)},
+        business = await self.businesses.update_and_get(
+            business_id,
             {
                 "$set": {
                     "settings": settings_data,
                     "updated_at": datetime.utcnow()
                 }
-            }
+            },
+            projection=PROFILE_PROJECTION
         )
         
-        if result.modified_count == 0:
+        if not business:
             raise HTTPException(status_code=404, detail="Business not found")
         
-        return await self.get_business_by_id(business_id) 
\ No newline at end of file
+        await invalidate_business_caches(business_id)
+        return Business.from_db(business) 
\ No newline at end of file
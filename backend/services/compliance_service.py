@@ -0,0 +1,277 @@
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from core.config import settings
+from repositories.business_repository import compliance_score, with_version_bump
+from schemas.business import TaskStatus
+from services.business_service import invalidate_business_caches
+
+logger = logging.getLogger(__name__)
+
+ENGINE_JOB_ID = "compliance_engine"
+
+LEASE_POLL_SECONDS = 300
+
+# Re-check a little before the previous run started
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# A create bumps the counters before inserting the task or event, so a business
+# written this recently may look drifted only because that insert is in flight.
+# It is left alone; its updated_at is inside the next run's watermark overlap.
+SETTLE_TIME = timedelta(minutes=1)
+
+RECONCILE_PROJECTION = {"compliance_counts": 1, "compliance_flagged": 1, "updated_at": 1}
+
+def counts_pipeline(business_ids: Iterable[ObjectId]) -> List[Dict]:
+    """Actual (total, completed) tasks + events per business, run on ``business_tasks``"""
+    match = {"$match": {"business_id": {"$in": list(business_ids)}}}
+    project = {"$project": {"business_id": 1, "status": 1}}
+    return [
+        match,
+        project,
+        {"$unionWith": {"coll": "compliance_events", "pipeline": [match, project]}},
+        {
+            "$group": {
+                "_id": "$business_id",
+                "total": {"$sum": 1},
+                "completed": {"$sum": {"$cond": [{"$eq": ["$status", TaskStatus.COMPLETED.value]}, 1, 0]}}
+            }
+        }
+    ]
+
+class ComplianceReconciler:
+    """Recounts tasks and events and corrects businesses whose counters have drifted.
+
+    The counters are moved with ``$inc`` on every create and status change, so they
+    only drift if a write fails half way (e.g. counter bumped, child insert lost).
+    Businesses scoring below ``min_score`` get ``compliance_flagged: true``.
+    """
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        batch_size: int = 500,
+        min_score: float = settings.MIN_COMPLIANCE_SCORE
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.min_score = min_score
+
+    async def _actual_counts(self, business_ids: List[ObjectId]) -> Dict[ObjectId, Tuple[int, int]]:
+        cursor = self.db.business_tasks.aggregate(counts_pipeline(business_ids))
+        return {doc["_id"]: (doc["total"], doc["completed"]) async for doc in cursor}
+
+    async def _reconcile_batch(self, businesses: List[Dict]) -> Tuple[int, int, int]:
+        """Fix counters and flags of one batch in a single bulk write; returns (corrected, flagged, skipped).
+
+        Each update only applies if the counters are still the ones read, so a
+        task created or completed meanwhile is never overwritten with a stale
+        recount; such businesses are skipped and picked up by the next run.
+        """
+        actual = await self._actual_counts([business["_id"] for business in businesses])
+        settled_before = datetime.utcnow() - SETTLE_TIME
+        updates = []
+        updated_ids = []
+        corrected = flagged = skipped = 0
+        for business in businesses:
+            total, completed = actual.get(business["_id"], (0, 0))
+            score = compliance_score(total, completed)
+            below_minimum = score < self.min_score
+            flagged += below_minimum
+
+            fields: Dict = {}
+            stored = business.get("compliance_counts")
+            if (stored or {}).get("total") != total or (stored or {}).get("completed") != completed:
+                if business.get("updated_at") is not None and business["updated_at"] > settled_before:
+                    skipped += 1
+                    continue
+                corrected += 1
+                fields["compliance_counts"] = {"total": total, "completed": completed}
+                fields["compliance_score"] = score
+            if business.get("compliance_flagged", False) != below_minimum:
+                fields["compliance_flagged"] = below_minimum
+            if fields:
+                updates.append(UpdateOne(
+                    {"_id": business["_id"], "compliance_counts": stored},
+                    with_version_bump({"$set": fields})
+                ))
+                updated_ids.append(business["_id"])
+        if updates:
+            result = await self.db.businesses.bulk_write(updates, ordered=False)
+            skipped += len(updates) - result.matched_count
+            # Same as after any other write: cached dashboards show the counters and score
+            for business_id in updated_ids:
+                await invalidate_business_caches(str(business_id))
+        return corrected, flagged, skipped
+
+    async def _run(self, query: Dict, sort_key: str) -> Dict:
+        """Reconcile every business matching ``query``, in keyset batches ordered by (``sort_key``, _id)"""
+        checked = corrected = flagged = skipped = 0
+        last = None
+        while True:
+            batch_query = query
+            if last is not None:
+                after = {"$or": [
+                    {sort_key: {"$gt": last[sort_key]}},
+                    {sort_key: last[sort_key], "_id": {"$gt": last["_id"]}}
+                ]} if sort_key != "_id" else {"_id": {"$gt": last["_id"]}}
+                batch_query = {"$and": [query, after]}
+            sort = [("_id", 1)] if sort_key == "_id" else [(sort_key, 1), ("_id", 1)]
+            businesses = await self.db.businesses.find(
+                batch_query, RECONCILE_PROJECTION
+            ).sort(sort).limit(self.batch_size).to_list(length=self.batch_size)
+            if not businesses:
+                break
+            batch_corrected, batch_flagged, batch_skipped = await self._reconcile_batch(businesses)
+            corrected += batch_corrected
+            flagged += batch_flagged
+            skipped += batch_skipped
+            checked += len(businesses)
+            last = businesses[-1]
+
+        if corrected:
+            logger.warning(f"Corrected compliance counters on {corrected} of {checked} businesses")
+        else:
+            logger.info(f"Compliance counters consistent on {checked} businesses")
+        if skipped:
+            logger.info(f"Skipped {skipped} businesses written during the check; the next run re-checks them")
+        return {"checked": checked, "corrected": corrected, "flagged": flagged, "skipped": skipped}
+
+    async def reconcile(self, business_ids: Optional[List[str]] = None) -> Dict:
+        """Check every business (or just ``business_ids``) in batches; returns counts of checked, corrected, flagged and skipped"""
+        query: Dict = {}
+        if business_ids is not None:
+            query["_id"] = {"$in": [ObjectId(business_id) for business_id in business_ids]}
+        return await self._run(query, "_id")
+
+    async def reconcile_since(self, since: datetime) -> Dict:
+        """Check only businesses updated at or after ``since``.
+
+        Every task/event create and completion bumps the business' ``updated_at``,
+        so this covers all businesses whose score can have changed.
+        """
+        return await self._run({"updated_at": {"$gte": since}}, "updated_at")
+
+class ComplianceEngine:
+    """Re-checks compliance scores every ``COMPLIANCE_CHECK_INTERVAL`` hours in the background.
+
+    Each run only visits businesses updated since the previous run's watermark
+    (the first run, or one after the watermark is lost, visits all of them). The
+    watermark and a run lease live in ``job_state``, so with several workers only
+    one runs at a time.
+    """
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        interval: float = settings.COMPLIANCE_CHECK_INTERVAL * 3600,
+        batch_size: int = 500
+    ):
+        self.db = db
+        self.interval = interval
+        self.reconciler = ComplianceReconciler(db, batch_size)
+        self.last_run: Dict = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def _acquire_lease(self, now: datetime) -> Optional[Dict]:
+        """Claim this interval's run; returns the job state, or None if another worker holds it"""
+        try:
+            return await self.db.job_state.find_one_and_update(
+                {"_id": ENGINE_JOB_ID, "$or": [{"lease_until": {"$lte": now}}, {"lease_until": {"$exists": False}}]},
+                {"$set": {"lease_until": now + timedelta(seconds=self.interval)}},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            ) or {}
+        except DuplicateKeyError:
+            # The job document exists and its lease has not run out
+            return None
+
+    async def run_once(self, full: bool = False) -> Optional[Dict]:
+        """One run (or None if another worker has the lease); also kept as ``last_run``"""
+        started_at = datetime.utcnow()
+        state = await self._acquire_lease(started_at)
+        if state is None:
+            return None
+
+        started = time.perf_counter()
+        watermark = state.get("watermark")
+        if full or watermark is None:
+            result = await self.reconciler.reconcile()
+        else:
+            result = await self.reconciler.reconcile_since(watermark)
+        duration = time.perf_counter() - started
+
+        # Overlap absorbs clock skew between app servers ($$NOW vs utcnow) and in-flight writes
+        await self.db.job_state.update_one(
+            {"_id": ENGINE_JOB_ID},
+            {"$set": {"watermark": started_at - WATERMARK_OVERLAP, "last_run_at": started_at}}
+        )
+        self.last_run = dict(
+            result,
+            started_at=started_at.isoformat(),
+            incremental=not full and watermark is not None,
+            duration_seconds=round(duration, 3),
+            businesses_per_second=round(result["checked"] / duration, 1) if duration > 0 else None
+        )
+        logger.info(f"Compliance engine run: {self.last_run}")
+        return self.last_run
+
+    def metrics(self) -> Dict:
+        """Last run's counts, duration and throughput (empty before the first run)"""
+        return dict(self.last_run)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        # Poll the lease rather than sleeping a whole interval, so a restarted or
+        # standby worker picks the job up soon after the lease runs out
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Compliance engine run failed: {str(e)}")
+            await asyncio.sleep(min(self.interval, LEASE_POLL_SECONDS))
+
+async def _main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Recount compliance counters, fix any drift and flag low scores")
+    parser.add_argument("business_ids", nargs="*", help="Only these businesses (default: all)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--engine", action="store_true",
+        help="Do one scheduled-engine run instead: businesses changed since the last run, honoring the lease"
+    )
+    parser.add_argument("--full", action="store_true", help="With --engine, check every business")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    client = AsyncIOMotorClient(settings.MONGODB_URL, serverSelectionTimeoutMS=settings.MONGODB_TIMEOUT_MS)
+    try:
+        db = client[settings.MONGODB_DB_NAME]
+        if args.engine:
+            result = await ComplianceEngine(db, batch_size=args.batch_size).run_once(full=args.full)
+            print(result if result is not None else "Another worker holds the compliance engine lease")
+        else:
+            print(await ComplianceReconciler(db, args.batch_size).reconcile(args.business_ids or None))
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from core.config import settings
+from repositories.business_repository import with_version_bump
+from repositories.document_repository import BusinessDocumentRepository, empty_document_counts, without_zero_counts
+from services.business_service import invalidate_business_caches
+
+logger = logging.getLogger(__name__)
+
+class DocumentStatsRebuilder:
+    """Recounts business documents and rewrites ``document_counts`` where they have drifted.
+
+    The counters are moved with ``$inc`` on upload, OCR completion and delete, so
+    they only drift if a write fails half way (e.g. counter bumped, document insert lost).
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, batch_size: int = 500):
+        self.db = db
+        self.batch_size = batch_size
+        self.documents = BusinessDocumentRepository(db)
+
+    async def _rebuild_batch(self, businesses: List[Dict]) -> int:
+        actual = await self.documents.count_by_business([business["_id"] for business in businesses])
+        corrections = []
+        corrected_ids = []
+        for business in businesses:
+            counts = actual.get(business["_id"], empty_document_counts())
+            stored = business.get("document_counts")
+            # Deletes leave zero entries behind; they are not drift
+            if stored is None or without_zero_counts(stored) != counts:
+                corrections.append(UpdateOne(
+                    {"_id": business["_id"]},
+                    with_version_bump({"$set": {"document_counts": counts}})
+                ))
+                corrected_ids.append(business["_id"])
+        if corrections:
+            await self.db.businesses.bulk_write(corrections, ordered=False)
+            for business_id in corrected_ids:
+                await invalidate_business_caches(str(business_id))
+        return len(corrections)
+
+    async def rebuild(self, business_ids: Optional[List[str]] = None) -> Dict:
+        """Check every business (or just ``business_ids``) in batches; returns counts of checked and corrected"""
+        query: Dict = {}
+        if business_ids is not None:
+            query["_id"] = {"$in": [ObjectId(business_id) for business_id in business_ids]}
+
+        checked = corrected = 0
+        last_id = None
+        while True:
+            batch_query = dict(query)
+            if last_id is not None:
+                batch_query["_id"] = dict(batch_query.get("_id", {}), **{"$gt": last_id})
+            businesses = await self.db.businesses.find(
+                batch_query, {"document_counts": 1}
+            ).sort("_id", 1).limit(self.batch_size).to_list(length=self.batch_size)
+            if not businesses:
+                break
+            corrected += await self._rebuild_batch(businesses)
+            checked += len(businesses)
+            last_id = businesses[-1]["_id"]
+
+        if corrected:
+            logger.warning(f"Rebuilt document counters on {corrected} of {checked} businesses")
+        else:
+            logger.info(f"Document counters consistent on {checked} businesses")
+        return {"checked": checked, "corrected": corrected}
+
+async def _main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Recount document statistics counters and fix any drift")
+    parser.add_argument("business_ids", nargs="*", help="Only these businesses (default: all)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    client = AsyncIOMotorClient(settings.MONGODB_URL, serverSelectionTimeoutMS=settings.MONGODB_TIMEOUT_MS)
+    try:
+        rebuilder = DocumentStatsRebuilder(client[settings.MONGODB_DB_NAME], args.batch_size)
+        print(await rebuilder.rebuild(args.business_ids or None))
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(_main())
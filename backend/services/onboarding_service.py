@@ -0,0 +1,312 @@
+import csv
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import InsertOne
+from fastapi import HTTPException
+from pymongo.errors import BulkWriteError
+
+from core.config import settings
+from repositories.business_repository import attached_file_ids
+from repositories.file_repository import FileMetadataRepository
+from services.blob_service import DocumentBlobStore
+
+logger = logging.getLogger(__name__)
+
+class OnboardingValidationError(ValueError):
+    """Payload breaks one of the onboarding step rules; the message is the client-facing detail"""
+
+# Step 1
+BASIC_INFO_FIELDS = ["businessName", "companyDescription", "legalEntityType", "industry", "incorporationDate"]
+
+# Step 2
+BUSINESS_DETAILS_FIELDS = ["panNumber", "registeredAddress", "contactInfo"]
+ADDRESS_FIELDS = ["street", "city", "state", "pincode"]
+CONTACT_FIELDS = ["phone", "email"]
+
+# Step 3: (field, required)
+DOCUMENT_FIELDS = [
+    ("incorporation", True),
+    ("panCard", True),
+    ("gstCertificate", False),
+    ("bankStatements", False)
+]
+
+def validate_basic_info(data: Dict):
+    missing_fields = [field for field in BASIC_INFO_FIELDS if not data.get(field)]
+    if missing_fields:
+        raise OnboardingValidationError(f"Missing required fields: {', '.join(missing_fields)}")
+
+def basic_info_record(data: Dict) -> Dict:
+    """New onboarding record for step 1"""
+    now = datetime.utcnow()
+    return {
+        "businessName": data["businessName"],
+        "companyDescription": data["companyDescription"],
+        "legalEntityType": data["legalEntityType"],
+        "industry": data["industry"],
+        "incorporationDate": data["incorporationDate"],
+        "currentStep": 1,
+        "status": "in_progress",
+        "created_at": now,
+        "updated_at": now
+    }
+
+def validate_business_details(data: Dict):
+    missing_fields = [field for field in BUSINESS_DETAILS_FIELDS if not data.get(field)]
+    if missing_fields:
+        raise OnboardingValidationError(f"Missing required fields: {', '.join(missing_fields)}")
+
+    addr_missing = [field for field in ADDRESS_FIELDS if not data["registeredAddress"].get(field)]
+    if addr_missing:
+        raise OnboardingValidationError(f"Missing address fields: {', '.join(addr_missing)}")
+
+    contact_missing = [field for field in CONTACT_FIELDS if not data["contactInfo"].get(field)]
+    if contact_missing:
+        raise OnboardingValidationError(f"Missing contact fields: {', '.join(contact_missing)}")
+
+def business_details_update(data: Dict) -> Dict:
+    """Fields set by step 2"""
+    return {
+        "panNumber": data["panNumber"],
+        "gstin": data.get("gstin"),
+        "registeredAddress": data["registeredAddress"],
+        "contactInfo": data["contactInfo"],
+        "bankDetails": data.get("bankDetails"),
+        "currentStep": 2,
+        "updated_at": datetime.utcnow()
+    }
+
+def document_file_ids(data: Dict) -> Dict[str, str]:
+    """Validate which step 3 documents are present and return {doc_type: file_id}"""
+    if not data.get("incorporation") or not data.get("panCard"):
+        raise OnboardingValidationError("Incorporation certificate and PAN card file IDs are required")
+
+    file_ids = {}
+    for doc_type, is_required in DOCUMENT_FIELDS:
+        if data.get(doc_type):
+            file_ids[doc_type] = data[doc_type]
+        elif is_required:
+            raise OnboardingValidationError(f"Required document {doc_type} is missing")
+    return file_ids
+
+def build_document_refs(file_ids: Dict[str, str], metadata_by_id: Dict[str, Dict]) -> Dict:
+    """Document references for step 3 from already-fetched file metadata"""
+    documents = {}
+    for doc_type, file_id in file_ids.items():
+        file_metadata = metadata_by_id.get(file_id)
+        if not file_metadata:
+            raise OnboardingValidationError(f"File ID {file_id} for {doc_type} not found in database")
+
+        if file_metadata.get("content_type") != "application/pdf":
+            raise OnboardingValidationError(f"File {file_id} for {doc_type} must be a PDF")
+
+        documents[doc_type] = {
+            "name": file_metadata.get("filename", f"{doc_type}_document"),
+            "type": doc_type,
+            "file_id": file_id,
+            "filename": file_metadata.get("filename"),
+            "file_size": file_metadata.get("file_size"),
+            "file_hash": file_metadata.get("file_hash"),
+            "uploaded_at": datetime.utcnow(),
+            "status": "uploaded",
+            "source": "mongodb_gridfs"
+        }
+    return documents
+
+def completion_update(data: Dict) -> Dict:
+    """Fields set by step 4"""
+    if not data.get("termsAccepted"):
+        raise OnboardingValidationError("Terms and conditions must be accepted")
+
+    now = datetime.utcnow()
+    return {
+        "termsAccepted": data["termsAccepted"],
+        "blockchainHashing": data.get("blockchainHashing", True),
+        "currentStep": 4,
+        "status": "completed",
+        "completed_at": now,
+        "updated_at": now
+    }
+
+# Bulk import
+
+# Values of these CSV columns are parsed as booleans
+BOOLEAN_COLUMNS = {"termsAccepted", "blockchainHashing"}
+
+Row = Tuple[int, Union[Dict, Exception]]
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+async def iter_ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    """One JSON object per line; blank lines are skipped"""
+    row_number = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError("Row must be a JSON object")
+            yield row_number, data
+        except ValueError as e:
+            yield row_number, OnboardingValidationError(f"Invalid JSON: {e}")
+
+def _csv_value(column: str, value: str):
+    if column in BOOLEAN_COLUMNS:
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return value
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    """CSV with a header row, one record per line.
+
+    Nested fields use dotted column names (``registeredAddress.city``); empty cells are omitted.
+    """
+    header: Optional[List[str]] = None
+    row_number = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+
+        row_number += 1
+        if len(values) > len(header):
+            yield row_number, OnboardingValidationError(
+                f"Row has {len(values)} columns, header has {len(header)}"
+            )
+            continue
+
+        data: Dict = {}
+        for column, value in zip(header, values):
+            if value == "":
+                continue
+            *parents, leaf = column.split(".")
+            target = data
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = _csv_value(column, value)
+        yield row_number, data
+
+class OnboardingImportService:
+    """Creates onboarding records in bulk using the same rules as the step endpoints"""
+
+    def __init__(self, db: AsyncIOMotorDatabase, batch_size: int = settings.BULK_IMPORT_BATCH_SIZE):
+        self.collection = db.businesses
+        self.files = FileMetadataRepository(db)
+        self.blobs = DocumentBlobStore(db)
+        self.batch_size = batch_size
+
+    async def import_rows(self, rows: AsyncIterator[Row]) -> Dict:
+        results: List[Dict] = []
+        batch: List[Row] = []
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                await self._import_batch(batch, results)
+                batch = []
+        if batch:
+            await self._import_batch(batch, results)
+
+        created = sum(1 for result in results if result["status"] == "created")
+        return {
+            "summary": {
+                "total": len(results),
+                "created": created,
+                "failed": len(results) - created
+            },
+            "results": results
+        }
+
+    def _build_record(self, data: Dict, metadata_by_id: Dict[str, Dict]) -> Dict:
+        """Apply each step that the row has data for, in order"""
+        validate_basic_info(data)
+        record = basic_info_record(data)
+
+        if any(data.get(field) for field in BUSINESS_DETAILS_FIELDS):
+            validate_business_details(data)
+            record.update(business_details_update(data))
+
+        if any(data.get(doc_type) for doc_type, _ in DOCUMENT_FIELDS):
+            record["documents"] = build_document_refs(document_file_ids(data), metadata_by_id)
+            record["currentStep"] = 3
+
+        if data.get("termsAccepted"):
+            missing_steps = [field for field in BUSINESS_DETAILS_FIELDS if not record.get(field)]
+            if not record.get("documents"):
+                missing_steps.append("documents")
+            if missing_steps:
+                raise OnboardingValidationError(
+                    f"Complete previous steps first. Missing: {', '.join(missing_steps)}"
+                )
+            record.update(completion_update(data))
+
+        record["_id"] = ObjectId()
+        return record
+
+    async def _fetch_metadata(self, batch: List[Row]) -> Dict[str, Dict]:
+        """All file metadata referenced by the batch, in one query"""
+        file_ids = set()
+        for _, data in batch:
+            if isinstance(data, dict):
+                file_ids.update(
+                    data[doc_type] for doc_type, _ in DOCUMENT_FIELDS
+                    if isinstance(data.get(doc_type), str)
+                )
+        return await self.files.get_many_for_attachment(file_ids)
+
+    async def _import_batch(self, batch: List[Row], results: List[Dict]):
+        metadata_by_id = await self._fetch_metadata(batch)
+
+        records: List[Tuple[int, Dict]] = []
+        batch_results: Dict[int, Dict] = {}
+        for row_number, data in batch:
+            try:
+                if isinstance(data, Exception):
+                    raise data
+                record = self._build_record(data, metadata_by_id)
+                records.append((row_number, record))
+                batch_results[row_number] = {"row": row_number, "status": "created", "id": str(record["_id"])}
+            except (OnboardingValidationError, AttributeError, TypeError) as e:
+                message = str(e) if isinstance(e, OnboardingValidationError) else f"Invalid row: {e}"
+                batch_results[row_number] = {"row": row_number, "status": "error", "error": message}
+
+        # Reference the document files before any record points at them
+        try:
+            await self.blobs.attach(file_id for _, record in records for file_id in attached_file_ids(record))
+        except HTTPException as e:
+            for row_number, record in records:
+                if attached_file_ids(record):
+                    batch_results[row_number] = {"row": row_number, "status": "error", "error": e.detail}
+            records = [(row_number, record) for row_number, record in records if not attached_file_ids(record)]
+
+        if records:
+            try:
+                await self.collection.bulk_write(
+                    [InsertOne(record) for _, record in records],
+                    ordered=False
+                )
+            except BulkWriteError as e:
+                failed = []
+                for error in e.details.get("writeErrors", []):
+                    row_number, record = records[error["index"]]
+                    failed.extend(attached_file_ids(record))
+                    batch_results[row_number] = {"row": row_number, "status": "error", "error": error.get("errmsg")}
+                await self.blobs.release(failed, collect=False)
+
+        results.extend(batch_results[row_number] for row_number, _ in batch)
+        logger.info(f"Imported onboarding batch of {len(batch)} rows ({len(records)} valid)")
@@ -0,0 +1,358 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from bson import Binary, ObjectId
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession, AsyncIOMotorDatabase
+
+from core.config import settings
+from repositories.upload_session_repository import (
+    STATUS_PROJECTION,
+    GridFSChunkRepository,
+    UploadSessionRepository
+)
+from services.upload_service import (
+    UPLOAD_CHUNK_SIZE,
+    PendingUpload,
+    StoredUpload,
+    ensure_allowed_type,
+    file_too_large,
+    max_file_size
+)
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_OFFSET_HEADER = "Upload-Offset"
+
+def session_not_found() -> HTTPException:
+    return HTTPException(status_code=404, detail="Upload session not found or expired")
+
+def session_busy() -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail="Another request is writing to or finalizing this upload; query the offset and resume"
+    )
+
+def offset_conflict(offset: int, detail: str) -> HTTPException:
+    """409 telling the client where to resume"""
+    return HTTPException(status_code=409, detail=detail, headers={UPLOAD_OFFSET_HEADER: str(offset)})
+
+def session_status(upload: Dict) -> Dict:
+    return {
+        "upload_id": str(upload["_id"]),
+        "filename": upload["filename"],
+        "document_type": upload["document_type"],
+        "size": upload["size"],
+        "offset": upload["offset"],
+        "chunk_size": upload["chunk_size"],
+        "expires_at": upload["expires_at"]
+    }
+
+class AssembledUpload(PendingUpload):
+    """A finished resumable upload: every chunk is stored, the GridFS file document is not yet.
+
+    Its session stays (marked finalizing) until the file is committed or
+    aborted, so chunks left by a failure in between are still found by
+    ``UploadSessionCleaner`` when the session expires.
+    """
+
+    def __init__(self, uploads: UploadSessionRepository, chunks: GridFSChunkRepository, upload: Dict, stored: StoredUpload):
+        self._uploads = uploads
+        self._chunks = chunks
+        self.upload = upload
+        self.stored = stored
+
+    async def commit(self, metadata: Dict):
+        await self._chunks.insert_file({
+            "_id": self.stored.file_id,
+            "length": self.stored.size,
+            "chunkSize": self.upload["chunk_size"],
+            "uploadDate": datetime.utcnow(),
+            "filename": self.upload["filename"],
+            "metadata": metadata
+        })
+        await self._uploads.delete(self.upload["_id"])
+
+    async def abort(self):
+        await self._chunks.delete_chunks([self.stored.file_id])
+        await self._uploads.delete(self.upload["_id"])
+
+    async def discard(self):
+        await self._chunks.delete_file(self.stored.file_id)
+
+class ResumableUploadService:
+    """Uploads sent over several requests, for large files on unreliable connections.
+
+    The client creates a session, PATCHes the bytes in order at the session's
+    offset (as many requests as it takes; a dropped request is resumed from
+    the offset the server reports) and finalizes it. Bytes go to GridFS as each
+    chunk fills, so memory per request is about one chunk and nothing already
+    received is sent twice. A PATCH takes the session's write lock before
+    writing, so a concurrent one at the same offset gets a 409 instead of
+    overwriting its chunks. Sessions idle for ``UPLOAD_SESSION_TTL_HOURS``
+    expire and are removed with their chunks by ``UploadSessionCleaner``.
+    """
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        session: Optional[AsyncIOMotorClientSession] = None,
+        allowed_types: Iterable[str] = settings.ALLOWED_FILE_TYPES,
+        chunk_size: int = UPLOAD_CHUNK_SIZE
+    ):
+        self.uploads = UploadSessionRepository(db, session)
+        self.chunks = GridFSChunkRepository(db, session=session)
+        self.allowed_types = list(allowed_types)
+        self.chunk_size = chunk_size
+        self.ttl = timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+        self.lock_time = timedelta(seconds=settings.UPLOAD_SESSION_LOCK_SECONDS)
+
+    async def create(self, filename: str, document_type: str, size: int, sha256: Optional[str] = None) -> Dict:
+        """Open a session for ``size`` bytes; ``sha256``, if given, is verified on finalize"""
+        if size > max_file_size(document_type):
+            raise file_too_large(max_file_size(document_type))
+        now = datetime.utcnow()
+        upload = {
+            "_id": ObjectId(),
+            "file_id": ObjectId(),
+            "filename": filename,
+            "document_type": document_type,
+            "size": size,
+            "sha256": sha256,
+            "chunk_size": self.chunk_size,
+            "offset": 0,
+            "tail": Binary(b""),
+            "created_at": now,
+            "updated_at": now,
+            "expires_at": now + self.ttl
+        }
+        await self.uploads.insert(upload)
+        logger.info(f"Opened upload session {upload['_id']} for {size} bytes of {document_type}")
+        return session_status(upload)
+
+    async def status(self, upload_id: str) -> Dict:
+        upload = await self.uploads.get(upload_id, STATUS_PROJECTION)
+        if not upload:
+            raise session_not_found()
+        return session_status(upload)
+
+    async def append(self, upload_id: str, offset: int, body: AsyncIterator[bytes]) -> Dict:
+        """Add bytes at ``offset`` (which must be the session's offset); returns the new status.
+
+        Whole chunks are written as they fill and the session (with the partial
+        chunk left over) advanced after each, so a request that breaks off keeps
+        everything received up to the last chunk it completed.
+        """
+        upload = await self.uploads.get(upload_id)
+        if not upload:
+            raise session_not_found()
+        if offset != upload["offset"]:
+            raise offset_conflict(upload["offset"], f"Upload is at offset {upload['offset']}, not {offset}")
+        writer = ObjectId()
+        upload = await self.uploads.lock(upload["_id"], offset, writer, self._locked_until())
+        if not upload:
+            raise session_busy()
+
+        try:
+            size, chunk_size = upload["size"], upload["chunk_size"]
+            buffer = bytearray(upload["tail"])
+            saved = position = upload["offset"]
+            async for piece in body:
+                if position + len(piece) > size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Data goes past the declared size of {size} bytes"
+                    )
+                buffer.extend(piece)
+                position += len(piece)
+                if len(buffer) >= chunk_size:
+                    full = len(buffer) // chunk_size * chunk_size
+                    first_n = (position - len(buffer)) // chunk_size
+                    chunks = [bytes(buffer[start:start + chunk_size]) for start in range(0, full, chunk_size)]
+                    if first_n == 0:
+                        await self._check_type(upload, chunks[0])
+                    # Reading the body may have outlasted the lock; never write without it
+                    if not await self.uploads.hold(upload["_id"], writer, self._locked_until()):
+                        raise session_busy()
+                    await self.chunks.write(upload["file_id"], first_n, chunks)
+                    del buffer[:full]
+                    await self._advance(upload, writer, saved, position, buffer)
+                    saved = position
+
+            if position != saved:
+                await self._advance(upload, writer, saved, position, buffer)
+        finally:
+            await self.uploads.unlock(upload["_id"], writer)
+        upload.update(offset=position, expires_at=datetime.utcnow() + self.ttl)
+        return session_status(upload)
+
+    async def finalize(self, upload_id: str) -> AssembledUpload:
+        """Close a complete session and verify it; commit or abort the result like a streamed upload"""
+        upload = await self.uploads.get(upload_id)
+        if not upload:
+            raise session_not_found()
+        if upload["offset"] != upload["size"]:
+            raise offset_conflict(
+                upload["offset"], f"Upload incomplete: {upload['offset']} of {upload['size']} bytes received"
+            )
+        upload = await self.uploads.start_finalizing(upload["_id"], upload["size"], datetime.utcnow() + self.ttl)
+        if not upload:
+            raise session_busy()
+
+        try:
+            tail = bytes(upload["tail"])
+            if tail:
+                first_n = (upload["size"] - len(tail)) // upload["chunk_size"]
+                await self.chunks.write(upload["file_id"], first_n, [tail])
+
+            # Hash server-side from the stored chunks; the client sent the bytes once only
+            sha256 = hashlib.sha256()
+            length = 0
+            head = b""
+            async for chunk in self.chunks.iter_chunks(upload["file_id"]):
+                data = bytes(chunk["data"])
+                head = head or data
+                sha256.update(data)
+                length += len(data)
+
+            if length != upload["size"]:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Upload data is incomplete, please start a new upload"
+                )
+            content_type = ensure_allowed_type(head, self.allowed_types)
+            if upload.get("sha256") and sha256.hexdigest() != upload["sha256"]:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Uploaded file does not match the declared SHA-256"
+                )
+        except BaseException:
+            await self._discard(upload)
+            raise
+
+        stored = StoredUpload(upload["file_id"], length, sha256.hexdigest(), content_type)
+        return AssembledUpload(self.uploads, self.chunks, upload, stored)
+
+    async def cancel(self, upload_id: str):
+        upload = await self.uploads.get(upload_id, {"_id": 1})
+        if not upload:
+            raise session_not_found()
+        upload = await self.uploads.delete_idle(upload["_id"])
+        if not upload:
+            raise session_busy()
+        await self.chunks.delete_chunks([upload["file_id"]])
+
+    async def _check_type(self, upload: Dict, head: bytes):
+        # Wrong files are turned away at the first chunk, not after the whole upload
+        try:
+            ensure_allowed_type(head, self.allowed_types)
+        except HTTPException:
+            await self._discard(upload)
+            raise
+
+    async def _discard(self, upload: Dict):
+        """Drop a session this request holds (locked or finalizing) and its chunks"""
+        await self.uploads.delete(upload["_id"])
+        await self.chunks.delete_chunks([upload["file_id"]])
+
+    def _locked_until(self) -> datetime:
+        return datetime.utcnow() + self.lock_time
+
+    async def _advance(self, upload: Dict, writer: ObjectId, from_offset: int, to_offset: int, tail: bytearray):
+        if not await self.uploads.advance(
+            upload["_id"], writer, from_offset, to_offset, bytes(tail),
+            datetime.utcnow() + self.ttl, self._locked_until()
+        ):
+            raise HTTPException(
+                status_code=409,
+                detail="Upload session changed during this request (concurrent PATCH?); query the offset and resume"
+            )
+
+class UploadSessionCleaner:
+    """Removes expired upload sessions together with the chunks they had stored.
+
+    A session whose file was committed but which outlived it (the delete after
+    the commit failed) is removed without touching the file's chunks.
+    """
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        interval: float = settings.UPLOAD_SESSION_CLEANUP_INTERVAL_MINUTES * 60,
+        batch_size: int = 500
+    ):
+        self.uploads = UploadSessionRepository(db)
+        self.chunks = GridFSChunkRepository(db)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.last_run: Dict = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> Dict:
+        now = datetime.utcnow()
+        started = time.perf_counter()
+        removed = 0
+        while True:
+            expired = await self.uploads.expired(now, self.batch_size)
+            file_ids: List[ObjectId] = []
+            for upload in expired:
+                # Only what is still expired now; a session resumed meanwhile is kept
+                taken = await self.uploads.take_expired(upload["_id"], now)
+                if taken:
+                    file_ids.append(taken["file_id"])
+            if file_ids:
+                committed = set(await self.chunks.committed(file_ids))
+                await self.chunks.delete_chunks([file_id for file_id in file_ids if file_id not in committed])
+            removed += len(file_ids)
+            if len(expired) < self.batch_size:
+                break
+        result = {
+            "removed": removed,
+            "started_at": now.isoformat(),
+            "duration_seconds": round(time.perf_counter() - started, 3)
+        }
+        self.last_run = result
+        logger.info(f"Upload session cleanup: {result}")
+        return result
+
+    def metrics(self) -> Dict:
+        """Last run's count and duration (empty before the first run)"""
+        return dict(self.last_run)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Upload session cleanup failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+async def _main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Remove expired resumable upload sessions and their chunks")
+    parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    client = AsyncIOMotorClient(settings.MONGODB_URL, serverSelectionTimeoutMS=settings.MONGODB_TIMEOUT_MS)
+    try:
+        print(await UploadSessionCleaner(client[settings.MONGODB_DB_NAME]).run_once())
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(_main())
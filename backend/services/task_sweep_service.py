@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from core.config import settings
+from repositories.task_repository import TaskRepository
+from services.business_service import invalidate_business_caches
+
+logger = logging.getLogger(__name__)
+
+class TaskSweeper:
+    """Moves tasks along as time passes, for every business at once.
+
+    Each run is three bulk updates on ``business_tasks``:
+
+    - pending/in-progress tasks past their due date become ``overdue``
+    - open tasks due within ``URGENT_TASK_THRESHOLD_DAYS`` (or already past due) are escalated to ``urgent``
+    - open tasks due within ``TASK_REMINDER_DAYS`` get ``reminder_at`` (once), for notifiers
+
+    The updates are idempotent, so overlapping runs on several workers are harmless.
+    None of them changes completion, so compliance counters are unaffected, but
+    the cached dashboards of the businesses touched are invalidated.
+    """
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        interval: float = settings.TASK_SWEEP_INTERVAL_MINUTES * 60,
+        urgent_days: int = settings.URGENT_TASK_THRESHOLD_DAYS,
+        reminder_days: int = settings.TASK_REMINDER_DAYS
+    ):
+        self.tasks = TaskRepository(db)
+        self.interval = interval
+        self.urgent_days = urgent_days
+        self.reminder_days = reminder_days
+        self.last_run: Dict = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self, dry_run: bool = False) -> Dict:
+        """One sweep; returns how many tasks each step changed (or would change with ``dry_run``)"""
+        now = datetime.utcnow()
+        started = time.perf_counter()
+        touched: Set[ObjectId] = set()
+        counts = {
+            "overdue": await self.tasks.mark_overdue(now, dry_run, touched),
+            "escalated": await self.tasks.escalate_due_before(
+                now, now + timedelta(days=self.urgent_days), dry_run, touched
+            ),
+            "reminders": await self.tasks.stamp_reminders(
+                now, now + timedelta(days=self.reminder_days), dry_run, touched
+            ),
+        }
+        # The dashboard shows task statuses and priorities
+        for business_id in touched:
+            await invalidate_business_caches(str(business_id))
+        result = dict(
+            counts,
+            dry_run=dry_run,
+            started_at=now.isoformat(),
+            duration_seconds=round(time.perf_counter() - started, 3)
+        )
+        if not dry_run:
+            self.last_run = result
+        logger.info(f"Task sweep{' (dry run)' if dry_run else ''}: {result}")
+        return result
+
+    def metrics(self) -> Dict:
+        """Last (non-dry) run's counts and duration (empty before the first run)"""
+        return dict(self.last_run)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Task sweep failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+async def _main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Mark overdue tasks, escalate urgent ones and stamp reminders")
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would change")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    client = AsyncIOMotorClient(settings.MONGODB_URL, serverSelectionTimeoutMS=settings.MONGODB_TIMEOUT_MS)
+    try:
+        print(await TaskSweeper(client[settings.MONGODB_DB_NAME]).run_once(dry_run=args.dry_run))
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(_main())
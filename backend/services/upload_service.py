@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, NamedTuple, Optional
+from fastapi import HTTPException, Request, UploadFile
+from gridfs.errors import NoFile
+from fastapi.responses import JSONResponse
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorGridFSBucket, AsyncIOMotorGridOut
+import magic
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# GridFS' default chunk size; reading the same amount means each read becomes exactly one chunk write
+UPLOAD_CHUNK_SIZE = 255 * 1024
+
+UPLOAD_PATH = f"{settings.API_V1_STR}/upload/document"
+
+# Second phase of a hash-first upload: POST {HANDSHAKE_PATH}{upload_token}
+HANDSHAKE_PATH = f"{settings.API_V1_STR}/upload/handshake/"
+
+# libmagic only needs the first couple of KB to identify a file
+SNIFF_BYTES = 2048
+
+class StoredUpload(NamedTuple):
+    file_id: object
+    size: int
+    sha256: str
+    content_type: str
+
+def sniff_content_type(head: bytes) -> str:
+    return magic.Magic(mime=True).from_buffer(head[:SNIFF_BYTES])
+
+def ensure_allowed_type(head: bytes, allowed_types: Iterable[str]) -> str:
+    """Content type sniffed from the first bytes of a file; 400 unless it is allowed"""
+    content_type = sniff_content_type(head)
+    if content_type not in allowed_types:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type {content_type} is not allowed"
+        )
+    return content_type
+
+# Room for multipart boundaries, part headers and small form fields around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+def max_file_size(document_type: Optional[str] = None) -> int:
+    """Upload cap for a document type (``MAX_FILE_SIZE`` unless overridden in ``MAX_FILE_SIZE_BY_TYPE``)"""
+    return settings.MAX_FILE_SIZE_BY_TYPE.get(document_type, settings.MAX_FILE_SIZE)
+
+def largest_file_size() -> int:
+    """Cap of the most permissive document type, for checks made before the type is known"""
+    return max(settings.MAX_FILE_SIZE, *settings.MAX_FILE_SIZE_BY_TYPE.values())
+
+def file_too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File exceeds maximum allowed size of {max_size} bytes"
+    )
+
+class PendingUpload:
+    """Bytes written to GridFS but not yet visible: ``commit`` it with its metadata or ``abort`` it.
+
+    ``discard`` removes the file again after (or during a failed) ``commit``,
+    e.g. when another upload of the same content claimed the hash first.
+    """
+
+    def __init__(
+        self,
+        grid_in,
+        stored: StoredUpload,
+        bucket: AsyncIOMotorGridFSBucket,
+        session: Optional[AsyncIOMotorClientSession] = None
+    ):
+        self._grid_in = grid_in
+        self._bucket = bucket
+        self._session = session
+        self.stored = stored
+
+    async def commit(self, metadata: Dict):
+        await self._grid_in.set("metadata", metadata)
+        await self._grid_in.close()
+
+    async def abort(self):
+        # Drops the chunks; the files document was never created
+        await self._grid_in.abort()
+
+    async def discard(self):
+        try:
+            await self._bucket.delete(self.stored.file_id, session=self._session)
+        except NoFile:
+            pass  # Chunks are deleted even when the files document was never written
+
+async def stream_upload_to_gridfs(
+    file: UploadFile,
+    bucket: AsyncIOMotorGridFSBucket,
+    allowed_types: Iterable[str],
+    max_size: int,
+    session: Optional[AsyncIOMotorClientSession] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> PendingUpload:
+    """Copy an upload into GridFS one chunk at a time, hashing as it goes.
+
+    The type is sniffed from the first chunk and the size checked after every
+    chunk, so a wrong or oversized file is rejected (and its partial chunks
+    removed) without reading the rest. Memory stays at about one chunk however
+    large the file is. The caller decides, knowing size and hash, whether to
+    commit the result (e.g. not when the content is already stored).
+    """
+    first = await file.read(chunk_size)
+    content_type = ensure_allowed_type(first, allowed_types)
+
+    sha256 = hashlib.sha256()
+    size = 0
+    grid_in = bucket.open_upload_stream(file.filename, chunk_size_bytes=chunk_size, session=session)
+    try:
+        chunk = first
+        while chunk:
+            size += len(chunk)
+            if size > max_size:
+                raise file_too_large(max_size)
+            sha256.update(chunk)
+            await grid_in.write(chunk)
+            chunk = await file.read(chunk_size)
+    except BaseException:
+        await grid_in.abort()
+        raise
+    return PendingUpload(grid_in, StoredUpload(grid_in._id, size, sha256.hexdigest(), content_type), bucket, session)
+
+def gridfs_metadata(stored: StoredUpload, document_type: str, original_filename: str) -> Dict:
+    """GridFS metadata for a document upload"""
+    return {
+        "content_type": stored.content_type,
+        "document_type": document_type,
+        "original_filename": original_filename,
+        "file_size": stored.size,
+        "file_hash": stored.sha256,
+        "uploaded_at": datetime.utcnow()
+    }
+
+async def stream_gridfs_range(grid_out: AsyncIOMotorGridOut, start: int, stop: int) -> AsyncIterator[bytes]:
+    """Yield bytes ``[start, stop)`` of a GridFS file, one stored chunk per read.
+
+    Reads end on chunk boundaries (only the first and last may be partial), so
+    each is a single chunk fetch with no re-buffering, and the next read is
+    already in flight while the current one is being sent to the client.
+    """
+    chunk_size = grid_out.chunk_size
+    grid_out.seek(start)
+    position = start
+
+    def read_next() -> Optional[asyncio.Future]:
+        nonlocal position
+        if position >= stop:
+            return None
+        size = min(chunk_size - position % chunk_size, stop - position)
+        position += size
+        return asyncio.ensure_future(grid_out.read(size))
+
+    pending = read_next()
+    try:
+        while pending is not None:
+            data = await pending
+            if not data:
+                break
+            pending = read_next()
+            yield data
+    finally:
+        # Client went away mid-download
+        if pending is not None:
+            pending.cancel()
+
+async def upload_size_middleware(request: Request, call_next):
+    """Refuse an upload whose declared ``Content-Length`` is already over the cap.
+
+    Form parsing happens before the endpoint runs, so this is the only point at
+    which an oversized body can be turned away before it is received. The
+    document type is still inside the body here, so the largest per-type cap
+    applies; the endpoint enforces the type's own cap chunk by chunk in
+    ``stream_upload_to_gridfs``, as it does for bodies without a length.
+    """
+    path = request.url.path
+    if request.method == "POST" and (path == UPLOAD_PATH or path.startswith(HANDSHAKE_PATH)):
+        content_length = request.headers.get("content-length", "")
+        limit = largest_file_size() + MULTIPART_OVERHEAD
+        if content_length.isdigit() and int(content_length) > limit:
+            error = file_too_large(largest_file_size())
+            return JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+    return await call_next(request)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Compliance counter reconciliation and the scheduled engine: drifted counters
+are corrected without clobbering concurrent writes, incremental runs only visit
+businesses changed since the watermark, and the lease lets one worker run.
+
+Needs a disposable MongoDB (see conftest.py); skipped when none is reachable.
+
+    pytest test_compliance_engine.py
+"""
+
+from datetime import datetime, timedelta
+
+from services.business_service import dashboard_cache
+from services.compliance_service import ENGINE_JOB_ID, ComplianceEngine, ComplianceReconciler
+
+LONG_AGO = datetime.utcnow() - timedelta(days=1)
+
+async def business(db, total: int, completed: int, updated_at: datetime = LONG_AGO, tasks=()):
+    """A business with the given stored counters and ``tasks`` (statuses) actually stored"""
+    business_id = (await db.businesses.insert_one({
+        "businessName": "Acme",
+        "compliance_counts": {"total": total, "completed": completed},
+        "compliance_score": 100.0,
+        "updated_at": updated_at,
+        "version": 1
+    })).inserted_id
+    for status in tasks:
+        await db.business_tasks.insert_one({"business_id": business_id, "status": status})
+    return business_id
+
+def test_reconcile_corrects_drifted_counters(mongo):
+    async def scenario(db):
+        drifted = await business(db, 5, 5, tasks=["completed", "pending"])
+        consistent = await business(db, 1, 1, tasks=["completed"])
+        dashboard_cache.set(str(drifted), {"stale": True})
+
+        result = await ComplianceReconciler(db, batch_size=1, min_score=60).reconcile()
+        assert result == {"checked": 2, "corrected": 1, "flagged": 1, "skipped": 0}
+
+        fixed = await db.businesses.find_one({"_id": drifted})
+        assert fixed["compliance_counts"] == {"total": 2, "completed": 1}
+        assert fixed["compliance_score"] == 50.0
+        assert fixed["compliance_flagged"] is True
+        assert fixed["version"] == 2
+        assert dashboard_cache.get(str(drifted)) is None
+        assert (await db.businesses.find_one({"_id": consistent}))["version"] == 1
+
+    mongo(scenario)
+
+def test_reconcile_leaves_counters_moved_since_they_were_read(mongo):
+    async def scenario(db):
+        business_id = await business(db, 2, 0, tasks=["pending"])
+        reconciler = ComplianceReconciler(db, min_score=0)
+        stale = await db.businesses.find_one({"_id": business_id})
+        # A task created after the read: counters bumped, its insert still in flight
+        await db.businesses.update_one({"_id": business_id}, {"$inc": {"compliance_counts.total": 1}})
+
+        assert await reconciler._reconcile_batch([stale]) == (1, 0, 1)
+        assert (await db.businesses.find_one({"_id": business_id}))["compliance_counts"] == {"total": 3, "completed": 0}
+
+    mongo(scenario)
+
+def test_reconcile_skips_businesses_written_moments_ago(mongo):
+    async def scenario(db):
+        business_id = await business(db, 2, 0, updated_at=datetime.utcnow(), tasks=["pending"])
+
+        result = await ComplianceReconciler(db).reconcile()
+        assert result["corrected"] == 0 and result["skipped"] == 1
+        assert (await db.businesses.find_one({"_id": business_id}))["compliance_counts"]["total"] == 2
+
+    mongo(scenario)
+
+def test_engine_runs_incrementally_from_the_watermark(mongo):
+    async def scenario(db):
+        await business(db, 0, 0)
+        await business(db, 0, 0)
+        engine = ComplianceEngine(db, interval=0)
+
+        first = await engine.run_once()
+        assert first["incremental"] is False and first["checked"] == 2
+        state = await db.job_state.find_one({"_id": ENGINE_JOB_ID})
+        assert state["watermark"] <= datetime.utcnow()
+
+        changed = await business(db, 3, 0, updated_at=datetime.utcnow() - timedelta(minutes=2))
+        second = await engine.run_once()
+        assert second["incremental"] is True
+        assert second["checked"] == 1 and second["corrected"] == 1
+        assert (await db.businesses.find_one({"_id": changed}))["compliance_counts"]["total"] == 0
+
+        assert (await engine.run_once(full=True))["checked"] == 3
+        assert engine.metrics()["checked"] == 3
+
+    mongo(scenario)
+
+def test_engine_lease_lets_one_worker_run(mongo):
+    async def scenario(db):
+        await business(db, 0, 0)
+        first, second = ComplianceEngine(db, interval=3600), ComplianceEngine(db, interval=3600)
+
+        assert await first.run_once() is not None
+        assert await second.run_once() is None
+
+        # An expired lease (e.g. its worker died) is taken over
+        await db.job_state.update_one({"_id": ENGINE_JOB_ID}, {"$set": {"lease_until": datetime.utcnow()}})
+        assert await second.run_once() is not None
+
+    mongo(scenario)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Business dashboard: header, document stats, upcoming task counts and recent
+activity come back in the documented shape from the single aggregation, and
+a write to the business shows up on the next read despite the cache.
+
+Needs a disposable MongoDB (see conftest.py); skipped when none is reachable.
+
+    pytest test_dashboard.py
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from repositories.business_repository import BusinessRepository
+from repositories.document_repository import BusinessDocumentRepository, document_counts_delta, empty_document_counts
+from services.business_service import BusinessService
+
+async def new_business(db) -> str:
+    return str((await db.businesses.insert_one({
+        "businessName": "Acme Traders",
+        "compliance_counts": {"total": 0, "completed": 0},
+        "compliance_score": 100.0,
+        "document_counts": empty_document_counts(),
+        "version": 1
+    })).inserted_id)
+
+def task(title: str, priority: str, status: str, due_in_days: int) -> dict:
+    return {
+        "title": title,
+        "priority": priority,
+        "status": status,
+        "due_date": datetime.utcnow() + timedelta(days=due_in_days)
+    }
+
+def test_dashboard_shape(mongo):
+    async def scenario(db):
+        business_id = await new_business(db)
+        service = BusinessService(db)
+        await service.create_task(business_id, task("GST return", "urgent", "pending", 2))
+        await service.create_task(business_id, task("TDS filing", "normal", "in_progress", 10))
+        await service.create_task(business_id, task("Annual return", "normal", "pending", 90))
+        await service.create_task(business_id, task("PAN update", "high", "completed", 1))
+        await service.create_compliance_event(business_id, {
+            "title": "AGM",
+            "description": "Annual general meeting",
+            "event_type": "meeting",
+            "due_date": datetime.utcnow() + timedelta(days=20),
+            "status": "pending"
+        })
+        document = {
+            "name": "pan.pdf",
+            "doc_type": "pan_card",
+            "file_path": "/tmp/pan.pdf",
+            "mime_type": "application/pdf",
+            "size": 1200,
+            "upload_date": datetime.utcnow(),
+            "ocr_status": "completed"
+        }
+        await BusinessDocumentRepository(db).insert(business_id, document)
+        await BusinessRepository(db).adjust_document_counts(business_id, document_counts_delta(document))
+
+        dashboard = await service.get_dashboard(business_id)
+        assert set(dashboard) == {"business_name", "compliance_score", "document_stats", "tasks", "recent_activity"}
+        assert dashboard["business_name"] == "Acme Traders"
+        assert dashboard["compliance_score"] == 20.0
+        assert dashboard["document_stats"] == {
+            "total_documents": 1,
+            "total_size": 1200,
+            "by_type": {"pan_card": 1},
+            "processing_status": {"completed": 1, "pending": 0, "failed": 0}
+        }
+        # Open tasks due within DASHBOARD_UPCOMING_DAYS; completed and far-off ones are not counted
+        assert dashboard["tasks"] == {"total": 2, "urgent": 1, "normal": 1}
+
+        recent = dashboard["recent_activity"]
+        assert [doc["name"] for doc in recent["documents"]] == ["pan.pdf"]
+        assert len(recent["tasks"]) == 3
+        assert all(ObjectId.is_valid(item["id"]) for item in recent["tasks"])
+        assert [event["title"] for event in recent["compliance_events"]] == ["AGM"]
+
+        # Writes invalidate the cached copy
+        await service.create_task(business_id, task("Audit", "urgent", "pending", 5))
+        assert (await service.get_dashboard(business_id))["tasks"] == {"total": 3, "urgent": 2, "normal": 1}
+
+    mongo(scenario)
+
+def test_dashboard_of_unknown_business_is_404(mongo):
+    async def scenario(db):
+        with pytest.raises(HTTPException) as error:
+            await BusinessService(db).get_dashboard(str(ObjectId()))
+        assert error.value.status_code == 404
+
+    mongo(scenario)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Content-addressed document files: identical uploads are stored once, onboarding
+records share them through reference counts, and a file is deleted only when
+the last record lets go of it.
+
+Needs a disposable MongoDB (see conftest.py); skipped when none is reachable.
+
+    pytest test_document_blobs.py
+"""
+
+import hashlib
+import io
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, Response
+from starlette.datastructures import UploadFile
+
+from api.v1 import business as business_api
+from api.v1 import upload as upload_api
+from core.conditional import hash_etag
+from repositories.loaders import RequestLoaders
+
+def pdf(label: bytes) -> bytes:
+    return b"%PDF-1.4\n" + label * 200
+
+async def upload(db, content: bytes, filename: str) -> str:
+    result = await upload_api.upload_document(
+        UploadFile(file=io.BytesIO(content), filename=filename), document_type="pan_card", db=db, session=None
+    )
+    return result["file_id"]
+
+async def attach(db, business_id: str, incorporation: str, pan_card: str):
+    await business_api.upload_documents(
+        business_id,
+        {"incorporation": incorporation, "panCard": pan_card},
+        db=db,
+        session=None,
+        loaders=RequestLoaders(db)
+    )
+
+async def ref_count(db, file_id: str):
+    metadata = await db.file_metadata.find_one({"_id": ObjectId(file_id)}, {"ref_count": 1})
+    return None if metadata is None else metadata["ref_count"]
+
+def test_identical_uploads_are_stored_once_and_shared(mongo):
+    async def scenario(db):
+        statement = await upload(db, pdf(b"statement"), "statement.pdf")
+        assert await upload(db, pdf(b"statement"), "copy.pdf") == statement
+        assert await db["documents.files"].count_documents({}) == 1
+
+        pan = await upload(db, pdf(b"pan"), "pan.pdf")
+        businesses = [str((await db.businesses.insert_one({"businessName": name})).inserted_id) for name in "AB"]
+        for business_id in businesses:
+            await attach(db, business_id, statement, pan)
+        assert await ref_count(db, statement) == 2
+
+        # Still used by both records
+        with pytest.raises(HTTPException) as error:
+            await upload_api.delete_document(statement, db=db, session=None)
+        assert error.value.status_code == 409
+
+        # Re-attaching the same files keeps the counts
+        await attach(db, businesses[0], statement, pan)
+        assert await ref_count(db, statement) == 2
+
+        replacement = await upload(db, pdf(b"replacement"), "replacement.pdf")
+        await attach(db, businesses[0], replacement, pan)
+        assert await ref_count(db, statement) == 1
+
+        # Last reference gone: file and metadata are collected
+        await attach(db, businesses[1], replacement, pan)
+        assert await ref_count(db, statement) is None
+        assert await db["documents.files"].count_documents({"_id": ObjectId(statement)}) == 0
+        assert await ref_count(db, replacement) == 2
+        assert await ref_count(db, pan) == 2
+
+    mongo(scenario)
+
+def test_unattached_upload_can_be_deleted(mongo):
+    async def scenario(db):
+        file_id = await upload(db, pdf(b"draft"), "draft.pdf")
+        await upload_api.delete_document(file_id, db=db, session=None)
+        assert await db["documents.files"].count_documents({}) == 0
+
+        with pytest.raises(HTTPException) as error:
+            await upload_api.delete_document(file_id, db=db, session=None)
+        assert error.value.status_code == 404
+
+    mongo(scenario)
+
+def test_document_info_leaves_out_reference_counts(mongo):
+    async def scenario(db):
+        file_id = await upload(db, pdf(b"info"), "info.pdf")
+        business_id = str((await db.businesses.insert_one({"businessName": "A"})).inserted_id)
+        await attach(db, business_id, file_id, file_id)
+
+        # Attaching changes ref_count, which would make the hash ETag stale
+        response = Response()
+        info = await upload_api.get_document_info(file_id, response, if_none_match=None, db=db)
+        assert "ref_count" not in info
+        assert info["file_hash"] == hashlib.sha256(pdf(b"info")).hexdigest()
+        assert response.headers["ETag"] == hash_etag(info["file_hash"])
+
+    mongo(scenario)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Document downloads: Range parsing, If-Range validation and chunk-aligned
+GridFS reads, against an in-memory stand-in for a GridFS file.
+
+    pytest test_document_download.py
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from core.conditional import ByteRange, http_date, if_range_matches, parse_range
+from services.upload_service import stream_gridfs_range
+
+CONTENT = bytes(range(256)) * 10  # 2560 bytes
+
+class FakeGridOut:
+    chunk_size = 1000
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.position = 0
+        self.reads = []
+
+    def seek(self, position: int):
+        self.position = position
+
+    async def read(self, size: int) -> bytes:
+        self.reads.append((self.position, size))
+        data = self.content[self.position:self.position + size]
+        self.position += len(data)
+        return data
+
+async def collect(grid_out: FakeGridOut, start: int, stop: int) -> bytes:
+    return b"".join([chunk async for chunk in stream_gridfs_range(grid_out, start, stop)])
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-49", 100) == ByteRange(0, 50)
+    assert parse_range("bytes=50-", 100) == ByteRange(50, 100)
+    assert parse_range("bytes=90-200", 100) == ByteRange(90, 100)
+    assert parse_range("bytes=-10", 100) == ByteRange(90, 100)
+    assert parse_range("bytes=-500", 100) == ByteRange(0, 100)
+    assert ByteRange(0, 50).content_range(100) == "bytes 0-49/100"
+
+    # Ignored: whole file is sent
+    for header in ("items=0-1", "bytes=0-1,5-6", "bytes=a-b", "bytes=5-1", "bytes=-"):
+        assert parse_range(header, 100) is None
+
+    for header in ("bytes=100-", "bytes=-0"):
+        with pytest.raises(HTTPException) as error:
+            parse_range(header, 100)
+        assert error.value.status_code == 416
+        assert error.value.headers["Content-Range"] == "bytes */100"
+
+def test_if_range():
+    last_modified = http_date(datetime(2024, 5, 1, 12, 30, 0))
+    assert last_modified == "Wed, 01 May 2024 12:30:00 GMT"
+    assert if_range_matches(None, '"abc"', last_modified)
+    assert if_range_matches('"abc"', '"abc"', last_modified)
+    assert not if_range_matches('"old"', '"abc"', last_modified)
+    assert not if_range_matches('W/"abc"', '"abc"', last_modified)
+    assert if_range_matches(last_modified, None, last_modified)
+    assert not if_range_matches("Thu, 02 May 2024 12:30:00 GMT", None, last_modified)
+    assert not if_range_matches("not a date", None, last_modified)
+
+def test_stream_whole_file_in_chunk_reads():
+    grid_out = FakeGridOut(CONTENT)
+    assert asyncio.run(collect(grid_out, 0, len(CONTENT))) == CONTENT
+    assert grid_out.reads == [(0, 1000), (1000, 1000), (2000, 560)]
+
+def test_stream_range_is_chunk_aligned():
+    grid_out = FakeGridOut(CONTENT)
+    assert asyncio.run(collect(grid_out, 700, 2100)) == CONTENT[700:2100]
+    assert grid_out.reads == [(700, 300), (1000, 1000), (2000, 100)]
+
+def test_stream_stops_early_on_short_file():
+    grid_out = FakeGridOut(CONTENT[:1500])
+    assert asyncio.run(collect(grid_out, 0, len(CONTENT))) == CONTENT[:1500]
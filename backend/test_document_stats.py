@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Document statistics rebuild: drifted ``document_counts`` are recounted, and
+counters that only carry zero entries left behind by deletes are left alone.
+
+Needs a disposable MongoDB (see conftest.py); skipped when none is reachable.
+
+    pytest test_document_stats.py
+"""
+
+from services.document_stats_service import DocumentStatsRebuilder
+
+def test_rebuild_fixes_drift_and_ignores_zero_entries(mongo):
+    async def scenario(db):
+        consistent = (await db.businesses.insert_one({
+            "version": 1,
+            "document_counts": {
+                "total": 1,
+                "bytes": 10,
+                "by_type": {"pan_card": 1, "gst_certificate": 0},
+                "by_ocr_status": {"completed": 1, "pending": 0}
+            }
+        })).inserted_id
+        drifted = (await db.businesses.insert_one({
+            "version": 1,
+            "document_counts": {"total": 3, "bytes": 30, "by_type": {"pan_card": 3}, "by_ocr_status": {"pending": 3}}
+        })).inserted_id
+        for business_id in (consistent, drifted):
+            await db.business_documents.insert_one(
+                {"business_id": business_id, "doc_type": "pan_card", "size": 10, "ocr_status": "completed"}
+            )
+
+        assert await DocumentStatsRebuilder(db).rebuild() == {"checked": 2, "corrected": 1}
+        assert (await db.businesses.find_one({"_id": consistent}))["version"] == 1
+        fixed = await db.businesses.find_one({"_id": drifted})
+        assert fixed["document_counts"] == {
+            "total": 1, "bytes": 10, "by_type": {"pan_card": 1}, "by_ocr_status": {"completed": 1}
+        }
+        assert fixed["version"] == 2
+
+        # Stable: a second run finds nothing to correct
+        assert (await DocumentStatsRebuilder(db).rebuild())["corrected"] == 0
+
+    mongo(scenario)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Schema migrations: a second migrate applies nothing, and moving embedded
+children into their collections is safe to rerun after an interrupted batch,
+including for items that never had an id, and keeps items pushed meanwhile.
+
+Needs a disposable MongoDB (see conftest.py); skipped when none is reachable.
+
+    pytest test_migrations.py
+"""
+
+from bson import ObjectId
+from pymongo import MongoClient, monitoring
+
+from conftest import TEST_MONGODB_URL
+from core.migrations import LATEST_VERSION, _move_embedded_children, get_schema_version, migrate
+
+TASK_ID = ObjectId()
+
+EMBEDDED_TASKS = [
+    {"id": str(TASK_ID), "title": "File GST return", "status": "pending"},
+    {"title": "Renew trade licence", "status": "pending"},
+    {"id": "not-an-object-id", "title": "Board meeting", "status": "completed"},
+]
+
+class PushDuringCopy(monitoring.CommandListener):
+    """Pushes ``item`` onto the business (through another client) while its children are being copied"""
+
+    def __init__(self, business_id, item):
+        self.business_id = business_id
+        self.item = item
+        self.db = None
+
+    def started(self, event):
+        if self.db is not None and event.command_name == "update" and event.command.get("update") == "business_tasks":
+            db, self.db = self.db, None
+            db.businesses.update_one({"_id": self.business_id}, {"$push": {"tasks": self.item}})
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def test_migrate_is_recorded_and_not_reapplied(mongo):
+    async def scenario(db):
+        client = MongoClient(TEST_MONGODB_URL)
+        try:
+            sync_db = client[db.name]
+            assert get_schema_version(sync_db) == LATEST_VERSION
+            assert migrate(sync_db) == []
+        finally:
+            client.close()
+
+    mongo(scenario)
+
+def test_moving_embedded_children_can_be_rerun(mongo):
+    async def scenario(db):
+        client = MongoClient(TEST_MONGODB_URL)
+        try:
+            sync_db = client[db.name]
+            business_id = sync_db.businesses.insert_one({"businessName": "Acme", "tasks": EMBEDDED_TASKS}).inserted_id
+
+            _move_embedded_children(sync_db)
+            moved = {task["title"]: task for task in sync_db.business_tasks.find({"business_id": business_id})}
+            assert len(moved) == 3
+            assert moved["File GST return"]["_id"] == TASK_ID
+            assert "tasks" not in sync_db.businesses.find_one({"_id": business_id})
+
+            # Interrupted after the copy, before the $pull: the rerun sees the same array
+            sync_db.businesses.update_one({"_id": business_id}, {"$set": {"tasks": EMBEDDED_TASKS}})
+            _move_embedded_children(sync_db)
+            assert sync_db.business_tasks.count_documents({"business_id": business_id}) == 3
+
+            # An item pushed later lands at a moved item's position but is still copied
+            sync_db.businesses.update_one(
+                {"_id": business_id}, {"$set": {"tasks": [{"title": "Pay advance tax", "status": "pending"}]}}
+            )
+            _move_embedded_children(sync_db)
+            assert sync_db.business_tasks.count_documents({"business_id": business_id}) == 4
+        finally:
+            client.close()
+
+    mongo(scenario)
+
+def test_item_pushed_during_the_move_is_kept(mongo):
+    async def scenario(db):
+        business_id = ObjectId()
+        pushed = {"title": "Pay advance tax", "status": "pending"}
+        listener = PushDuringCopy(business_id, pushed)
+        client = MongoClient(TEST_MONGODB_URL, event_listeners=[listener])
+        other = MongoClient(TEST_MONGODB_URL)
+        try:
+            sync_db = client[db.name]
+            sync_db.businesses.insert_one({"_id": business_id, "businessName": "Acme", "tasks": EMBEDDED_TASKS})
+            # An old instance pushes an id-less item after the batch was read
+            listener.db = other[db.name]
+
+            _move_embedded_children(sync_db)
+            assert sync_db.businesses.find_one({"_id": business_id})["tasks"] == [pushed]
+
+            _move_embedded_children(sync_db)
+            assert sync_db.business_tasks.count_documents({"business_id": business_id}) == 4
+            assert "tasks" not in sync_db.businesses.find_one({"_id": business_id})
+        finally:
+            client.close()
+            other.close()
+
+    mongo(scenario)
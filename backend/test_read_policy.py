@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Read-your-writes test for secondary-routed reporting reads.
+
+A write made in one request hands back a consistency token; a later read in a
+different session that carries the token must see the write, even when it is
+routed to a secondary. Needs a disposable replica set (single node or three nodes),
+e.g. TEST_MONGODB_URL=mongodb://localhost:27017/?replicaSet=rs0; skipped otherwise.
+
+    pytest test_read_policy.py
+"""
+
+import asyncio
+import os
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from api.v1 import business as business_api
+from core.read_policy import apply_consistency_token, encode_consistency_token, reporting_database
+
+TEST_MONGODB_URL = os.getenv("TEST_MONGODB_URL", "mongodb://localhost:27017/?replicaSet=rs0")
+TEST_DB_NAME = "legalease_read_policy_test"
+
+STEP1 = {
+    "businessName": "Acme Pvt Ltd",
+    "companyDescription": "Widgets",
+    "legalEntityType": "Pvt Ltd",
+    "industry": "Manufacturing",
+    "incorporationDate": "2020-01-01"
+}
+
+def test_consistency_token_gives_read_your_writes():
+    async def main():
+        client = AsyncIOMotorClient(TEST_MONGODB_URL, serverSelectionTimeoutMS=1000, w="majority")
+        try:
+            hello = await client.admin.command("hello")
+        except Exception:
+            client.close()
+            pytest.skip(f"No MongoDB reachable at {TEST_MONGODB_URL}")
+        if "setName" not in hello:
+            client.close()
+            pytest.skip("Causal reads need a replica set")
+
+        db = client[TEST_DB_NAME]
+        try:
+            await client.drop_database(TEST_DB_NAME)
+
+            async with await client.start_session(causal_consistency=True) as write_session:
+                started = await business_api.start_onboarding(dict(STEP1), db=db, session=write_session)
+                token = encode_consistency_token(write_session)
+            assert token
+
+            async with await client.start_session(causal_consistency=True) as read_session:
+                apply_consistency_token(read_session, token)
+                listed = await business_api.list_onboarding_businesses(
+                    status=None, limit=10, cursor=None, fields=None, response_format="json", accept=None,
+                    db=reporting_database(db, "onboarding_list"), session=read_session
+                )
+            assert started["business"]["id"] in [b["id"] for b in listed["businesses"]]
+        finally:
+            await client.drop_database(TEST_DB_NAME)
+            client.close()
+
+    asyncio.run(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Response cache and conditional GET behaviour: LRU bound, TTL, hit/miss
+counters, invalidation, ETag matching and 304s, against the in-process backend
+and a minimal stand-in for a shared one.
+
+    pytest test_response_cache.py
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+import pytest
+
+from core.cache import CacheBackend, CachedResponse, MemoryCacheBackend, ResponseCache
+from core.conditional import conditional_response, etag_matches, version_etag
+
+class DictBackend(CacheBackend):
+    """Stand-in for a shared cache: no TTL or bound, just storage"""
+
+    def __init__(self):
+        self.data: Dict[str, bytes] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self.data[key] = value
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def clear(self):
+        self.data.clear()
+
+def test_backend_must_implement_every_method():
+    class GetOnly(CacheBackend):
+        async def get(self, key: str) -> Optional[bytes]:
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
+    DictBackend()
+
+def renderer(body: bytes, etag: str = '"v1"'):
+    calls = []
+
+    async def render() -> CachedResponse:
+        calls.append(1)
+        return CachedResponse(etag, body)
+    return render, calls
+
+async def unversioned() -> str:
+    raise AssertionError("version read without If-None-Match")
+
+async def serve(cache: ResponseCache, key: str, render):
+    """Plain GET: no validator, so cache or render"""
+    return await conditional_response(cache, key, None, unversioned, render)
+
+def test_hits_misses_and_invalidation():
+    async def main():
+        cache = ResponseCache(DictBackend())
+        render, calls = renderer(b'{"name":"Acme"}')
+
+        assert (await serve(cache, "business:1", render)).body == b'{"name":"Acme"}'
+        response = await serve(cache, "business:1", render)
+        assert (response.body, response.headers["etag"]) == (b'{"name":"Acme"}', '"v1"')
+        assert len(calls) == 1
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+        await cache.invalidate("business:1", "onboarding:1")
+        await serve(cache, "business:1", render)
+        assert len(calls) == 2
+
+    asyncio.run(main())
+
+def test_render_racing_a_write_is_not_stored():
+    async def main():
+        cache = ResponseCache(DictBackend())
+
+        async def stale_render() -> CachedResponse:
+            # A write lands while this read is still rendering the old state
+            await cache.invalidate("business:1")
+            return CachedResponse('"v1"', b"stale")
+
+        assert (await serve(cache, "business:1", stale_render)).body == b"stale"
+        render, calls = renderer(b"fresh", '"v2"')
+        assert (await serve(cache, "business:1", render)).body == b"fresh"
+        assert len(calls) == 1
+
+    asyncio.run(main())
+
+def test_write_during_the_version_read_is_not_cached_over():
+    async def main():
+        cache = ResponseCache(DictBackend())
+
+        async def current_etag() -> str:
+            # Read the old version, then a write lands before the render
+            await cache.invalidate("business:1")
+            return '"v1"'
+
+        render, calls = renderer(b"stale")
+        response = await conditional_response(cache, "business:1", '"v0"', current_etag, render)
+        assert response.body == b"stale"
+        render, calls = renderer(b"fresh", '"v2"')
+        assert (await serve(cache, "business:1", render)).body == b"fresh"
+        assert len(calls) == 1
+
+    asyncio.run(main())
+
+def test_memory_backend_is_lru_bounded():
+    async def main():
+        backend = MemoryCacheBackend(ttl=60, maxsize=2)
+        await backend.set("a", b"1")
+        await backend.set("b", b"2")
+        assert await backend.get("a") == b"1"  # "b" is now least recently used
+        await backend.set("c", b"3")
+        assert len(backend) == 2
+        assert await backend.get("b") is None
+        assert await backend.get("a") == b"1"
+        assert await backend.get("c") == b"3"
+
+    asyncio.run(main())
+
+def test_memory_backend_expires_entries():
+    async def main():
+        backend = MemoryCacheBackend(ttl=-1)
+        await backend.set("a", b"1")
+        assert await backend.get("a") is None
+        assert len(backend) == 0
+
+    asyncio.run(main())
+
+def test_disabled_cache_always_renders():
+    async def main():
+        cache = ResponseCache(MemoryCacheBackend(ttl=60), enabled=False)
+        render, calls = renderer(b"x")
+        await serve(cache, "k", render)
+        await serve(cache, "k", render)
+        assert len(calls) == 2
+        assert cache.stats()["hit_ratio"] is None
+
+    asyncio.run(main())
+
+def test_etag_matching():
+    etag = version_etag(3)
+    assert etag == '"v3"'
+    assert version_etag(None) == '"v0"'
+    assert etag_matches('"v3"', etag)
+    assert etag_matches('"v1", W/"v3"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"v2"', etag)
+    assert not etag_matches(None, etag)
+
+def test_conditional_response():
+    async def main():
+        cache = ResponseCache(DictBackend())
+        version_reads = []
+
+        async def current_etag() -> str:
+            version_reads.append(1)
+            return '"v1"'
+
+        render, calls = renderer(b'{"name":"Acme"}')
+
+        # Client already has v1, nothing cached: answered from the version read alone
+        response = await conditional_response(cache, "business:1", '"v1"', current_etag, render)
+        assert response.status_code == 304 and response.headers["etag"] == '"v1"'
+        assert (len(version_reads), len(calls)) == (1, 0)
+
+        # No validator: full render, cached, tagged
+        response = await conditional_response(cache, "business:1", None, current_etag, render)
+        assert response.status_code == 200 and response.body == b'{"name":"Acme"}'
+        assert response.headers["etag"] == '"v1"'
+        assert len(calls) == 1
+
+        # Cached: 304 without touching the database
+        response = await conditional_response(cache, "business:1", '"v1"', current_etag, render)
+        assert response.status_code == 304
+        assert (len(version_reads), len(calls)) == (1, 1)
+
+        # Stale validator gets the body
+        response = await conditional_response(cache, "business:1", '"v0"', current_etag, render)
+        assert response.status_code == 200 and response.body == b'{"name":"Acme"}'
+
+    asyncio.run(main())
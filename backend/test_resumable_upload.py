@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Resumable uploads: bytes sent over several PATCHes (one of them cut off) are
+assembled into a GridFS file, offsets are enforced, expired sessions are
+cleaned up with their chunks, and size caps depend on the document type.
+
+The session tests need a disposable MongoDB (see conftest.py) and are
+skipped when none is reachable.
+
+    pytest test_resumable_upload.py
+"""
+
+import asyncio
+import hashlib
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, Response
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from starlette.requests import ClientDisconnect
+
+from api.v1 import upload as upload_api
+from core.config import settings
+from schemas.upload import UploadSessionCreate
+from services.resumable_upload_service import UploadSessionCleaner
+from services.upload_service import max_file_size
+
+CONTENT = b"%PDF-1.4\n" + os.urandom(700 * 1024)
+
+async def body(data: bytes, piece: int = 64 * 1024, disconnect: bool = False):
+    for start in range(0, len(data), piece):
+        yield data[start:start + piece]
+    if disconnect:
+        raise ClientDisconnect()
+
+async def create(db, size: int = len(CONTENT), sha256: str = None):
+    upload = UploadSessionCreate(filename="statement.pdf", document_type="bank_statement", size=size, sha256=sha256)
+    return await upload_api.create_upload_session(upload, Response(), db=db, session=None)
+
+def test_upload_survives_a_dropped_request(mongo):
+    async def scenario(db):
+        created = await create(db, sha256=hashlib.sha256(CONTENT).hexdigest())
+        upload_id = created["upload_id"]
+        uploads = upload_api.resumable_uploads(db, None)
+
+        progress = await uploads.append(upload_id, 0, body(CONTENT[:300 * 1024]))
+        assert progress["offset"] == 300 * 1024
+
+        # Cut off mid-request: everything up to the last chunk written is kept
+        with pytest.raises(ClientDisconnect):
+            await uploads.append(upload_id, 300 * 1024, body(CONTENT[300 * 1024:600 * 1024], disconnect=True))
+        offset = (await upload_api.get_upload_session(upload_id, Response(), db=db, session=None))["offset"]
+        assert 300 * 1024 < offset <= 600 * 1024
+
+        with pytest.raises(HTTPException) as error:
+            await uploads.append(upload_id, 0, body(CONTENT))
+        assert error.value.status_code == 409
+        assert error.value.headers["Upload-Offset"] == str(offset)
+
+        with pytest.raises(HTTPException) as error:
+            await upload_api.complete_upload_session(upload_id, db=db, session=None)
+        assert error.value.status_code == 409
+
+        await uploads.append(upload_id, offset, body(CONTENT[offset:]))
+        stored = await upload_api.complete_upload_session(upload_id, db=db, session=None)
+        assert stored["file_hash"] == hashlib.sha256(CONTENT).hexdigest()
+        assert stored["file_size"] == len(CONTENT)
+
+        grid_out = await AsyncIOMotorGridFSBucket(db, bucket_name="documents").open_download_stream(
+            ObjectId(stored["file_id"])
+        )
+        assert await grid_out.read() == CONTENT
+        assert await db.upload_sessions.count_documents({}) == 0
+
+        # Same content again: answered at creation, nothing to send
+        repeat = await create(db, sha256=hashlib.sha256(CONTENT).hexdigest())
+        assert repeat["status"] == "stored" and repeat["file_id"] == stored["file_id"]
+
+    mongo(scenario)
+
+def test_data_past_declared_size_is_refused(mongo):
+    async def scenario(db):
+        created = await create(db, size=1000)
+        with pytest.raises(HTTPException) as error:
+            await upload_api.resumable_uploads(db, None).append(created["upload_id"], 0, body(CONTENT[:2000]))
+        assert error.value.status_code == 413
+
+    mongo(scenario)
+
+def test_concurrent_patch_at_the_same_offset_is_refused(mongo):
+    async def scenario(db):
+        created = await create(db)
+        uploads = upload_api.resumable_uploads(db, None)
+        release = asyncio.Event()
+
+        async def slow_body():
+            yield CONTENT[:300 * 1024]
+            await release.wait()
+            yield CONTENT[300 * 1024:600 * 1024]
+
+        first = asyncio.create_task(uploads.append(created["upload_id"], 0, slow_body()))
+        while not await db["documents.chunks"].count_documents({}):
+            await asyncio.sleep(0.01)
+
+        # The session's offset while the first request still holds it: nothing is written
+        offset = (await db.upload_sessions.find_one({"_id": ObjectId(created["upload_id"])}))["offset"]
+        with pytest.raises(HTTPException) as error:
+            await uploads.append(created["upload_id"], offset, body(CONTENT[offset:]))
+        assert error.value.status_code == 409
+        assert await db["documents.chunks"].count_documents({}) == 1
+
+        release.set()
+        assert (await first)["offset"] == 600 * 1024
+        assert "writer" not in await db.upload_sessions.find_one({"_id": ObjectId(created["upload_id"])})
+
+    mongo(scenario)
+
+def test_failed_finalize_leaves_no_chunks_behind(mongo):
+    async def scenario(db):
+        created = await create(db, sha256=hashlib.sha256(b"something else").hexdigest())
+        uploads = upload_api.resumable_uploads(db, None)
+        await uploads.append(created["upload_id"], 0, body(CONTENT))
+
+        with pytest.raises(HTTPException) as error:
+            await upload_api.complete_upload_session(created["upload_id"], db=db, session=None)
+        assert error.value.status_code == 400
+        assert await db.upload_sessions.count_documents({}) == 0
+        assert await db["documents.chunks"].count_documents({}) == 0
+
+    mongo(scenario)
+
+def test_cleanup_keeps_the_chunks_of_a_committed_file(mongo):
+    async def scenario(db):
+        created = await create(db)
+        uploads = upload_api.resumable_uploads(db, None)
+        await uploads.append(created["upload_id"], 0, body(CONTENT))
+        pending = await uploads.finalize(created["upload_id"])
+        await pending._chunks.insert_file({"_id": pending.stored.file_id, "length": len(CONTENT)})
+
+        # The session outlived its committed file (its delete never happened)
+        await db.upload_sessions.update_one(
+            {"_id": ObjectId(created["upload_id"])},
+            {"$set": {"expires_at": datetime.utcnow() - timedelta(minutes=1)}}
+        )
+        assert (await UploadSessionCleaner(db).run_once())["removed"] == 1
+        assert await db.upload_sessions.count_documents({}) == 0
+        assert await db["documents.chunks"].count_documents({}) == 3
+
+    mongo(scenario)
+
+def test_expired_sessions_are_cleaned_up_with_their_chunks(mongo):
+    async def scenario(db):
+        created = await create(db)
+        uploads = upload_api.resumable_uploads(db, None)
+        await uploads.append(created["upload_id"], 0, body(CONTENT[:600 * 1024]))
+        assert await db["documents.chunks"].count_documents({}) == 2
+
+        await db.upload_sessions.update_one(
+            {"_id": ObjectId(created["upload_id"])},
+            {"$set": {"expires_at": datetime.utcnow() - timedelta(minutes=1)}}
+        )
+        result = await UploadSessionCleaner(db).run_once()
+        assert result["removed"] == 1
+        assert await db.upload_sessions.count_documents({}) == 0
+        assert await db["documents.chunks"].count_documents({}) == 0
+
+    mongo(scenario)
+
+def test_file_size_cap_depends_on_document_type():
+    assert max_file_size("pan_card") == settings.MAX_FILE_SIZE
+    assert max_file_size("bank_statement") == settings.MAX_FILE_SIZE_BY_TYPE["bank_statement"]
+    assert max_file_size("bank_statement") > settings.MAX_FILE_SIZE
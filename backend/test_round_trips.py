@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Round-trip count test for the onboarding and business write endpoints.
+
+Each write endpoint should cost a single MongoDB command on the happy path.
+Needs a disposable MongoDB (see conftest.py); skipped when none is reachable.
+
+    pytest test_round_trips.py
+"""
+
+from datetime import datetime
+from bson import ObjectId
+import pytest
+from pymongo import monitoring
+
+from api.v1 import business as business_api
+from services.business_service import BusinessService
+
+# Driver housekeeping that is not part of the endpoint's own work
+IGNORED_COMMANDS = {"hello", "isMaster", "ismaster", "ping", "endSessions", "killCursors"}
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.commands.append(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def run_counted(mongo, scenario):
+    """Run ``scenario(db, counter)`` against a fresh database"""
+    counter = CommandCounter()
+    mongo(lambda db: scenario(db, counter), event_listeners=[counter])
+
+def measure(counter: CommandCounter):
+    """Reset the counter; call the returned function to get the commands issued since"""
+    counter.commands.clear()
+    return lambda: list(counter.commands)
+
+STEP1 = {
+    "businessName": "Acme Pvt Ltd",
+    "companyDescription": "Widgets",
+    "legalEntityType": "Pvt Ltd",
+    "industry": "Manufacturing",
+    "incorporationDate": "2020-01-01"
+}
+
+STEP2 = {
+    "panNumber": "ABCDE1234F",
+    "registeredAddress": {"street": "1 Main St", "city": "Pune", "state": "MH", "pincode": "411001"},
+    "contactInfo": {"phone": "9876543210", "email": "ops@acme.in"}
+}
+
+def test_onboarding_write_round_trips(mongo):
+    async def scenario(db, counter):
+        commands = measure(counter)
+        started = await business_api.start_onboarding(dict(STEP1), db=db, session=None)
+        assert commands() == ["insert"]
+
+        business_id = started["business"]["id"]
+        commands = measure(counter)
+        await business_api.update_business_details(business_id, dict(STEP2), db=db, session=None)
+        assert commands() == ["findAndModify"]
+
+        await db.businesses.update_one(
+            {"_id": ObjectId(business_id)},
+            {"$set": {"documents": {"incorporation": {"file_id": "x"}}}}
+        )
+        commands = measure(counter)
+        completed = await business_api.complete_onboarding(business_id, {"termsAccepted": True}, db=db, session=None)
+        assert completed["business"]["status"] == "completed"
+        assert commands() == ["findAndModify"]
+
+    run_counted(mongo, scenario)
+
+def test_business_service_write_round_trips(mongo):
+    async def scenario(db, counter):
+        service = BusinessService(db)
+
+        commands = measure(counter)
+        business = await service.create_business({
+            "name": "Acme Pvt Ltd",
+            "business_type": "Pvt Ltd",
+            "industry": "Manufacturing",
+            "incorporation_date": datetime(2020, 1, 1)
+        })
+        assert commands() == ["insert"]
+
+        stored = await db.businesses.find_one({"id": business.id}, {"_id": 1})
+        business_id = str(stored["_id"])
+
+        commands = measure(counter)
+        updated = await service.update_business(business_id, {"logo_url": "https://acme.in/logo.png"})
+        assert updated.logo_url == "https://acme.in/logo.png"
+        assert commands() == ["findAndModify"]
+
+        # Server-managed fields in the input are ignored, not a conflicting $set
+        before = await db.businesses.find_one({"_id": stored["_id"]}, {"version": 1, "compliance_score": 1})
+        updated = await service.update_business(
+            business_id, {"status": "inactive", "version": 1, "compliance_score": 0, "document_counts.total": 9}
+        )
+        assert updated.status == "inactive"
+        after = await db.businesses.find_one({"_id": stored["_id"]})
+        assert after["version"] == before["version"] + 1
+        assert after.get("compliance_score") == before.get("compliance_score")
+        assert "document_counts" not in after or after["document_counts"].get("total") != 9
+
+        commands = measure(counter)
+        updated = await service.update_settings(business_id, {"ocr_enabled": False})
+        assert updated.settings == {"ocr_enabled": False}
+        assert commands() == ["findAndModify"]
+
+    run_counted(mongo, scenario)
+
+def test_missing_business_is_404_in_one_round_trip(mongo):
+    async def scenario(db, counter):
+        commands = measure(counter)
+        with pytest.raises(business_api.HTTPException) as exc:
+            await business_api.update_business_details(str(ObjectId()), dict(STEP2), db=db, session=None)
+        assert exc.value.status_code == 404
+        assert commands() == ["findAndModify"]
+
+    run_counted(mongo, scenario)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Task queries: upcoming (overdue included) and overdue tasks of one business,
+and tasks due soon across all businesses, soonest first, open tasks only,
+paged with cursors.
+
+Needs a disposable MongoDB (see conftest.py); skipped when none is reachable.
+
+    pytest test_task_queries.py
+"""
+
+from datetime import datetime, timedelta
+
+from services.business_service import BusinessService
+
+async def add_tasks(db, business_id, tasks) -> None:
+    now = datetime.utcnow()
+    for title, status, due_in_days in tasks:
+        await db.business_tasks.insert_one({
+            "business_id": business_id,
+            "title": title,
+            "priority": "normal",
+            "status": status,
+            "due_date": now + timedelta(days=due_in_days)
+        })
+
+def titles(page):
+    return [task["title"] for task in page.items]
+
+async def all_pages(load):
+    """Titles across every page, following the cursors"""
+    result, cursor = [], None
+    while True:
+        page = await load(cursor)
+        result += titles(page)
+        cursor = page.next_cursor
+        if cursor is None:
+            return result
+
+def test_upcoming_overdue_and_due_tasks(mongo):
+    async def scenario(db):
+        acme = (await db.businesses.insert_one({"businessName": "Acme"})).inserted_id
+        globex = (await db.businesses.insert_one({"businessName": "Globex"})).inserted_id
+        await add_tasks(db, acme, [
+            ("long overdue", "overdue", -20),
+            ("just missed", "pending", -1),
+            ("done late", "completed", -3),
+            ("this week", "in_progress", 3),
+            ("this month", "pending", 25),
+            ("next quarter", "pending", 80),
+            ("done early", "completed", 4),
+        ])
+        await add_tasks(db, globex, [
+            ("globex tomorrow", "pending", 1),
+            ("globex overdue", "overdue", -2),
+            ("globex next month", "pending", 40),
+        ])
+        service = BusinessService(db)
+
+        upcoming = await service.get_upcoming_tasks(str(acme), days=30)
+        assert titles(upcoming) == ["long overdue", "just missed", "this week", "this month"]
+
+        overdue = await service.get_overdue_tasks(str(acme))
+        assert titles(overdue) == ["long overdue", "just missed"]
+
+        # Across businesses: due from now on only, within the window
+        due = await service.get_tasks_due_all_businesses(days=7)
+        assert titles(due) == ["globex tomorrow", "this week"]
+        assert [str(task["business_id"]) for task in due.items] == [str(globex), str(acme)]
+
+        # Pages of one follow on without gaps or repeats
+        paged = await all_pages(lambda cursor: service.get_upcoming_tasks(str(acme), days=30, limit=1, cursor=cursor))
+        assert paged == titles(upcoming)
+
+    mongo(scenario)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Task sweep: past-due tasks become overdue, tasks due soon (or already past
+due) are escalated, reminders are stamped once, and a dry run counts the same
+changes without making them. Businesses whose tasks changed, including tasks
+that arrived while the sweep ran, have their dashboards invalidated.
+
+Needs a disposable MongoDB (see conftest.py); skipped when none is reachable.
+
+    pytest test_task_sweep.py
+"""
+
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import MongoClient, monitoring
+
+from conftest import TEST_MONGODB_URL
+from services.business_service import dashboard_cache
+from services.task_sweep_service import TaskSweeper
+
+async def seed(db):
+    """One business with a task in each interesting state; returns (business_id, {name: task_id})"""
+    business_id = (await db.businesses.insert_one({"businessName": "Acme"})).inserted_id
+    now = datetime.utcnow()
+    tasks = {
+        "past_due": {"status": "pending", "priority": "normal", "due_date": now - timedelta(days=2)},
+        # Escalation was missed while it was still in the window
+        "overdue_unescalated": {"status": "overdue", "priority": "low", "due_date": now - timedelta(days=10)},
+        "due_soon": {"status": "in_progress", "priority": "high", "due_date": now + timedelta(days=1)},
+        "due_this_week": {"status": "pending", "priority": "normal", "due_date": now + timedelta(days=5)},
+        "far_off": {"status": "pending", "priority": "normal", "due_date": now + timedelta(days=30)},
+        "completed": {"status": "completed", "priority": "normal", "due_date": now - timedelta(days=1)},
+    }
+    ids = {}
+    for name, task in tasks.items():
+        ids[name] = (await db.business_tasks.insert_one(dict(task, business_id=business_id))).inserted_id
+    return business_id, ids
+
+class InsertBeforeSweep(monitoring.CommandListener):
+    """Inserts ``task`` (through another client) just before the first update on ``business_tasks``"""
+
+    def __init__(self, task):
+        self.task = task
+        self.db = None
+
+    def started(self, event):
+        if self.db is not None and event.command_name == "update" and event.command.get("update") == "business_tasks":
+            db, self.db = self.db, None
+            db.business_tasks.insert_one(self.task)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+async def task(db, task_id):
+    return await db.business_tasks.find_one({"_id": task_id})
+
+def test_sweep_moves_tasks_along(mongo):
+    async def scenario(db):
+        business_id, ids = await seed(db)
+        dashboard_cache.set(str(business_id), {"stale": True})
+
+        result = await TaskSweeper(db, urgent_days=3, reminder_days=7).run_once()
+        assert (result["overdue"], result["escalated"], result["reminders"]) == (1, 3, 2)
+        assert dashboard_cache.get(str(business_id)) is None
+
+        assert (await task(db, ids["past_due"]))["status"] == "overdue"
+        for name in ("past_due", "overdue_unescalated", "due_soon"):
+            assert (await task(db, ids[name]))["priority"] == "urgent", name
+        for name in ("due_this_week", "far_off", "completed"):
+            assert (await task(db, ids[name]))["priority"] != "urgent", name
+        assert "reminder_at" in await task(db, ids["due_this_week"])
+        assert "reminder_at" not in await task(db, ids["far_off"])
+
+        # Idempotent: nothing left to do
+        again = await TaskSweeper(db, urgent_days=3, reminder_days=7).run_once()
+        assert (again["overdue"], again["escalated"], again["reminders"]) == (0, 0, 0)
+
+    mongo(scenario)
+
+def test_dry_run_counts_without_changing_anything(mongo):
+    async def scenario(db):
+        _, ids = await seed(db)
+        sweeper = TaskSweeper(db, urgent_days=3, reminder_days=7)
+
+        dry = await sweeper.run_once(dry_run=True)
+        assert (dry["overdue"], dry["escalated"], dry["reminders"]) == (1, 3, 2)
+        assert dry["dry_run"] is True
+        assert sweeper.metrics() == {}
+        assert (await task(db, ids["past_due"]))["status"] == "pending"
+        assert await db.business_tasks.count_documents({"priority": "urgent"}) == 0
+
+        real = await sweeper.run_once()
+        assert (real["overdue"], real["escalated"], real["reminders"]) == (1, 3, 2)
+        assert sweeper.metrics()["escalated"] == 3
+
+    mongo(scenario)
+
+def test_task_arriving_during_the_sweep_invalidates_its_business(mongo):
+    business_id = ObjectId()
+    listener = InsertBeforeSweep({
+        "business_id": business_id,
+        "status": "pending",
+        "priority": "normal",
+        "due_date": datetime.utcnow() - timedelta(days=1)
+    })
+
+    async def scenario(db):
+        other = MongoClient(TEST_MONGODB_URL)
+        try:
+            dashboard_cache.set(str(business_id), {"stale": True})
+            listener.db = other[db.name]
+
+            result = await TaskSweeper(db, urgent_days=3, reminder_days=7).run_once()
+            assert result["overdue"] == 1
+            assert dashboard_cache.get(str(business_id)) is None
+        finally:
+            other.close()
+
+    mongo(scenario, event_listeners=[listener])
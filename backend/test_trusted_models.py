@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Trusted model construction: ``Business.from_db`` builds the same model as
+validated construction from a stored document, nested models and enums
+included, without running the validators.
+
+    pytest test_trusted_models.py
+"""
+
+from datetime import datetime
+
+from bson import ObjectId
+
+from schemas.business import Address, BankDetails, Business, BusinessType, ContactInfo, Industry
+
+STORED_BUSINESS = {
+    "_id": ObjectId(),
+    "id": "665f1c2e9b1e8a3f4c2d1a0b",
+    "name": "Acme Traders",
+    "business_type": "Pvt Ltd",
+    "industry": "Retail",
+    "incorporation_date": datetime(2019, 4, 1),
+    "pan_number": "ABCDE1234F",
+    "gstin": "27ABCDE1234F1Z5",
+    "address": {"street": "1 MG Road", "city": "Pune", "state": "MH", "postal_code": "411001", "country": "India"},
+    "contact_info": {"email": "ops@acme.example.com", "phone": "+919876543210", "website": None},
+    "bank_details": {
+        "account_name": "Acme Traders",
+        "account_number": "123456789012",
+        "ifsc_code": "HDFC0001234",
+        "bank_name": "HDFC",
+        "branch": "Pune"
+    },
+    "compliance_score": 87.5,
+    "settings": {"ocr_enabled": False},
+    "created_at": datetime(2024, 1, 2, 3, 4, 5),
+    "updated_at": datetime(2024, 6, 7, 8, 9, 10),
+    "status": "active",
+    "onboarding_completed": True,
+    # Stored bookkeeping the model does not declare
+    "version": 12,
+    "compliance_counts": {"total": 8, "completed": 7}
+}
+
+# Fields filled by a default factory, which differ between any two constructions
+FACTORY_DEFAULTS = {"id", "created_at", "updated_at"}
+
+def test_from_db_equals_validated_construction():
+    trusted = Business.from_db(STORED_BUSINESS)
+    validated = Business(**STORED_BUSINESS)
+    assert trusted.model_dump() == validated.model_dump()
+    assert trusted.model_dump(mode="json") == validated.model_dump(mode="json")
+
+    # Same types, not just equal dumps
+    assert trusted.business_type is BusinessType.PVT_LTD
+    assert trusted.industry is Industry.RETAIL
+    assert isinstance(trusted.address, Address)
+    assert isinstance(trusted.contact_info, ContactInfo)
+    assert isinstance(trusted.bank_details, BankDetails)
+
+def test_from_db_fills_defaults_like_validated_construction():
+    minimal = {
+        "name": "Acme Traders",
+        "business_type": "LLP",
+        "industry": "Other",
+        "incorporation_date": datetime(2020, 1, 1)
+    }
+    trusted = Business.from_db(minimal).model_dump(exclude=FACTORY_DEFAULTS)
+    validated = Business(**minimal).model_dump(exclude=FACTORY_DEFAULTS)
+    assert trusted == validated
+    assert trusted["address"] is None and trusted["compliance_score"] == 0.0
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Hash-first upload handshake: content the server already has is never sent
+again, new content is accepted only if it matches the declared hash and size,
+tokens are single-use, and a handshake racing another upload of the same
+content never gets a file ID whose bytes are not stored yet.
+
+Needs a disposable MongoDB (see conftest.py); skipped when none is reachable.
+
+    pytest test_upload_handshake.py
+"""
+
+import asyncio
+import hashlib
+import io
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pymongo import monitoring
+from starlette.datastructures import UploadFile
+
+from api.v1 import upload as upload_api
+from repositories.file_repository import FileMetadataRepository
+from schemas.upload import UploadHandshake
+from services.upload_service import stream_upload_to_gridfs
+
+CONTENT = b"%PDF-1.4\n" + b"incorporation certificate " * 20000
+
+class ChunkBytes(monitoring.CommandListener):
+    """Bytes of file content written to GridFS"""
+
+    def __init__(self):
+        self.total = 0
+
+    def started(self, event):
+        if event.command_name == "insert" and event.command.get("insert") == "documents.chunks":
+            self.total += sum(len(doc["data"]) for doc in event.command.get("documents", []))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def declare(content: bytes, sha256: str = None) -> UploadHandshake:
+    return UploadHandshake(
+        sha256=sha256 or hashlib.sha256(content).hexdigest(),
+        size=len(content),
+        filename="incorporation.pdf",
+        document_type="incorporation"
+    )
+
+async def send(db, token: str, content: bytes):
+    file = UploadFile(file=io.BytesIO(content), filename="incorporation.pdf")
+    return await upload_api.upload_handshake_content(token, file=file, db=db, session=None)
+
+def test_repeat_upload_transfers_no_bytes(mongo):
+    chunk_bytes = ChunkBytes()
+
+    async def scenario(db):
+        first = await upload_api.upload_handshake(declare(CONTENT), db=db, session=None)
+        assert first["status"] == "upload_required"
+        uploaded = await send(db, first["upload_token"], CONTENT)
+        assert uploaded["file_hash"] == hashlib.sha256(CONTENT).hexdigest()
+        assert chunk_bytes.total == len(CONTENT)
+
+        chunk_bytes.total = 0
+        repeat = await upload_api.upload_handshake(declare(CONTENT), db=db, session=None)
+        assert repeat["status"] == "stored"
+        assert repeat["file_id"] == uploaded["file_id"]
+        assert chunk_bytes.total == 0
+        assert await db["documents.files"].count_documents({}) == 1
+
+    mongo(scenario, event_listeners=[chunk_bytes])
+
+class InterleavedFiles(FileMetadataRepository):
+    """Runs ``during()`` just before the metadata insert, as a concurrent request would"""
+
+    def __init__(self, db, during):
+        super().__init__(db)
+        self.during = during
+
+    async def insert(self, metadata):
+        await self.during()
+        return await super().insert(metadata)
+
+class InterleavedCommit:
+    """A pending upload that runs ``during()`` before and after its GridFS commit"""
+
+    def __init__(self, pending, during):
+        self.pending = pending
+        self.stored = pending.stored
+        self.during = during
+
+    async def commit(self, metadata):
+        await self.during()
+        await self.pending.commit(metadata)
+        await self.during()
+
+    async def abort(self):
+        await self.pending.abort()
+
+    async def discard(self):
+        await self.pending.discard()
+
+async def pending_upload(db, content: bytes):
+    file = UploadFile(file=io.BytesIO(content), filename="incorporation.pdf")
+    bucket = AsyncIOMotorGridFSBucket(db, bucket_name="documents")
+    return await stream_upload_to_gridfs(file, bucket, ["application/pdf"], len(content))
+
+def test_handshake_during_a_commit_never_gets_an_unstored_file(mongo):
+    async def scenario(db):
+        answers = []
+
+        async def handshake():
+            answer = await upload_api.upload_handshake(declare(CONTENT), db=db, session=None)
+            if answer["status"] == "stored":
+                # Whatever ID it is given must already have its bytes in GridFS
+                assert await db["documents.files"].count_documents({"_id": ObjectId(answer["file_id"])}) == 1
+            answers.append(answer["status"])
+
+        pending = InterleavedCommit(await pending_upload(db, CONTENT), handshake)
+        uploaded = await upload_api.save_pending_upload(
+            InterleavedFiles(db, handshake), pending, "incorporation.pdf", "incorporation"
+        )
+        assert answers == ["upload_required"] * 3
+
+        await handshake()
+        assert answers[-1] == "stored"
+        assert (await upload_api.upload_handshake(declare(CONTENT), db=db, session=None))["file_id"] == uploaded["file_id"]
+
+    mongo(scenario)
+
+def test_upload_losing_the_hash_claim_is_discarded(mongo):
+    async def scenario(db):
+        winner = {}
+
+        async def concurrent_upload():
+            # Same content, committed and claimed while the loser is between commit and insert
+            if not winner:
+                files = FileMetadataRepository(db)
+                winner.update(await upload_api.save_pending_upload(
+                    files, await pending_upload(db, CONTENT), "first.pdf", "incorporation"
+                ))
+
+        loser = await upload_api.save_pending_upload(
+            InterleavedFiles(db, concurrent_upload), await pending_upload(db, CONTENT), "second.pdf", "incorporation"
+        )
+        assert loser["file_id"] == winner["file_id"]
+        assert await db["documents.files"].count_documents({}) == 1
+        assert await db["documents.chunks"].count_documents({"files_id": {"$ne": ObjectId(winner["file_id"])}}) == 0
+
+    mongo(scenario)
+
+def test_content_must_match_declaration_and_tokens_are_single_use(mongo):
+    async def scenario(db):
+        handshake = await upload_api.upload_handshake(declare(CONTENT, sha256="0" * 64), db=db, session=None)
+        with pytest.raises(HTTPException) as error:
+            await send(db, handshake["upload_token"], CONTENT)
+        assert error.value.status_code == 400
+        assert await db["documents.files"].count_documents({}) == 0
+        assert await db["documents.chunks"].count_documents({}) == 0
+
+        with pytest.raises(HTTPException) as error:
+            await send(db, handshake["upload_token"], CONTENT)
+        assert error.value.status_code == 404
+
+    mongo(scenario)
+
+def test_declared_size_is_capped():
+    # Refused before touching the database
+    oversized = UploadHandshake(sha256="a" * 64, size=10**12, filename="big.pdf", document_type="bank_statement")
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(upload_api.upload_handshake(oversized, db=None, session=None))
+    assert error.value.status_code == 413
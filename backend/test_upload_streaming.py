@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Streaming upload into GridFS: single-pass hashing, chunk-at-a-time writes,
+type sniffing from the first chunk and the size cap, against an in-memory
+stand-in for the GridFS bucket.
+
+    pytest test_upload_streaming.py
+"""
+
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import UploadFile
+
+from services.upload_service import gridfs_metadata, stream_upload_to_gridfs
+
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 40
+
+class FakeGridIn:
+    def __init__(self):
+        self._id = "file-1"
+        self.chunks = []
+        self.metadata = None
+        self.closed = False
+        self.aborted = False
+
+    async def write(self, data: bytes):
+        self.chunks.append(data)
+
+    async def set(self, name: str, value):
+        setattr(self, name, value)
+
+    async def close(self):
+        self.closed = True
+
+    async def abort(self):
+        self.aborted = True
+
+class FakeBucket:
+    def __init__(self):
+        self.grid_in = None
+
+    def open_upload_stream(self, filename, chunk_size_bytes=None, session=None):
+        self.grid_in = FakeGridIn()
+        return self.grid_in
+
+def upload(content: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename="statement.pdf")
+
+def test_streams_in_chunks_and_hashes_once():
+    async def main():
+        bucket = FakeBucket()
+        pending = await stream_upload_to_gridfs(upload(PDF), bucket, ["application/pdf"], len(PDF), chunk_size=1000)
+        assert pending.stored.size == len(PDF)
+        assert pending.stored.sha256 == hashlib.sha256(PDF).hexdigest()
+        assert pending.stored.content_type == "application/pdf"
+        assert all(len(chunk) <= 1000 for chunk in bucket.grid_in.chunks)
+        assert b"".join(bucket.grid_in.chunks) == PDF
+        assert not bucket.grid_in.closed
+
+        await pending.commit(gridfs_metadata(pending.stored, "bank_statement", "statement.pdf"))
+        assert bucket.grid_in.closed
+        assert bucket.grid_in.metadata["file_hash"] == pending.stored.sha256
+
+    asyncio.run(main())
+
+def test_oversized_upload_is_aborted():
+    async def main():
+        bucket = FakeBucket()
+        with pytest.raises(HTTPException) as error:
+            await stream_upload_to_gridfs(upload(PDF), bucket, ["application/pdf"], 2000, chunk_size=1000)
+        assert error.value.status_code == 413
+        assert bucket.grid_in.aborted
+        assert len(bucket.grid_in.chunks) == 2
+
+    asyncio.run(main())
+
+def test_disallowed_type_is_rejected_before_writing():
+    async def main():
+        bucket = FakeBucket()
+        with pytest.raises(HTTPException) as error:
+            await stream_upload_to_gridfs(upload(b"just text\n" * 100), bucket, ["application/pdf"], 10**6)
+        assert error.value.status_code == 400
+        assert bucket.grid_in is None
+
+    asyncio.run(main())